@@ -0,0 +1,115 @@
+import pandas as pd
+import numpy as np
+import os
+from armazenamento import escolher_arquivo
+from varredura import AgregadorLatencia, obter_agregados
+from latencia import ROTULOS_HORIZONTES, curva_decaimento, quantil_histograma
+from graficos import renderizar
+import instrumentacao
+
+# Define o caminho do arquivo pré-processado
+caminho_arquivo = "/home/israel/vscode/DoE - Atividade 1/dados_pre_processados_outubro_2018.csv"
+
+# Usa a versão em Parquet (tipada, colunar) quando disponível
+caminho_arquivo = escolher_arquivo(caminho_arquivo)
+
+# Dados particionados por data/hora: quando existem, apenas as partições da janela e as
+# de comentários posteriores às publicações da janela são lidas. A janela seleciona as
+# publicações (created_time); todos os comentários delas entram, mesmo os feitos depois
+# do fim da janela, para que as latências longas não sejam cortadas.
+diretorio_por_hora = "/home/israel/vscode/DoE - Atividade 1/dados_pre_processados_por_hora"
+inicio_janela = '2018-10-07'
+fim_janela = '2018-10-08'
+usar_particoes = os.path.isdir(diretorio_por_hora)
+
+# Verifica se o arquivo existe
+if not usar_particoes and not os.path.exists(caminho_arquivo):
+    print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado. Reexecute o script de pré-processamento.")
+    exit()
+
+# Define o tamanho do chunk
+tamanho_chunk = 100000
+
+# Classes logarítmicas de latência: bins_por_decada classes por década, até maximo_latencia_s
+maximo_latencia_s = 1e8
+bins_por_decada = 10
+
+# Número de usuários nas curvas de decaimento e no ranking
+numero_usuarios = 5
+
+# Diretório dos agregados salvos pela varredura única (AED_varredura.py)
+diretorio_agregados = "/home/israel/vscode/DoE - Atividade 1/agregados"
+
+# Gráficos: gerados em paralelo (backend Agg) e só quando os dados de cada figura
+# mudaram desde a última geração (hashes em caminho_registro_graficos); ver graficos.py
+numero_processos_graficos = os.cpu_count() or 1
+caminho_registro_graficos = os.path.join(diretorio_agregados, 'graficos.json')
+
+# Instrumentação: tempos e contadores por etapa, gravados em JSON no fim da execução
+# (caminho_metricas), com captura opcional de cProfile e tracemalloc; ver instrumentacao.py
+instrumentar = False
+perfil_cprofile = False
+perfil_memoria = False
+caminho_metricas = "metricas_analise_latencia.json"
+if instrumentar:
+    instrumentacao.ativar(perfil_cprofile, perfil_memoria)
+
+# Obtém os histogramas de latência (da varredura única ou lendo a fonte em chunks)
+try:
+    agregados = obter_agregados(AgregadorLatencia(maximo_latencia_s, bins_por_decada), caminho_arquivo, tamanho_chunk,
+                                diretorio_agregados, diretorio_por_hora, (inicio_janela, fim_janela))
+except Exception as e:
+    print(f"Erro ao processar o subconjunto: {str(e)}")
+    exit()
+
+bordas = agregados['bordas']
+histograma = agregados['histograma']
+por_dono = agregados['por_dono']
+por_post = agregados['por_post']
+
+# Verifica se há dados suficientes
+if histograma.sum() == 0:
+    print("Erro: Subconjunto não contém comentários com data de publicação. Verifique os dados brutos.")
+    exit()
+
+# 1. Latência geral (publicação -> comentário)
+print("\nLatência entre Publicação e Comentário:")
+print(f"Comentários: {histograma.sum()}")
+print(f"Comentários anteriores à publicação (descartados): {agregados['latencias_negativas']}")
+for q in [0.25, 0.5, 0.75, 0.9, 0.99]:
+    print(f"Percentil {q:.0%}: {quantil_histograma(histograma, bordas, q) / 3600:.2f} h")
+
+# 2. Decaimento do engajamento: fração dos comentários recebidos até cada horizonte
+horizontes = por_post.sum()
+print("\nFração Acumulada de Comentários por Horizonte:")
+print((horizontes.cumsum() / horizontes.sum()).round(4).to_string())
+
+# Publicações: horizonte em que metade dos comentários já tinha chegado
+metade = por_post.cumsum(axis=1).ge(por_post.sum(axis=1) / 2, axis=0).idxmax(axis=1)
+print("\nPublicações por Horizonte de Metade dos Comentários:")
+print(metade.value_counts().reindex(ROTULOS_HORIZONTES, fill_value=0).to_string())
+
+# 3. Usuários com mais comentários recebidos: latência mediana e curva de decaimento
+totais_dono = por_dono.sum(axis=1).sort_values(ascending=False)
+top_donos = totais_dono.head(numero_usuarios).index
+ranking = pd.DataFrame({
+    'comentarios': totais_dono[top_donos],
+    'mediana_h': [quantil_histograma(por_dono.loc[dono].to_numpy(), bordas, 0.5) / 3600 for dono in top_donos]
+})
+print(f"\nTop {numero_usuarios} Usuários - Latência Mediana dos Comentários Recebidos:")
+print(ranking.round(2))
+
+# 4. Visualizações
+# Histograma logarítmico da latência e curvas de decaimento (geral e dos usuários com mais comentários)
+limites = np.append(bordas[1:], bordas[-1] * 10**(1 / bins_por_decada))
+curvas_donos = curva_decaimento(por_dono.loc[top_donos].to_numpy())
+with instrumentacao.etapa('graficos'):
+    renderizar([
+        ('histograma_latencia', 'latencia_comentarios.png',
+         {'bordas': bordas, 'histograma': histograma, 'bins_por_decada': bins_por_decada}),
+        ('decaimento_engajamento', 'decaimento_engajamento.png',
+         {'limites': limites, 'geral': curva_decaimento(histograma),
+          'curvas': {f'Usuário {dono}': curva for dono, curva in zip(top_donos, curvas_donos)}})
+    ], caminho_registro_graficos, numero_processos_graficos)
+
+instrumentacao.finalizar(caminho_metricas, 'AED_analise_latencia.py')
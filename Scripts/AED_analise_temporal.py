@@ -1,93 +1,101 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
-import csv
+from armazenamento import escolher_arquivo
+from varredura import AgregadorPiramide, AgregadorHorarioAproximado, obter_agregados
+from piramide import consultar, estatisticas_moveis
+from estatisticas import resumir_serie
+from graficos import renderizar
+import instrumentacao
 
 # Define o caminho do arquivo pré-processado
 caminho_arquivo = "/home/israel/vscode/DoE - Atividade 1/dados_pre_processados_outubro_2018.csv"
 
+# Usa a versão em Parquet (tipada, colunar) quando disponível
+caminho_arquivo = escolher_arquivo(caminho_arquivo)
+
+# Dados particionados por data/hora: quando existem, apenas as partições da janela são lidas
+diretorio_por_hora = "/home/israel/vscode/DoE - Atividade 1/dados_pre_processados_por_hora"
+inicio_janela = '2018-10-07'
+fim_janela = '2018-10-08'
+usar_particoes = os.path.isdir(diretorio_por_hora)
+
 # Verifica se o arquivo existe
-if not os.path.exists(caminho_arquivo):
+if not usar_particoes and not os.path.exists(caminho_arquivo):
     print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado. Reexecute o script de pré-processamento.")
     exit()
 
 # Define o tamanho do chunk
 tamanho_chunk = 10000
 
-# Inicializa séries para contagens por hora
-serie_posts = pd.Series(dtype=int)
-serie_comentarios = pd.Series(dtype=int)
-
-# Função para processar cada chunk
-def processar_chunk_temporal(chunk, chunk_num):
-    print(f"Processando chunk {chunk_num}: {len(chunk)} linhas")
-    print(f"Valores nulos - created_time: {chunk['created_time'].isna().sum()}, created_time_comment: {chunk['created_time_comment'].isna().sum()}")
-    
-    # Converte colunas de data
-    chunk['created_time'] = pd.to_datetime(chunk['created_time'], errors='coerce')
-    chunk['created_time_comment'] = pd.to_datetime(chunk['created_time_comment'], errors='coerce')
-    
-    # Extrai hora completa (data + hora)
-    chunk['hora_post'] = chunk['created_time'].dt.floor('h')
-    chunk['hora_comentario'] = chunk['created_time_comment'].dt.floor('h')
-    
-    # Conta publicações (usando short_code único por hora)
-    posts = chunk.drop_duplicates(subset=['short_code']).groupby('hora_post').size()
-    comentarios = chunk.groupby('hora_comentario').size() if not chunk['created_time_comment'].isna().all() else pd.Series(dtype=int)
-    
-    print(f"Publicações por hora: {len(posts)}, Comentários por hora: {len(comentarios)}")
-    return posts, comentarios
-
-# Lê os chunks
+# Nível da pirâmide temporal ('minuto', 'hora', 'dia' ou 'semana') e intervalo
+# analisado [inicio_analise, fim_analise); os gráficos abaixo assumem horas de um dia
+nivel = 'hora'
+inicio_analise = '2018-10-07'
+fim_analise = '2018-10-08'
+
+# Modo aproximado: publicações distintas por hora estimadas com HyperLogLog
+# (memória fixa por hora, útil para o período completo; apenas nível 'hora')
+modo_aproximado = False
+erro_relativo_hll = 0.02
+if modo_aproximado and nivel != 'hora':
+    print(f"Erro: O modo aproximado só calcula contagens por hora (nível '{nivel}' pedido). Use nivel = 'hora' ou modo_aproximado = False.")
+    exit()
+
+# Diretório dos agregados salvos pela varredura única (AED_varredura.py)
+diretorio_agregados = "/home/israel/vscode/DoE - Atividade 1/agregados"
+
+# Gráficos: gerados em paralelo (backend Agg) e só quando os dados de cada figura
+# mudaram desde a última geração (hashes em caminho_registro_graficos); ver graficos.py
+numero_processos_graficos = os.cpu_count() or 1
+caminho_registro_graficos = os.path.join(diretorio_agregados, 'graficos.json')
+
+# Instrumentação: tempos e contadores por etapa, gravados em JSON no fim da execução
+# (caminho_metricas), com captura opcional de cProfile e tracemalloc; ver instrumentacao.py
+instrumentar = False
+perfil_cprofile = False
+perfil_memoria = False
+caminho_metricas = "metricas_analise_temporal.json"
+if instrumentar:
+    instrumentacao.ativar(perfil_cprofile, perfil_memoria)
+
+# Obtém a pirâmide de contagens (da varredura única ou lendo a fonte em chunks)
 try:
-    chunk_count = 0
-    for chunk in pd.read_csv(
-        caminho_arquivo,
-        chunksize=tamanho_chunk,
-        usecols=['created_time', 'created_time_comment', 'short_code'],
-        encoding='utf-8',
-        quoting=csv.QUOTE_ALL,
-        on_bad_lines='skip',
-        low_memory=False,
-        escapechar='\\',
-        doublequote=True
-    ):
-        chunk_count += 1
-        posts, comentarios = processar_chunk_temporal(chunk, chunk_count)
-        serie_posts = serie_posts.add(posts, fill_value=0)
-        serie_comentarios = serie_comentarios.add(comentarios, fill_value=0)
+    agregador = AgregadorHorarioAproximado(erro_relativo_hll) if modo_aproximado else AgregadorPiramide()
+    agregados = obter_agregados(agregador, caminho_arquivo, tamanho_chunk, diretorio_agregados,
+                                diretorio_por_hora, (inicio_janela, fim_janela))
 except Exception as e:
     print(f"Erro ao processar o subconjunto: {str(e)}")
     exit()
 
-# Remove NaN e converte para inteiros
-serie_posts = serie_posts.dropna().astype(int)
-serie_comentarios = serie_comentarios.dropna().astype(int)
+if modo_aproximado:
+    print(f"Publicações por hora estimadas com HyperLogLog (erro relativo padrão: {agregados['erro_relativo_posts']:.2%})")
+    contagens = pd.DataFrame({'publicacoes': agregados['serie_posts'], 'comentarios': agregados['serie_comentarios']})
+    agregados = {'hora': contagens.fillna(0).astype('int64')}
 
 # Verifica se há dados suficientes
-if serie_posts.empty:
+if agregados['hora']['publicacoes'].sum() == 0:
     print("Erro: Subconjunto não contém dados suficientes para publicações. Verifique os dados brutos.")
     exit()
 
-# Reindexa para garantir continuidade, restrito a 7 de outubro de 2018
-data_inicio = pd.Timestamp('2018-10-07 00:00:00')
-data_fim = pd.Timestamp('2018-10-07 23:00:00')
-indice_horas = pd.date_range(start=data_inicio, end=data_fim, freq='h')
-serie_posts = serie_posts.reindex(indice_horas, fill_value=0)
-serie_comentarios = serie_comentarios.reindex(indice_horas, fill_value=0)
+# Contagens do nível escolhido no intervalo, com zeros nos períodos sem atividade
+contagens = consultar(agregados, nivel, inicio_analise, fim_analise)
+serie_posts = contagens['publicacoes'].rename(None)
+serie_comentarios = contagens['comentarios'].rename(None)
 
-# Calcula médias móveis (janela de 24 horas para capturar tendências diárias)
+# Calcula médias móveis (janela de 24 períodos para capturar tendências diárias),
+# atualizadas período a período
 janela_media_movel = 24
-media_movel_posts = serie_posts.rolling(window=janela_media_movel, min_periods=1).mean()
-media_movel_comentarios = serie_comentarios.rolling(window=janela_media_movel, min_periods=1).mean()
+media_movel_posts = estatisticas_moveis(serie_posts, janela_media_movel)['media']
+media_movel_comentarios = estatisticas_moveis(serie_comentarios, janela_media_movel)['media']
 
 # Identifica períodos de alta e baixa atividade (percentis 90 e 10)
-limiar_alta_posts = serie_posts.quantile(0.90)
-limiar_baixa_posts = serie_posts.quantile(0.10)
-limiar_alta_comentarios = serie_comentarios.quantile(0.90) if not serie_comentarios.empty else 0
-limiar_baixa_comentarios = serie_comentarios.quantile(0.10) if not serie_comentarios.empty else 0
+quantis_posts = resumir_serie(serie_posts)
+quantis_comentarios = resumir_serie(serie_comentarios)
+limiar_alta_posts = quantis_posts.quantil(0.90)
+limiar_baixa_posts = quantis_posts.quantil(0.10)
+limiar_alta_comentarios = quantis_comentarios.quantil(0.90)
+limiar_baixa_comentarios = quantis_comentarios.quantil(0.10)
 
 print("\nPeríodos de Alta e Baixa Atividade (Publicações):")
 print(f"Limiar Alta (90%): {limiar_alta_posts:.2f}")
@@ -107,69 +115,24 @@ print(serie_posts_sazonal)
 print("\nSazonalidade Comentários (Média por Hora do Dia):")
 print(serie_comentarios_sazonal)
 
-# Gera os gráficos e salva como PNG temporariamente
-# Gráfico 1: Séries Temporais de Publicações
-plt.figure(figsize=(12, 9))  # Proporção 4:3
-plt.plot(serie_posts.index.hour, serie_posts, label='Publicações por Hora', color='blue', alpha=0.5)
-plt.plot(media_movel_posts.index.hour, media_movel_posts, label=f'Média Móvel ({janela_media_movel}h)', color='red')
-plt.axhline(y=limiar_alta_posts, color='green', linestyle='--', label='Limiar Alta Atividade (Pub.)')
-plt.axhline(y=limiar_baixa_posts, color='orange', linestyle='--', label='Limiar Baixa Atividade (Pub.)')
-plt.title('Série Temporal de Publicações por Hora (7 de Outubro de 2018)')
-plt.xlabel('Hora do Dia')
-plt.ylabel('Número de Publicações')
-plt.xticks(range(0, 24, 1))  # Define rótulos de 0 a 23
-plt.legend()
-plt.tight_layout()
-plt.savefig('serie_temporal_publicacoes.png')
-plt.close()
-
-# Gráfico 2: Séries Temporais de Comentários
-if not serie_comentarios.empty:
-    plt.figure(figsize=(12, 9))  # Proporção 4:3
-    plt.plot(serie_comentarios.index.hour, serie_comentarios, label='Comentários por Hora', color='purple', alpha=0.5)
-    plt.plot(media_movel_comentarios.index.hour, media_movel_comentarios, label=f'Média Móvel ({janela_media_movel}h)', color='red')
-    plt.axhline(y=limiar_alta_comentarios, color='green', linestyle='--', label='Limiar Alta Atividade (Com.)')
-    plt.axhline(y=limiar_baixa_comentarios, color='orange', linestyle='--', label='Limiar Baixa Atividade (Com.)')
-    plt.title('Série Temporal de Comentários por Hora (7 de Outubro de 2018)')
-    plt.xlabel('Hora do Dia')
-    plt.ylabel('Número de Comentários')
-    plt.xticks(range(0, 24, 1))  # Define rótulos de 0 a 23
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig('serie_temporal_comentarios.png')
-    plt.close()
-
-# Gráfico 3: Sazonalidade (Média por Hora do Dia)
-fig, ax1 = plt.subplots(figsize=(12, 9))  # Proporção 4:3
-horas = range(24)  # Índices de 0 a 23
-
-# Eixo principal para publicações
-ax1.plot(horas, serie_posts_sazonal.values, label='Publicações (Média por Hora)', color='blue')
-ax1.axhline(y=limiar_alta_posts, color='green', linestyle='--', label='Limiar Alta (Pub.)')
-ax1.axhline(y=limiar_baixa_posts, color='orange', linestyle='--', label='Limiar Baixa (Pub.)')
-ax1.set_title('Sazonalidade - Média por Hora do Dia (7 de Outubro 2018)')
-ax1.set_xlabel('Hora do Dia')
-ax1.set_ylabel('Média de Publicações', color='blue')
-ax1.set_xticks(range(0, 24, 1))  # Mostra todas as horas de 0 a 23
-ax1.tick_params(axis='y', labelcolor='blue')
-ax1.set_ylim(0, 250)  # Escala para publicações (máximo 240)
-
-# Eixo secundário para comentários
-ax2 = ax1.twinx()
-ax2.plot(horas, serie_comentarios_sazonal.values, label='Comentários (Média por Hora)', color='purple')
-ax2.axhline(y=limiar_alta_comentarios, color='green', linestyle='-.', label='Limiar Alta (Com.)')
-ax2.axhline(y=limiar_baixa_comentarios, color='orange', linestyle='-.', label='Limiar Baixa (Com.)')
-ax2.set_ylabel('Média de Comentários', color='purple')
-ax2.tick_params(axis='y', labelcolor='purple')
-ax2.set_ylim(0, 50000)  # Escala para comentários (máximo 48.415)
-
-# Ajuste da legenda combinada
-lines1, labels1 = ax1.get_legend_handles_labels()
-lines2, labels2 = ax2.get_legend_handles_labels()
-ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
-plt.tight_layout()
-plt.savefig('sazonalidade_hora_dia.png')
-plt.close()
+# Gera os gráficos (séries temporais e sazonalidade); ver graficos.py
+with instrumentacao.etapa('graficos'):
+    tarefas = [('serie_temporal', 'serie_temporal_publicacoes.png', {
+        'serie': serie_posts, 'media_movel': media_movel_posts, 'limiares': (limiar_alta_posts, limiar_baixa_posts),
+        'janela': janela_media_movel, 'rotulo': 'Publicações por Hora', 'sigla': 'Pub.', 'cor': 'blue',
+        'titulo': 'Série Temporal de Publicações por Hora (7 de Outubro de 2018)', 'eixo_y': 'Número de Publicações'})]
+    if not serie_comentarios.empty:
+        tarefas.append(('serie_temporal', 'serie_temporal_comentarios.png', {
+            'serie': serie_comentarios, 'media_movel': media_movel_comentarios,
+            'limiares': (limiar_alta_comentarios, limiar_baixa_comentarios), 'janela': janela_media_movel,
+            'rotulo': 'Comentários por Hora', 'sigla': 'Com.', 'cor': 'purple',
+            'titulo': 'Série Temporal de Comentários por Hora (7 de Outubro de 2018)', 'eixo_y': 'Número de Comentários'}))
+    tarefas.append(('sazonalidade', 'sazonalidade_hora_dia.png', {
+        'posts': serie_posts_sazonal, 'comentarios': serie_comentarios_sazonal,
+        'limiares_posts': (limiar_alta_posts, limiar_baixa_posts),
+        'limiares_comentarios': (limiar_alta_comentarios, limiar_baixa_comentarios),
+        'titulo': 'Sazonalidade - Média por Hora do Dia (7 de Outubro 2018)'}))
+    renderizar(tarefas, caminho_registro_graficos, numero_processos_graficos)
 
 # Identifica picos de atividade
 picos_posts = serie_posts[serie_posts >= limiar_alta_posts].sort_values(ascending=False)
@@ -179,4 +142,6 @@ print("\nPrincipais Picos de Publicações (Top 5):")
 print(picos_posts.head(5))
 if not picos_comentarios.empty:
     print("\nPrincipais Picos de Comentários (Top 5):")
-    print(picos_comentarios.head(5))
\ No newline at end of file
+    print(picos_comentarios.head(5))
+
+instrumentacao.finalizar(caminho_metricas, 'AED_analise_temporal.py')
@@ -1,121 +1,137 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
 import os
-import csv
+from armazenamento import escolher_arquivo
+from varredura import AgregadorUsuarios, AgregadorUsuariosAproximado, obter_agregados
+from estatisticas import resumir_serie
+from graficos import renderizar
+import instrumentacao
 
 # Define o caminho do arquivo pré-processado
 caminho_arquivo = "/home/israel/vscode/DoE - Atividade 1/dados_pre_processados_outubro_2018.csv"
 
+# Usa a versão em Parquet (tipada, colunar) quando disponível
+caminho_arquivo = escolher_arquivo(caminho_arquivo)
+
+# Dados particionados por data/hora: quando existem, são lidos no lugar do arquivo único
+diretorio_por_hora = "/home/israel/vscode/DoE - Atividade 1/dados_pre_processados_por_hora"
+usar_particoes = os.path.isdir(diretorio_por_hora)
+
+# Janela das contagens por usuário: None (padrão) usa a fonte inteira, como a análise
+# original. Com (inicio, fim), por exemplo ('2018-10-07', '2018-10-08'), só entram as
+# publicações e os comentários feitos na janela, o que muda as contagens e estatísticas.
+janela_usuarios = None
+
+# Modo aproximado: apenas os rankings Top 10, com memória fixa (Space-Saving + HyperLogLog).
+# erro_topk define o número de contadores (1/erro_topk) e erro_hll_usuarios a precisão das contagens.
+modo_aproximado = False
+erro_topk = 0.001
+erro_hll_usuarios = 0.05
+
+# Diretório dos agregados salvos pela varredura única (AED_varredura.py)
+diretorio_agregados = "/home/israel/vscode/DoE - Atividade 1/agregados"
+
+# Gráficos: gerados em paralelo (backend Agg) e só quando os dados de cada figura
+# mudaram desde a última geração (hashes em caminho_registro_graficos); ver graficos.py
+numero_processos_graficos = os.cpu_count() or 1
+caminho_registro_graficos = os.path.join(diretorio_agregados, 'graficos.json')
+
+# Instrumentação: tempos e contadores por etapa, gravados em JSON no fim da execução
+# (caminho_metricas), com captura opcional de cProfile e tracemalloc; ver instrumentacao.py
+instrumentar = False
+perfil_cprofile = False
+perfil_memoria = False
+caminho_metricas = "metricas_analise_usuarios.json"
+if instrumentar:
+    instrumentacao.ativar(perfil_cprofile, perfil_memoria)
+
+# Define o tamanho do chunk
+tamanho_chunk = 100000
+
+# Memória máxima (MB) para os pares (usuário, publicação/comentário) já vistos antes de gravá-los em disco
+limite_memoria_usuarios_mb = 256
+
 # Verifica se o arquivo existe
-if not os.path.exists(caminho_arquivo):
+if not usar_particoes and not os.path.exists(caminho_arquivo):
     print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado. Reexecute o script de pré-processamento.")
     exit()
 
-# Lê o arquivo inteiro, incluindo media_owner_username
+# Obtém as contagens por usuário (da varredura única ou lendo a fonte em chunks)
 try:
-    dados_usuarios = pd.read_csv(
-        caminho_arquivo,
-        usecols=['media_owner_id', 'created_time', 'created_time_comment', 'comment_id', 'short_code', 'media_owner_username'],
-        encoding='utf-8',
-        quoting=csv.QUOTE_ALL,
-        on_bad_lines='skip',
-        low_memory=False,
-        escapechar='\\',
-        doublequote=True
-    )
-    print(f"Arquivo lido: {len(dados_usuarios)} linhas")
-    print(f"Valores nulos - media_owner_id: {dados_usuarios['media_owner_id'].isna().sum()}")
-    print(f"Valores nulos - short_code: {dados_usuarios['short_code'].isna().sum()}")
-    print(f"Valores nulos - comment_id: {dados_usuarios['comment_id'].isna().sum()}")
-    print(f"Valores nulos - media_owner_username: {dados_usuarios['media_owner_username'].isna().sum()}")
+    if modo_aproximado:
+        agregador = AgregadorUsuariosAproximado(erro_topk, erro_hll_usuarios)
+    else:
+        agregador = AgregadorUsuarios(limite_memoria_usuarios_mb)
+    agregados = obter_agregados(agregador, caminho_arquivo, tamanho_chunk, diretorio_agregados,
+                                diretorio_por_hora, janela_usuarios)
 except Exception as e:
     print(f"Erro ao processar o arquivo: {str(e)}")
     exit()
 
-# Verifica se há dados suficientes
-if dados_usuarios.empty:
-    print("Erro: Subconjunto não contém dados suficientes. Verifique os dados brutos.")
-    exit()
+if modo_aproximado:
+    # Rankings aproximados: contagens estimadas e erro máximo de cada uma
+    top_10_publicacoes = agregados['top_publicacoes'].head(10)
+    top_10_comentarios = agregados['top_comentarios'].head(10)
+    comentarios_por_usuario = top_10_comentarios.set_index('media_owner_id')['comentarios']
 
-# Converte colunas de data
-dados_usuarios['created_time'] = pd.to_datetime(dados_usuarios['created_time'], errors='coerce')
-dados_usuarios['created_time_comment'] = pd.to_datetime(dados_usuarios['created_time_comment'], errors='coerce')
-
-# 1. Contagem de publicações (short_code únicos por media_owner_id)
-publicacoes = dados_usuarios.drop_duplicates(subset=['media_owner_id', 'short_code'])
-publicacoes_por_usuario = publicacoes.groupby('media_owner_id')['short_code'].count().sort_values(ascending=False)
-
-# 2. Contagem de comentários recebidos (comment_id únicos por media_owner_id)
-dados_comentarios = dados_usuarios[~dados_usuarios['comment_id'].isna()].drop_duplicates(subset=['media_owner_id', 'comment_id'])
-comentarios_por_usuario = dados_comentarios.groupby('media_owner_id').size().sort_values(ascending=False)
-
-# 3. Mapeia media_owner_id para media_owner_username
-username_map = dados_usuarios.drop_duplicates(subset=['media_owner_id'])[['media_owner_id', 'media_owner_username']].set_index('media_owner_id')['media_owner_username']
-
-# Top 10 com usernames
-top_10_publicacoes = publicacoes_por_usuario.head(10).reset_index()
-top_10_publicacoes['media_owner_username'] = top_10_publicacoes['media_owner_id'].map(username_map)
-
-top_10_comentarios = comentarios_por_usuario.head(10).reset_index()
-top_10_comentarios['media_owner_username'] = top_10_comentarios['media_owner_id'].map(username_map)
-
-# 4. Estatísticas descritivas para publicações
-stats_publicacoes = {
-    'Média': publicacoes_por_usuario.mean() if not publicacoes_por_usuario.empty else 0,
-    'Mediana': publicacoes_por_usuario.median() if not publicacoes_por_usuario.empty else 0,
-    'Moda': stats.mode(publicacoes_por_usuario, keepdims=True)[0][0] if not publicacoes_por_usuario.empty else 0,
-    'Variância': publicacoes_por_usuario.var(ddof=1) if len(publicacoes_por_usuario) > 1 else 0,
-    'Desvio Padrão': publicacoes_por_usuario.std(ddof=1) if len(publicacoes_por_usuario) > 1 else 0,
-    'Amplitude': publicacoes_por_usuario.max() - publicacoes_por_usuario.min() if not publicacoes_por_usuario.empty else 0
-}
-
-print("\nEstatísticas de Publicações por Usuário (7 de Outubro de 2018):")
-for key, value in stats_publicacoes.items():
-    print(f"{key}: {value:.2f}")
-
-# 5. Estatísticas descritivas para comentários recebidos
-if not comentarios_por_usuario.empty:
-    stats_comentarios = {
-        'Média': comentarios_por_usuario.mean(),
-        'Mediana': comentarios_por_usuario.median(),
-        'Moda': stats.mode(comentarios_por_usuario, keepdims=True)[0][0],
-        'Variância': comentarios_por_usuario.var(ddof=1) if len(comentarios_por_usuario) > 1 else 0,
-        'Desvio Padrão': comentarios_por_usuario.std(ddof=1) if len(comentarios_por_usuario) > 1 else 0,
-        'Amplitude': comentarios_por_usuario.max() - comentarios_por_usuario.min()
-    }
-    print("\nEstatísticas de Comentários Recebidos por Usuário (7 de Outubro de 2018):")
-    for key, value in stats_comentarios.items():
+    if top_10_publicacoes.empty:
+        print("Erro: Subconjunto não contém dados suficientes. Verifique os dados brutos.")
+        exit()
+
+    print(f"\nRankings aproximados (erro relativo padrão das contagens: {agregados['erro_relativo_hll']:.2%})")
+    print(f"Limite de erro do Top-K - publicações: {agregados['limite_erro_publicacoes']:.0f}, comentários: {agregados['limite_erro_comentarios']:.0f}")
+    print("\nTop 10 Usuários - Publicações (aproximado):")
+    print(top_10_publicacoes.to_string(index=False))
+    print("\nTop 10 Usuários - Comentários Recebidos (aproximado):")
+    print(top_10_comentarios.to_string(index=False))
+else:
+    # 1. Contagem de publicações (short_code únicos por media_owner_id)
+    publicacoes_por_usuario = agregados['publicacoes_por_usuario']
+
+    # 2. Contagem de comentários recebidos (comment_id únicos por media_owner_id)
+    comentarios_por_usuario = agregados['comentarios_por_usuario']
+
+    # 3. Mapeia media_owner_id para media_owner_username
+    username_map = agregados['username_map']
+
+    # Verifica se há dados suficientes
+    if publicacoes_por_usuario.empty:
+        print("Erro: Subconjunto não contém dados suficientes. Verifique os dados brutos.")
+        exit()
+
+    # Top 10 com usernames
+    top_10_publicacoes = publicacoes_por_usuario.head(10).reset_index()
+    top_10_publicacoes['media_owner_username'] = top_10_publicacoes['media_owner_id'].map(username_map)
+
+    top_10_comentarios = comentarios_por_usuario.head(10).reset_index()
+    top_10_comentarios['media_owner_username'] = top_10_comentarios['media_owner_id'].map(username_map)
+
+    # 4. Estatísticas descritivas para publicações
+    stats_publicacoes = resumir_serie(publicacoes_por_usuario).resumo()
+
+    print("\nEstatísticas de Publicações por Usuário (7 de Outubro de 2018):")
+    for key, value in stats_publicacoes.items():
         print(f"{key}: {value:.2f}")
 
+    # 5. Estatísticas descritivas para comentários recebidos
+    if not comentarios_por_usuario.empty:
+        stats_comentarios = resumir_serie(comentarios_por_usuario).resumo()
+        print("\nEstatísticas de Comentários Recebidos por Usuário (7 de Outubro de 2018):")
+        for key, value in stats_comentarios.items():
+            print(f"{key}: {value:.2f}")
+
 # 6. Visualizações
-# Gráfico de Barras - Usuários mais ativos (publicações)
-plt.figure(figsize=(12, 9))
-bars = plt.bar(top_10_publicacoes['media_owner_username'], top_10_publicacoes['short_code'], color='blue')
-plt.yticks(range(0, 21, 2))  # Escala de 2 em 2, até 20
-for bar in bars:  # Rótulos no topo das barras
-    yval = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2, yval + 0.5, int(yval), ha='center', va='bottom')
-plt.xticks(rotation=45, ha='right')
-plt.title('Top 10 Usuários - Publicações (7 de Outubro de 2018)')
-plt.xlabel('Nome do Usuário')
-plt.ylabel('Número de Publicações')
-plt.tight_layout()
-plt.savefig('top_usuarios_publicacoes.png')
-plt.close()
-
-# Gráfico de Barras - Usuários mais ativos (comentários recebidos)
-plt.figure(figsize=(12, 9))
-bars = plt.bar(top_10_comentarios['media_owner_username'], top_10_comentarios['media_owner_id'].map(comentarios_por_usuario), color='purple')
-for bar in bars:  # Rótulos no topo das barras
-    yval = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2, yval + 500, f'{int(yval):,}', ha='center', va='bottom')  # Formato com vírgula
-plt.xticks(rotation=45, ha='right')
-plt.title('Top 10 Usuários - Comentários Recebidos (7 de Outubro de 2018)')
-plt.xlabel('Nome do Usuário')
-plt.ylabel('Número de Comentários Recebidos')
-plt.tight_layout()
-plt.savefig('top_usuarios_comentarios.png')
-plt.close()
\ No newline at end of file
+with instrumentacao.etapa('graficos'):
+    renderizar([
+        # Gráfico de Barras - Usuários mais ativos (publicações)
+        ('barras_usuarios', 'top_usuarios_publicacoes.png', {
+            'usuarios': top_10_publicacoes['media_owner_username'], 'valores': top_10_publicacoes['short_code'],
+            'cor': 'blue', 'titulo': 'Top 10 Usuários - Publicações (7 de Outubro de 2018)',
+            'eixo_y': 'Número de Publicações', 'marcas_y': range(0, 21, 2)}),  # Escala de 2 em 2, até 20
+        # Gráfico de Barras - Usuários mais ativos (comentários recebidos)
+        ('barras_usuarios', 'top_usuarios_comentarios.png', {
+            'usuarios': top_10_comentarios['media_owner_username'],
+            'valores': top_10_comentarios['media_owner_id'].map(comentarios_por_usuario),
+            'cor': 'purple', 'titulo': 'Top 10 Usuários - Comentários Recebidos (7 de Outubro de 2018)',
+            'eixo_y': 'Número de Comentários Recebidos', 'formato_rotulo': '{:,d}', 'deslocamento_rotulo': 500})  # Formato com vírgula
+    ], caminho_registro_graficos, numero_processos_graficos)
+
+instrumentacao.finalizar(caminho_metricas, 'AED_analise_usuarios.py')
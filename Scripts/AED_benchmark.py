@@ -0,0 +1,208 @@
+import os
+import re
+import sys
+import json
+import time
+import platform
+import shutil
+import subprocess
+import pandas as pd
+import pyarrow.parquet as pq
+from armazenamento import arquivos_janela
+from dados_sinteticos import gerar_dia, PARAMETROS_PADRAO
+
+# Benchmark do pipeline com dados sintéticos (dados_sinteticos.py): para cada tamanho,
+# gera o arquivo diário bruto, roda o pré-processamento e cada script AED_* em um
+# processo próprio e registra tempo, linhas/s e pico de memória (RSS) de cada etapa.
+# Os scripts rodam sem alterações, a partir de uma cópia com os caminhos de
+# configuração trocados pelos do diretório do benchmark. Cada execução é acrescentada
+# ao histórico em JSON e comparada com a anterior, para que uma regressão apareça
+# antes de uma execução completa sobre os dados reais.
+
+# Diretório de trabalho (dados gerados, saídas e logs de cada tamanho) e histórico
+diretorio_benchmark = "/home/israel/vscode/DoE - Atividade 1/benchmark"
+caminho_historico = os.path.join(diretorio_benchmark, "historico_benchmark.json")
+
+# Linhas por arquivo diário em cada rodada; o dia é o mesmo da análise (janela dos scripts)
+tamanhos = [10000, 100000, 1000000]
+data_benchmark = '2018-10-07'
+semente = 0
+
+# Etapas, na ordem de execução (a primeira gera os dados usados pelas demais)
+etapas = ['AED_pre-processamento.py', 'AED_varredura.py', 'AED_analise_temporal.py', 'AED_analise_usuarios.py',
+          'AED_dist_freq_est_desc.py', 'AED_analise_latencia.py']
+
+# Aumento de tempo (em relação à execução anterior, mesmo tamanho e etapa) tratado como regressão
+tolerancia_regressao = 0.2
+
+diretorio_scripts = os.path.dirname(os.path.abspath(__file__))
+
+# Copia o script para o diretório de trabalho trocando as variáveis de configuração
+# (a primeira atribuição de cada uma, no início da linha). Falha se uma variável usada
+# pelo script não for encontrada, para que uma mudança nos scripts não faça o
+# benchmark medir os caminhos originais.
+def preparar_script(etapa, diretorio, valores):
+    with open(os.path.join(diretorio_scripts, etapa), encoding='utf-8') as f:
+        codigo = f.read()
+    for variavel, valor in valores.items():
+        codigo, trocas = re.subn(rf"^{variavel} = .*$", lambda _: f"{variavel} = {valor!r}", codigo, count=1, flags=re.M)
+        if trocas == 0 and variavel in codigo:
+            raise ValueError(f"Variável de configuração '{variavel}' não encontrada em {etapa}")
+    destino = os.path.join(diretorio, etapa)
+    with open(destino, 'w', encoding='utf-8') as f:
+        f.write(codigo)
+    return destino
+
+# Código que roda cada etapa no processo filho: executa o script como __main__ e, ao
+# sair (inclusive por exit()), grava o pico de RSS do próprio processo. No Linux o
+# pico vem de VmHWM em /proc/self/status, que começa do zero no exec; ru_maxrss
+# herdaria o pico do benchmark (que gera os dados sintéticos em memória)
+MEDIDOR = """
+import os, sys, atexit, runpy
+
+def gravar_pico():
+    pico_kb = None
+    try:
+        with open('/proc/self/status') as status:
+            for linha in status:
+                if linha.startswith('VmHWM:'):
+                    pico_kb = int(linha.split()[1])
+    except OSError:
+        import resource
+        pico_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**10 if sys.platform == 'darwin' else 1)
+    with open(os.environ['BENCHMARK_PICO_RSS'], 'w') as saida:
+        saida.write(str(pico_kb))
+
+atexit.register(gravar_pico)
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(os.path.abspath(sys.argv[0])))
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+# Executa um script e mede o tempo e o pico de RSS do processo (os processos filhos,
+# como os do ajuste de distribuições, não entram no pico)
+def executar(caminho_script, diretorio, caminho_log):
+    caminho_pico = caminho_log + '.pico'
+    if os.path.exists(caminho_pico):
+        os.remove(caminho_pico)
+    ambiente = dict(os.environ, PYTHONPATH=os.pathsep.join([diretorio_scripts, os.environ.get('PYTHONPATH', '')]),
+                    MPLBACKEND='Agg', BENCHMARK_PICO_RSS=caminho_pico)
+    with open(caminho_log, 'w', encoding='utf-8') as log:
+        inicio = time.perf_counter()
+        codigo_saida = subprocess.call([sys.executable, '-c', MEDIDOR, caminho_script], cwd=diretorio, stdout=log,
+                                       stderr=subprocess.STDOUT, env=ambiente)
+        tempo = time.perf_counter() - inicio
+    pico_rss_mb = None
+    if os.path.exists(caminho_pico):
+        with open(caminho_pico, encoding='utf-8') as f:
+            pico_rss_mb = float(f.read()) / 2**10
+    with open(caminho_log, encoding='utf-8', errors='replace') as log:
+        erros = [linha.strip() for linha in log if linha.startswith(('Erro', 'Traceback'))]
+    return tempo, pico_rss_mb, codigo_saida, erros
+
+# Gera o arquivo bruto do tamanho pedido (reaproveitado se já existe com os mesmos parâmetros)
+def preparar_dados(diretorio, tamanho):
+    diretorio_dados = os.path.join(diretorio, 'brutos')
+    caminho = os.path.join(diretorio_dados, f"{data_benchmark}.csv")
+    descricao = {'linhas': tamanho, 'data': data_benchmark, 'semente': semente, 'parametros': PARAMETROS_PADRAO}
+    caminho_meta = caminho + '.json'
+    if os.path.exists(caminho) and os.path.exists(caminho_meta):
+        with open(caminho_meta, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['descricao'] == descricao:
+            return caminho, meta['linhas_gravadas']
+    os.makedirs(diretorio_dados, exist_ok=True)
+    print(f"Gerando {tamanho} linhas sintéticas em: {caminho}")
+    linhas_gravadas = gerar_dia(caminho, data_benchmark, tamanho, semente)
+    with open(caminho_meta, 'w', encoding='utf-8') as f:
+        json.dump({'descricao': descricao, 'linhas_gravadas': linhas_gravadas}, f)
+    return caminho, linhas_gravadas
+
+# Linhas lidas pelas análises: as das partições da janela analisada
+def linhas_da_janela(diretorio_por_hora):
+    inicio = pd.Timestamp(data_benchmark)
+    arquivos = arquivos_janela(diretorio_por_hora, inicio, inicio + pd.Timedelta(days=1))
+    return sum(pq.ParquetFile(arquivo).metadata.num_rows for arquivo in arquivos)
+
+def versao_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=diretorio_scripts, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def carregar_historico():
+    if not os.path.exists(caminho_historico):
+        return []
+    with open(caminho_historico, encoding='utf-8') as f:
+        return json.load(f)
+
+# Resultado mais recente de cada (etapa, tamanho) bem-sucedido no histórico
+def referencias(historico):
+    anteriores = {}
+    for execucao in historico:
+        for resultado in execucao['resultados']:
+            if resultado['codigo_saida'] == 0 and not resultado['erros']:
+                anteriores[(resultado['etapa'], resultado['tamanho'])] = resultado
+    return anteriores
+
+historico = carregar_historico()
+anteriores = referencias(historico)
+execucao = {'inicio': pd.Timestamp.now().isoformat(timespec='seconds'), 'commit': versao_codigo(),
+            'python': platform.python_version(), 'plataforma': platform.platform(), 'cpus': os.cpu_count(),
+            'resultados': []}
+
+for tamanho in tamanhos:
+    diretorio = os.path.join(diretorio_benchmark, f"tamanho_{tamanho}")
+    caminho_bruto, linhas_brutas = preparar_dados(diretorio, tamanho)
+    diretorio_por_hora = os.path.join(diretorio, "dados_pre_processados_por_hora")
+    diretorio_agregados = os.path.join(diretorio, "agregados")
+    valores = {
+        'arquivos_outubro_2018': [caminho_bruto],
+        'modo_ingestao': 'dia',
+        'caminho_arquivo': os.path.join(diretorio, "dados_pre_processados_outubro_2018.csv"),
+        'diretorio_por_hora': diretorio_por_hora,
+        'diretorio_agregados': diretorio_agregados
+    }
+
+    for etapa in etapas:
+        if etapa == 'AED_pre-processamento.py':
+            # Saídas de uma rodada anterior seriam regravadas; as partições por hora acumulariam
+            shutil.rmtree(diretorio_por_hora, ignore_errors=True)
+            linhas = linhas_brutas
+        else:
+            linhas = linhas_da_janela(diretorio_por_hora) if os.path.isdir(diretorio_por_hora) else 0
+        # Cada análise calcula os agregados (e ajustes) do zero
+        shutil.rmtree(diretorio_agregados, ignore_errors=True)
+
+        caminho_script = preparar_script(etapa, diretorio, valores)
+        tempo, pico_rss_mb, codigo_saida, erros = executar(caminho_script, diretorio,
+                                                            os.path.join(diretorio, etapa.replace('.py', '.log')))
+        resultado = {'etapa': etapa, 'tamanho': tamanho, 'linhas': linhas, 'tempo_s': round(tempo, 3),
+                     'linhas_por_s': round(linhas / tempo, 1) if tempo > 0 else None,
+                     'pico_rss_mb': round(pico_rss_mb, 1) if pico_rss_mb is not None else None,
+                     'codigo_saida': codigo_saida, 'erros': erros[:5]}
+        execucao['resultados'].append(resultado)
+
+        anterior = anteriores.get((etapa, tamanho))
+        variacao = resultado['tempo_s'] / anterior['tempo_s'] - 1 if anterior and anterior['tempo_s'] else None
+        resultado['variacao_tempo'] = round(variacao, 3) if variacao is not None else None
+        situacao = 'ERRO' if codigo_saida != 0 or erros else ('REGRESSÃO' if variacao is not None and variacao > tolerancia_regressao else 'ok')
+        print(f"{etapa} ({tamanho} linhas): {tempo:.2f} s, {resultado['linhas_por_s']} linhas/s, "
+              f"pico de RSS {resultado['pico_rss_mb']} MB [{situacao}]")
+
+historico.append(execucao)
+os.makedirs(diretorio_benchmark, exist_ok=True)
+with open(caminho_historico + '.tmp', 'w', encoding='utf-8') as f:
+    json.dump(historico, f, indent=2, ensure_ascii=False)
+os.replace(caminho_historico + '.tmp', caminho_historico)
+
+# Resumo da execução, com a variação de tempo em relação à execução anterior
+tabela = pd.DataFrame(execucao['resultados'])
+print("\nResumo do benchmark:")
+print(tabela[['etapa', 'tamanho', 'linhas', 'tempo_s', 'linhas_por_s', 'pico_rss_mb', 'variacao_tempo']].to_string(index=False))
+regressoes = tabela[pd.to_numeric(tabela['variacao_tempo']) > tolerancia_regressao]
+if not regressoes.empty:
+    print(f"\nRegressões (tempo mais de {tolerancia_regressao:.0%} acima da execução anterior):")
+    print(regressoes[['etapa', 'tamanho', 'tempo_s', 'variacao_tempo']].to_string(index=False))
+print(f"\nHistórico salvo em: {caminho_historico}")
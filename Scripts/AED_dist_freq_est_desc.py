@@ -1,77 +1,58 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
-from fitter import Fitter
 import os
-import csv
+from armazenamento import escolher_arquivo
+from varredura import AgregadorDistribuicao, AgregadorUsuarios, obter_agregados
+from ajuste_distribuicoes import ajustar_serie, DISTRIBUICOES_PADRAO
+from estatisticas import resumir_serie
+from graficos import renderizar
+import instrumentacao
 
 # Define o caminho do arquivo
 caminho_arquivo = "/home/israel/vscode/DoE - Atividade 1/dados_pre_processados_outubro_2018.csv"
 
+# Usa a versão em Parquet (tipada, colunar) quando disponível
+caminho_arquivo = escolher_arquivo(caminho_arquivo)
+
+# Dados particionados por data/hora: quando existem, apenas as partições da janela são lidas
+diretorio_por_hora = "/home/israel/vscode/DoE - Atividade 1/dados_pre_processados_por_hora"
+inicio_janela = '2018-10-07'
+fim_janela = '2018-10-08'
+usar_particoes = os.path.isdir(diretorio_por_hora)
+
 # Verifica se o arquivo existe
-if not os.path.exists(caminho_arquivo):
+if not usar_particoes and not os.path.exists(caminho_arquivo):
     print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado. Reexecute o script de pré-processamento.")
     exit()
 
 # Define o tamanho do chunk
 tamanho_chunk = 10000
 
-# Inicializa séries para contagens por hora
-posts_por_hora = pd.Series(dtype=int)
-comentarios_por_hora = pd.Series(dtype=int)
+# Diretório dos agregados salvos pela varredura única (AED_varredura.py)
+diretorio_agregados = "/home/israel/vscode/DoE - Atividade 1/agregados"
 
-# Função para processar cada chunk
-def processar_chunk(chunk, chunk_num):
-    print(f"Processando chunk {chunk_num}: {len(chunk)} linhas")
-    print(f"Valores nulos - created_time: {chunk['created_time'].isna().sum()}, created_time_comment: {chunk['created_time_comment'].isna().sum()}")
-    
-    # Converte colunas de data
-    chunk['created_time'] = pd.to_datetime(chunk['created_time'], errors='coerce')
-    chunk['created_time_comment'] = pd.to_datetime(chunk['created_time_comment'], errors='coerce')
-    
-    # Filtra created_time_comment para 7 de outubro de 2018
-    data_alvo = pd.Timestamp('2018-10-07')
-    mascara_data_coment = chunk['created_time_comment'].dt.date == data_alvo.date()
-    chunk = chunk[mascara_data_coment | chunk['created_time_comment'].isna()]
-    
-    # Extrai hora
-    chunk['hora_post'] = chunk['created_time'].dt.floor('h')
-    chunk['hora_comentario'] = chunk['created_time_comment'].dt.floor('h')
-    
-    # Conta publicações (usando short_code único por hora)
-    posts = chunk.drop_duplicates(subset=['short_code']).groupby('hora_post').size()
-    comentarios = chunk.groupby('hora_comentario').size() if not chunk['created_time_comment'].isna().all() else pd.Series(dtype=int)
-    
-    print(f"Publicações por hora: {len(posts)}, Comentários por hora: {len(comentarios)}")
-    return posts, comentarios
+# Gráficos: gerados em paralelo (backend Agg) e só quando os dados de cada figura
+# mudaram desde a última geração (hashes em caminho_registro_graficos); ver graficos.py
+numero_processos_graficos = os.cpu_count() or 1
+caminho_registro_graficos = os.path.join(diretorio_agregados, 'graficos.json')
 
-# Lê os chunks
+# Instrumentação: tempos e contadores por etapa, gravados em JSON no fim da execução
+# (caminho_metricas), com captura opcional de cProfile e tracemalloc; ver instrumentacao.py
+instrumentar = False
+perfil_cprofile = False
+perfil_memoria = False
+caminho_metricas = "metricas_dist_freq_est_desc.json"
+if instrumentar:
+    instrumentacao.ativar(perfil_cprofile, perfil_memoria)
+
+# Obtém as contagens por hora de 7 de outubro de 2018 (da varredura única ou lendo a fonte em chunks)
 try:
-    chunk_count = 0
-    for chunk in pd.read_csv(
-        caminho_arquivo,
-        chunksize=tamanho_chunk,
-        usecols=['created_time', 'created_time_comment', 'short_code'],
-        encoding='utf-8',
-        quoting=csv.QUOTE_ALL,
-        on_bad_lines='skip',
-        low_memory=False,
-        escapechar='\\',
-        doublequote=True
-    ):
-        chunk_count += 1
-        posts, comentarios = processar_chunk(chunk, chunk_count)
-        posts_por_hora = posts_por_hora.add(posts, fill_value=0)
-        comentarios_por_hora = comentarios_por_hora.add(comentarios, fill_value=0)
+    agregados = obter_agregados(AgregadorDistribuicao('2018-10-07'), caminho_arquivo, tamanho_chunk, diretorio_agregados,
+                                diretorio_por_hora, (inicio_janela, fim_janela))
 except Exception as e:
     print(f"Erro ao processar o subconjunto: {str(e)}")
     exit()
 
-# Remove NaN e converte para inteiros
-posts_por_hora = posts_por_hora.dropna().astype(int)
-comentarios_por_hora = comentarios_por_hora.dropna().astype(int)
+posts_por_hora = agregados['posts_por_hora']
+comentarios_por_hora = agregados['comentarios_por_hora']
 
 # Verifica se há dados suficientes
 if posts_por_hora.empty:
@@ -79,12 +60,13 @@ if posts_por_hora.empty:
     exit()
 
 # Estatísticas descritivas para publicações
-mean_posts = posts_por_hora.mean()
-median_posts = posts_por_hora.median()
-mode_posts = stats.mode(posts_por_hora, keepdims=True)[0][0]
-variance_posts = posts_por_hora.var(ddof=1) if len(posts_por_hora) > 1 else 0
-std_dev_posts = posts_por_hora.std(ddof=1) if len(posts_por_hora) > 1 else 0
-range_posts = posts_por_hora.max() - posts_por_hora.min()
+estatisticas_posts = resumir_serie(posts_por_hora).resumo()
+mean_posts = estatisticas_posts['Média']
+median_posts = estatisticas_posts['Mediana']
+mode_posts = estatisticas_posts['Moda']
+variance_posts = estatisticas_posts['Variância']
+std_dev_posts = estatisticas_posts['Desvio Padrão']
+range_posts = estatisticas_posts['Amplitude']
 
 # Imprime estatísticas para publicações
 print("\nEstatísticas para Publicações por Hora (Subconjunto):")
@@ -97,12 +79,13 @@ print(f"Amplitude: {range_posts:.2f}")
 
 # Estatísticas descritivas para comentários (se disponíveis)
 if not comentarios_por_hora.empty:
-    mean_comments = comentarios_por_hora.mean()
-    median_comments = comentarios_por_hora.median()
-    mode_comments = stats.mode(comentarios_por_hora, keepdims=True)[0][0]
-    variance_comments = comentarios_por_hora.var(ddof=1) if len(comentarios_por_hora) > 1 else 0
-    std_dev_comments = comentarios_por_hora.std(ddof=1) if len(comentarios_por_hora) > 1 else 0
-    range_comments = comentarios_por_hora.max() - comentarios_por_hora.min()
+    estatisticas_comentarios = resumir_serie(comentarios_por_hora).resumo()
+    mean_comments = estatisticas_comentarios['Média']
+    median_comments = estatisticas_comentarios['Mediana']
+    mode_comments = estatisticas_comentarios['Moda']
+    variance_comments = estatisticas_comentarios['Variância']
+    std_dev_comments = estatisticas_comentarios['Desvio Padrão']
+    range_comments = estatisticas_comentarios['Amplitude']
     
     print("\nEstatísticas para Comentários por Hora (Subconjunto):")
     print(f"Média: {mean_comments:.2f}")
@@ -113,43 +96,55 @@ if not comentarios_por_hora.empty:
     print(f"Amplitude: {range_comments:.2f}")
 
 # Visualizações
-plt.figure(figsize=(12, 9))  # Proporção 4:3
-
-# Histograma - Publicações
-plt.subplot(2, 2, 1)
-plt.hist(posts_por_hora, bins=10, density=True, alpha=0.7, color='blue')
-plt.title('Histograma - Publicações por Hora')
-plt.xlabel('Número de Publicações')
-plt.ylabel('Densidade')
-
-# Box Plot - Publicações
-plt.subplot(2, 2, 2)
-sns.boxplot(data=posts_por_hora, color='green')
-plt.title('Box Plot - Publicações por Hora')
-plt.ylabel('Número de Publicações')
-
-# CDF - Publicações
-plt.subplot(2, 2, 3)
-sorted_posts = np.sort(posts_por_hora)
-cdf = np.arange(1, len(sorted_posts) + 1) / len(sorted_posts)
-plt.plot(sorted_posts, cdf, color='red')
-plt.title('CDF - Publicações por Hora')
-plt.xlabel('Número de Publicações')
-plt.ylabel('Probabilidade Cumulativa')
-
-# Histograma - Comentários (se disponíveis)
-if not comentarios_por_hora.empty:
-    plt.subplot(2, 2, 4)
-    plt.hist(comentarios_por_hora, bins=10, density=True, alpha=0.7, color='purple')
-    plt.title('Histograma - Comentários por Hora')
-    plt.xlabel('Número de Comentários')
-    plt.ylabel('Densidade')
-
-plt.tight_layout()
-plt.savefig('instagram_exploratory_analysis_subset.png')
-plt.close()
-
-# Ajuste de distribuição para publicações
-f = Fitter(posts_por_hora, distributions=['expon', 'gamma', 'lognorm'])
-f.fit()
-f.summary()
\ No newline at end of file
+with instrumentacao.etapa('graficos'):
+    renderizar([('painel_distribuicao', 'instagram_exploratory_analysis_subset.png',
+                 {'posts': posts_por_hora, 'comentarios': comentarios_por_hora})],
+               caminho_registro_graficos, numero_processos_graficos)
+
+# Ajuste de distribuições: candidatas do scipy.stats ajustadas em paralelo (um
+# processo por distribuição, com tempo limite), ordenadas pelo critério escolhido:
+# 'sse' (erro quadrático em relação ao histograma, o critério do Fitter da análise
+# original), 'aic', 'bic' ou 'ks'. Ajustes rejeitados pelo teste KS ao nível
+# nivel_ks_ajuste ficam depois dos aceitos, e ajustes degenerados (log-verossimilhança
+# não finita) entre as falhas, para que AIC/BIC não escolham um ajuste que não
+# descreve os dados (ver ajuste_distribuicoes.py). Séries maiores que
+# tamanho_maximo_amostra são subamostradas e ajustes já feitos para a mesma série
+# são lidos do cache.
+distribuicoes_candidatas = DISTRIBUICOES_PADRAO
+criterio_ajuste = 'sse'
+nivel_ks_ajuste = 0.05
+tempo_limite_ajuste = 60
+tamanho_maximo_amostra = 10000
+numero_processos_ajuste = os.cpu_count() or 1
+diretorio_cache_ajustes = os.path.join(diretorio_agregados, 'ajustes')
+
+# Séries por usuário (publicações e comentários recebidos). Como em
+# AED_analise_usuarios.py, janela_usuarios = None usa a fonte inteira; com
+# (inicio_janela, fim_janela), só as publicações e os comentários feitos na janela
+ajustar_series_usuarios = True
+janela_usuarios = None
+limite_memoria_usuarios_mb = 256
+
+series_para_ajuste = {'Publicações por Hora': posts_por_hora, 'Comentários por Hora': comentarios_por_hora}
+if ajustar_series_usuarios:
+    try:
+        usuarios = obter_agregados(AgregadorUsuarios(limite_memoria_usuarios_mb), caminho_arquivo, tamanho_chunk, diretorio_agregados,
+                                   diretorio_por_hora, janela_usuarios)
+        series_para_ajuste['Publicações por Usuário'] = usuarios['publicacoes_por_usuario']
+        series_para_ajuste['Comentários Recebidos por Usuário'] = usuarios['comentarios_por_usuario']
+    except Exception as e:
+        print(f"Erro ao obter as contagens por usuário: {str(e)}")
+
+for nome_serie, serie in series_para_ajuste.items():
+    if serie.empty:
+        continue
+    with instrumentacao.etapa('ajuste_distribuicoes'):
+        ranking = ajustar_serie(serie, distribuicoes_candidatas, criterio_ajuste, numero_processos_ajuste,
+                                tempo_limite_ajuste, tamanho_maximo_amostra, diretorio_cache_ajustes, nivel_ks_ajuste)
+    print(f"\nAjuste de Distribuições - {nome_serie} (melhores por {criterio_ajuste.upper()}):")
+    print(ranking[['distribuicao', 'aic', 'bic', 'ks_estatistica', 'ks_p_valor', 'erro_quadratico', 'rejeitado_ks']].head(5).to_string(index=False))
+    falhas = ranking[ranking['erro'].notna()]
+    if not falhas.empty:
+        print("Ajustes não concluídos: " + ", ".join(f"{linha.distribuicao} ({linha.erro})" for linha in falhas.itertuples()))
+
+instrumentacao.finalizar(caminho_metricas, 'AED_dist_freq_est_desc.py')
@@ -0,0 +1,94 @@
+import os
+import numpy as np
+import pandas as pd
+from varredura import ler_agregados_salvos
+from piramide import consultar, estatisticas_moveis
+from estatisticas import resumir_serie
+from latencia import curva_decaimento
+from graficos import renderizar
+import instrumentacao
+
+# Etapa de gráficos separada das análises: a partir dos agregados já salvos
+# (AED_varredura.py ou os scripts AED_*), gera as séries temporais por hora de cada
+# dia da pirâmide e as curvas de decaimento de cada um dos usuários com mais
+# comentários, sem reler os dados. Só as figuras cujos dados mudaram desde a última
+# geração são desenhadas, em processos paralelos (ver graficos.py).
+
+# Diretório dos agregados salvos pela varredura única (AED_varredura.py)
+diretorio_agregados = "/home/israel/vscode/DoE - Atividade 1/agregados"
+
+# Diretório das figuras geradas
+diretorio_graficos = "/home/israel/vscode/DoE - Atividade 1/graficos"
+
+# Dias das séries temporais (None = todos os dias com publicações na pirâmide salva)
+dias = None
+janela_media_movel = 24
+
+# Número de usuários (com mais comentários recebidos) com curva de decaimento própria
+numero_usuarios = 20
+
+# Processos de desenho e registro dos hashes das figuras já geradas
+numero_processos_graficos = os.cpu_count() or 1
+caminho_registro_graficos = os.path.join(diretorio_agregados, 'graficos.json')
+
+# Instrumentação: tempos e contadores por etapa, gravados em JSON no fim da execução
+# (caminho_metricas), com captura opcional de cProfile e tracemalloc; ver instrumentacao.py
+instrumentar = False
+perfil_cprofile = False
+perfil_memoria = False
+caminho_metricas = "metricas_graficos.json"
+if instrumentar:
+    instrumentacao.ativar(perfil_cprofile, perfil_memoria)
+
+piramide = ler_agregados_salvos('piramide', diretorio_agregados)
+latencia = ler_agregados_salvos('latencia', diretorio_agregados)
+if piramide is None and latencia is None:
+    print(f"Erro: Nenhum agregado salvo em '{diretorio_agregados}'. Execute AED_varredura.py antes.")
+    exit()
+
+os.makedirs(diretorio_graficos, exist_ok=True)
+tarefas = []
+
+# 1. Séries temporais por hora de cada dia (publicações e comentários), com média móvel
+# e limiares de alta e baixa atividade (percentis 90 e 10) do próprio dia
+if piramide is not None:
+    piramide = piramide['resultado']
+    por_dia = piramide['dia']
+    datas = pd.to_datetime(dias) if dias is not None else por_dia.index[por_dia['publicacoes'] > 0]
+    for dia in datas:
+        contagens = consultar(piramide, 'hora', dia, dia + pd.Timedelta(days=1))
+        for coluna, rotulo, sigla, cor in [('publicacoes', 'Publicações', 'Pub.', 'blue'),
+                                           ('comentarios', 'Comentários', 'Com.', 'purple')]:
+            serie = contagens[coluna].rename(None)
+            if serie.sum() == 0:
+                continue
+            quantis = resumir_serie(serie)
+            tarefas.append(('serie_temporal', os.path.join(diretorio_graficos, f"serie_temporal_{coluna}_{dia:%Y-%m-%d}.png"), {
+                'serie': serie, 'media_movel': estatisticas_moveis(serie, janela_media_movel)['media'],
+                'limiares': (quantis.quantil(0.90), quantis.quantil(0.10)), 'janela': janela_media_movel,
+                'rotulo': f'{rotulo} por Hora', 'sigla': sigla, 'cor': cor,
+                'titulo': f'Série Temporal de {rotulo} por Hora ({dia:%d/%m/%Y})', 'eixo_y': f'Número de {rotulo}'}))
+else:
+    print(f"Aviso: Pirâmide temporal não encontrada em '{diretorio_agregados}'; séries por dia não geradas.")
+
+# 2. Curva de decaimento de cada usuário com mais comentários, comparada à geral
+if latencia is not None:
+    bins_por_decada = latencia['parametros']['bins_por_decada']
+    latencia = latencia['resultado']
+    bordas = latencia['bordas']
+    limites = np.append(bordas[1:], bordas[-1] * 10**(1 / bins_por_decada))
+    geral = curva_decaimento(latencia['histograma'])
+    por_dono = latencia['por_dono']
+    top_donos = por_dono.sum(axis=1).sort_values(ascending=False).head(numero_usuarios).index
+    for dono, curva in zip(top_donos, curva_decaimento(por_dono.loc[top_donos].to_numpy())):
+        tarefas.append(('decaimento_engajamento', os.path.join(diretorio_graficos, f"decaimento_engajamento_{dono}.png"), {
+            'limites': limites, 'geral': geral, 'curvas': {f'Usuário {dono}': curva},
+            'titulo': f'Decaimento do Engajamento - Usuário {dono}'}))
+else:
+    print(f"Aviso: Agregados de latência não encontrados em '{diretorio_agregados}'; curvas por usuário não geradas.")
+
+with instrumentacao.etapa('graficos'):
+    renderizar(tarefas, caminho_registro_graficos, numero_processos_graficos)
+print(f"Gráficos em: {diretorio_graficos}")
+
+instrumentacao.finalizar(caminho_metricas, 'AED_graficos.py')
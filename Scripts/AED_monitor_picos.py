@@ -0,0 +1,152 @@
+import os
+import csv
+import glob
+import time
+import queue
+import threading
+import pandas as pd
+from monitoramento import AcompanhadorDiretorio, MonitorPicos, COLUNAS_MONITORAMENTO
+import instrumentacao
+
+# Monitoramento de picos de atividade enquanto os dados chegam: uma thread acompanha
+# o diretório dos arquivos diários brutos e entrega as linhas novas (e os arquivos
+# novos) a cada intervalo_verificacao segundos; o processo principal conta
+# publicações e comentários por minuto e por hora, no geral e para os donos com mais
+# comentários recebidos, e sinaliza os períodos muito acima da linha de base móvel
+# (EWMA), inclusive o período em andamento. Diferente de AED_analise_temporal.py,
+# que encontra os picos depois do dia completo, com um limiar fixo (percentil 90).
+# Ver monitoramento.py.
+
+# Diretório e padrão dos arquivos diários brutos
+diretorio_dados = "/home/israel/Downloads/Instagram Data/smartdata_ig/data/BR/"
+padrao_arquivos = os.path.join(diretorio_dados, "*.csv")
+
+# Primeiro arquivo lido (nome AAAA-MM-DD.csv). None = o arquivo mais recente já
+# existente, lido desde o início para formar a linha de base; arquivos novos
+# (dias seguintes) são acompanhados conforme aparecem
+primeiro_arquivo = None
+
+# Acompanha continuamente (True) ou lê o que já existe e termina (False, para
+# reprocessar um dia e conferir os picos); duracao_maxima_s limita o acompanhamento
+acompanhar = True
+intervalo_verificacao = 5
+duracao_maxima_s = None
+
+# Níveis monitorados e donos com série própria (None = os numero_donos com mais
+# comentários recebidos até o momento)
+niveis = ['minuto', 'hora']
+numero_donos = 10
+donos = None
+
+# Detector: peso de cada período novo na linha de base (alfa), desvios acima da linha
+# de base para sinalizar (limiar), contagem mínima de um pico e períodos de aquecimento
+# (no nível de hora, `aquecimento` horas: com primeiro_arquivo em um dia anterior, a
+# linha de base já começa formada)
+alfa = 0.05
+limiar = 4.0
+minimo = 10
+aquecimento = 30
+
+# Atraso tolerado (eventos fora de ordem) antes de fechar um período: o quantil_atraso
+# dos atrasos observados nos dados, no mínimo atraso_minimo. O mesmo quantil descarta,
+# no início de cada série, os eventos muito mais antigos que os demais
+atraso_minimo = pd.Timedelta(minutes=2)
+quantil_atraso = 0.999
+
+# Tamanho dos blocos lidos de cada arquivo e memória dos IDs já vistos
+tamanho_bloco_mb = 16
+limite_memoria_mb = 256
+
+# Picos sinalizados também são acrescentados a este CSV
+caminho_alertas = "picos_atividade.csv"
+
+# Instrumentação: tempos e contadores por etapa, gravados em JSON no fim da execução
+# (caminho_metricas), com captura opcional de cProfile e tracemalloc; ver instrumentacao.py
+instrumentar = False
+perfil_cprofile = False
+perfil_memoria = False
+caminho_metricas = "metricas_monitor_picos.json"
+if instrumentar:
+    instrumentacao.ativar(perfil_cprofile, perfil_memoria)
+
+existentes = sorted(glob.glob(padrao_arquivos))
+if primeiro_arquivo is None:
+    if not existentes and not acompanhar:
+        print(f"Erro: Nenhum arquivo encontrado em '{diretorio_dados}'.")
+        exit()
+    primeiro_arquivo = os.path.basename(existentes[-1]) if existentes else None
+
+acompanhador = AcompanhadorDiretorio(padrao_arquivos, COLUNAS_MONITORAMENTO, primeiro_arquivo, tamanho_bloco_mb)
+monitor = MonitorPicos(niveis, numero_donos, donos, atraso_minimo, quantil_atraso, limite_memoria_mb,
+                       alfa=alfa, limiar=limiar, minimo=minimo, aquecimento=aquecimento)
+
+# Thread de leitura: coloca (arquivo, chunk) na fila; None indica o fim da leitura.
+# A fila limitada segura a leitura quando a detecção fica para trás.
+FIM = None
+fila = queue.Queue(maxsize=4)
+parar = threading.Event()
+
+def acompanhar_diretorio():
+    try:
+        while not parar.is_set():
+            for item in acompanhador.novas_linhas():
+                fila.put(item)
+                if parar.is_set():
+                    break
+            if not acompanhar:
+                break
+            parar.wait(intervalo_verificacao)
+    except Exception as e:
+        print(f"Erro ao ler os arquivos: {str(e)}")
+    finally:
+        fila.put(FIM)
+
+def registrar_picos(picos):
+    for pico in picos:
+        print(f"PICO [{pico['situacao']}] {pico['periodo']} ({pico['nivel']}) {pico['serie']} - {pico['tipo']}: "
+              f"{pico['valor']} (linha de base {pico['linha_de_base']:.1f}, {pico['escore']:.1f} desvios)")
+    if picos:
+        novo = not os.path.exists(caminho_alertas)
+        pd.DataFrame(picos).to_csv(caminho_alertas, mode='a', header=novo, index=False, quoting=csv.QUOTE_ALL)
+
+leitura = threading.Thread(target=acompanhar_diretorio, daemon=True)
+leitura.start()
+inicio = time.monotonic()
+total_picos = 0
+print(f"Monitorando: {padrao_arquivos} (a partir de {primeiro_arquivo}; Ctrl+C para encerrar)")
+try:
+    while True:
+        if duracao_maxima_s is not None and time.monotonic() - inicio > duracao_maxima_s:
+            break
+        try:
+            item = fila.get(timeout=intervalo_verificacao)
+        except queue.Empty:
+            continue
+        if item is FIM:
+            break
+        arquivo, chunk = item
+        instrumentacao.contar('linhas', len(chunk))
+        with instrumentacao.etapa('deteccao'):
+            picos = monitor.processar(chunk)
+        registrar_picos(picos)
+        total_picos += len(picos)
+except KeyboardInterrupt:
+    print("\nMonitoramento interrompido.")
+finally:
+    parar.set()
+
+# Sem acompanhamento contínuo, os dados terminaram: fecha os períodos restantes
+if not acompanhar:
+    picos = monitor.verificar(final=True)
+    registrar_picos(picos)
+    total_picos += len(picos)
+monitor.fechar()
+
+print(f"\nLinhas processadas: {monitor.linhas}")
+print(f"Linhas malformadas ignoradas: {acompanhador.linhas_ignoradas}")
+print(f"Eventos atrasados (períodos já fechados): {monitor.atrasados()}")
+print(f"Atraso tolerado: comentários {monitor.atraso_tolerado('comentarios').round('s')}, publicações {monitor.atraso_tolerado('publicacoes').round('s')}")
+print(f"Séries monitoradas: {len(monitor.series)} ({len(monitor.donos_monitorados)} donos)")
+print(f"Picos sinalizados: {total_picos}" + (f" (salvos em: {caminho_alertas})" if total_picos else ""))
+
+instrumentacao.finalizar(caminho_metricas, 'AED_monitor_picos.py')
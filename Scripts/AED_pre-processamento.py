@@ -1,7 +1,17 @@
 import pandas as pd
+import numpy as np
 import os
 import glob
 import csv
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from deduplicacao import DeduplicadorGlobal, hash_linhas
+from armazenamento import EscritorParquet, particionar_por_hora
+from leitura import LeitorCSV
+from datas import converter_datas_vetorizado
+import instrumentacao
+from instrumentacao import etapa, contar, medir_iteracao
+import pyarrow.parquet as pq
 
 # Define o diretório onde os arquivos .csv estão localizados
 diretorio_dados = "/home/israel/Downloads/Instagram Data/smartdata_ig/data/BR/"
@@ -9,71 +19,409 @@ diretorio_dados = "/home/israel/Downloads/Instagram Data/smartdata_ig/data/BR/"
 # Define a lista de arquivos .csv para 7 de outubro de 2018
 arquivos_outubro_2018 = glob.glob(os.path.join(diretorio_dados, "2018-10-07.csv"))
 
-# Função para converter timestamps ou datetimes
-def converter_data(valor):
-    try:
-        # Se for timestamp numérico (UNIX)
-        if isinstance(valor, (int, float)) or (isinstance(valor, str) and valor.isdigit()):
-            return pd.to_datetime(int(valor), unit='s')
-        # Se for string no formato datetime
-        return pd.to_datetime(valor, errors='coerce')
-    except:
-        return pd.NaT
-
-def pre_processar_chunk(chunk):
+# Modo de ingestão:
+#   'dia'       - processa apenas os arquivos acima, gerando um único CSV
+#   'intervalo' - processa todos os arquivos diários entre as datas abaixo em paralelo,
+#                 gerando uma partição (CSV) por dia; arquivos já processados são pulados
+modo_ingestao = 'dia'
+data_inicio_ingestao = '2018-09-01'
+data_fim_ingestao = '2019-11-10'
+numero_processos = os.cpu_count() or 1
+
+# Define os caminhos de saída
+caminho_raiz = os.path.dirname(os.path.abspath(__file__))
+caminho_saida = os.path.join(caminho_raiz, "dados_pre_processados_outubro_2018.csv")
+caminho_saida_parquet = os.path.join(caminho_raiz, "dados_pre_processados_outubro_2018.parquet")
+diretorio_particoes = os.path.join(caminho_raiz, "dados_pre_processados_particoes")
+diretorio_por_hora = os.path.join(caminho_raiz, "dados_pre_processados_por_hora")
+
+# Também grava o conjunto em Parquet (formato colunar tipado lido pelos scripts de análise)
+salvar_parquet = True
+
+# Também redistribui o Parquet em partições por data/hora do comentário, para que as
+# análises de uma janela de tempo leiam apenas as partições da janela (requer salvar_parquet)
+salvar_por_hora = True
+
+# Tamanho do chunk
+tamanho_chunk = 100000
+
+# Backend de leitura dos arquivos brutos: 'pyarrow' (várias threads, arquivo mapeado
+# em memória) ou 'pandas' (motor C, uma thread)
+backend_csv = 'pyarrow'
+
+# Instrumentação: tempos e contadores por etapa, gravados em JSON no fim da execução
+# (caminho_metricas), com captura opcional de cProfile e tracemalloc; ver instrumentacao.py
+instrumentar = False
+perfil_cprofile = False
+perfil_memoria = False
+caminho_metricas = os.path.join(caminho_raiz, "metricas_pre_processamento.json")
+
+# Memória máxima (MB) para os hashes de deduplicação antes de gravá-los em disco
+# (no modo 'intervalo', dividida entre os processos)
+limite_memoria_deduplicacao_mb = 512
+
+def pre_processar_chunk(chunk, deduplicador):
     # Converte colunas de data
-    chunk['created_time'] = chunk['created_time'].apply(converter_data)
-    chunk['created_time_comment'] = chunk['created_time_comment'].apply(converter_data)
+    with etapa('datas'):
+        chunk['created_time'], falhas_post = converter_datas_vetorizado(chunk['created_time'])
+        chunk['created_time_comment'], falhas_comentario = converter_datas_vetorizado(chunk['created_time_comment'])
 
-    # Remove duplicatas completas (linhas inteiras iguais)
-    chunk = chunk.drop_duplicates()
+    # Remove duplicatas completas (linhas inteiras iguais), inclusive entre chunks e arquivos
+    with etapa('deduplicacao'):
+        hashes = hash_linhas(chunk)
+        manter = deduplicador.registrar(hashes)
+        chunk = chunk[manter]
+        hashes = pd.Series(hashes[manter], index=chunk.index)
 
-    # Substitui strings vazias por NaN
-    chunk = chunk.replace('', pd.NA)
+    with etapa('limpeza'):
+        # Substitui strings vazias por NaN
+        chunk = chunk.replace('', pd.NA)
 
-    # Remove linhas sem created_time ou media_owner_id
-    chunk = chunk.dropna(subset=['created_time', 'media_owner_id'], how='any')
+        # Remove linhas sem created_time ou media_owner_id
+        chunk = chunk.dropna(subset=['created_time', 'media_owner_id'], how='any')
 
-    return chunk
+    return chunk, falhas_post + falhas_comentario, hashes.loc[chunk.index].to_numpy()
 
-# Lista para armazenar os chunks processados
-dados_processados = []
+# Função para acumular o resumo do conjunto processado chunk a chunk
+# (substitui o info() e o isna().sum() sobre o DataFrame completo); os não nulos
+# saem das linhas menos os nulos, sem uma segunda passada pelo chunk
+def atualizar_resumo(resumo, chunk):
+    nulos = chunk.isna().sum()
+    resumo['linhas'] += len(chunk)
+    resumo['nulos'] = resumo['nulos'].add(nulos, fill_value=0)
+    resumo['nao_nulos'] = resumo['nao_nulos'].add(len(chunk) - nulos, fill_value=0)
+    for coluna, tipo in chunk.dtypes.items():
+        resumo['tipos'].setdefault(coluna, str(tipo))
+    return resumo
 
-# Tamanho do chunk
-tamanho_chunk = 100000
+def novo_resumo():
+    return {'linhas': 0, 'nulos': pd.Series(dtype=int), 'nao_nulos': pd.Series(dtype=int), 'tipos': {}}
+
+# Une resumos de arquivos diferentes (modo intervalo)
+def juntar_resumos(resumo, outro):
+    resumo['linhas'] += outro['linhas']
+    resumo['nulos'] = resumo['nulos'].add(outro['nulos'], fill_value=0)
+    resumo['nao_nulos'] = resumo['nao_nulos'].add(outro['nao_nulos'], fill_value=0)
+    for coluna, tipo in outro['tipos'].items():
+        resumo['tipos'].setdefault(coluna, tipo)
+    return resumo
+
+# Conversão do resumo para JSON (salvo junto de cada partição, usado na retomada)
+def resumo_para_json(resumo):
+    return {'linhas': int(resumo['linhas']),
+            'nulos': {coluna: int(valor) for coluna, valor in resumo['nulos'].items()},
+            'nao_nulos': {coluna: int(valor) for coluna, valor in resumo['nao_nulos'].items()},
+            'tipos': resumo['tipos']}
+
+def resumo_de_json(dados):
+    return {'linhas': dados['linhas'],
+            'nulos': pd.Series(dados['nulos'], dtype=int),
+            'nao_nulos': pd.Series(dados['nao_nulos'], dtype=int),
+            'tipos': dict(dados['tipos'])}
+
+def imprimir_resumo(resumo):
+    print(f"Total de linhas: {resumo['linhas']}")
+    print(f"Total de colunas: {len(resumo['tipos'])}")
+    tabela = pd.DataFrame({
+        'Não nulos': resumo['nao_nulos'].astype(int),
+        'Nulos': resumo['nulos'].astype(int),
+        'Tipo': pd.Series(resumo['tipos'])
+    }).reindex(list(resumo['tipos']))
+    print(tabela)
+
+# Leitor em chunks dos arquivos brutos (conta as linhas malformadas ignoradas)
+def novo_leitor():
+    return LeitorCSV(backend_csv, tamanho_chunk)
+
+# Modo 'dia': processa os arquivos em série, gravando cada chunk assim que é processado
+def processar_dia():
+    deduplicador = DeduplicadorGlobal(limite_memoria_deduplicacao_mb)
+    escritor_parquet = EscritorParquet(caminho_saida_parquet) if salvar_parquet else None
+    resumo = novo_resumo()
+    total_falhas_datas = 0
+    linhas_ignoradas = 0
+
+    # Colunas do primeiro chunk gravado (mantém a ordem do cabeçalho entre arquivos)
+    colunas_saida = None
+
+    for arquivo in arquivos_outubro_2018:
+        print(f"Processando arquivo: {arquivo}")
+        leitor = novo_leitor()
+        try:
+            for chunk in medir_iteracao('leitura', leitor.ler(arquivo)):
+                chunk_processado, falhas_datas, _ = pre_processar_chunk(chunk, deduplicador)
+                total_falhas_datas += falhas_datas
+
+                # O primeiro chunk cria o arquivo com cabeçalho; os demais são anexados
+                with etapa('escrita_csv'):
+                    if colunas_saida is None:
+                        colunas_saida = list(chunk_processado.columns)
+                        chunk_processado.to_csv(caminho_saida, index=False, mode='w', quoting=csv.QUOTE_ALL, escapechar='\\')
+                    else:
+                        chunk_processado = chunk_processado.reindex(columns=colunas_saida)
+                        chunk_processado.to_csv(caminho_saida, index=False, mode='a', header=False, quoting=csv.QUOTE_ALL, escapechar='\\')
+                if escritor_parquet is not None:
+                    with etapa('escrita_parquet'):
+                        escritor_parquet.escrever(chunk_processado)
+
+                with etapa('resumo'):
+                    resumo = atualizar_resumo(resumo, chunk_processado)
+                contar('chunks')
+                contar('linhas_lidas', len(chunk))
+                contar('linhas_gravadas', len(chunk_processado))
+        except Exception as error:
+            print(f"Erro ao processar {arquivo}: {str(error)}")
+            continue
+        finally:
+            linhas_ignoradas += leitor.linhas_ignoradas
 
-# Itera sobre os arquivos de 7 de outubro de 2018
-chunk_count = 0
-for arquivo in arquivos_outubro_2018:
-    print(f"Processando arquivo: {arquivo}")
+    # Resumo final
+    if colunas_saida is not None:
+        print(f"Dados pré-processados salvos em: {caminho_saida}")
+        if escritor_parquet is not None:
+            escritor_parquet.fechar()
+            print(f"Versão em Parquet salva em: {caminho_saida_parquet}")
+            if salvar_por_hora:
+                origem = os.path.splitext(os.path.basename(caminho_saida_parquet))[0]
+                with etapa('particionamento_por_hora'):
+                    particoes = particionar_por_hora(caminho_saida_parquet, diretorio_por_hora, origem, tamanho_chunk)
+                print(f"{particoes} partições por data/hora salvas em: {diretorio_por_hora}")
+        print("\nInformações do conjunto de dados processados:")
+        imprimir_resumo(resumo)
+        print(f"\nValores nulos por coluna:\n{resumo['nulos'].astype(int).reindex(colunas_saida)}")
+        print(f"\nDatas não convertidas: {total_falhas_datas}")
+        print(f"Duplicatas removidas: {deduplicador.duplicatas_removidas}")
+        print(f"Linhas malformadas ignoradas: {linhas_ignoradas}")
+    else:
+        print("Nenhum dado processado. Verifique os arquivos de entrada.")
+
+    # Remove os arquivos temporários da deduplicação
+    deduplicador.fechar()
+
+# Caminhos da partição de um dia: dados (CSV e Parquet), hashes das linhas (na ordem do arquivo) e metadados
+def caminhos_particao(data):
+    base = os.path.join(diretorio_particoes, data)
+    return base + ".csv", base + ".parquet", base + ".hashes.npy", base + ".json"
+
+# Identifica a versão do arquivo bruto (usado para decidir se a partição pode ser reaproveitada)
+def assinatura_arquivo(arquivo):
+    info = os.stat(arquivo)
+    return {'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns}
+
+# Verifica se o arquivo já foi processado em uma execução anterior
+def particao_pronta(data, arquivo):
+    caminho_csv, caminho_parquet, caminho_hashes, caminho_meta = caminhos_particao(data)
+    if not (os.path.exists(caminho_csv) and os.path.exists(caminho_hashes) and os.path.exists(caminho_meta)):
+        return False
+    if salvar_parquet and not os.path.exists(caminho_parquet):
+        return False
+    with open(caminho_meta, encoding='utf-8') as f:
+        meta = json.load(f)
+    return meta.get('origem') == assinatura_arquivo(arquivo)
+
+# Trabalhador do modo 'intervalo': processa um arquivo diário inteiro e grava sua partição.
+# A deduplicação aqui vale dentro do arquivo; a deduplicação entre arquivos é feita depois,
+# em ordem de data, por deduplicar_entre_particoes. Retorna as medições da instrumentação
+# do processo (None quando desligada), que o processo principal soma às suas.
+def pre_processar_arquivo(data, arquivo):
+    instrumentacao.reiniciar()
+    caminho_csv, caminho_parquet, caminho_hashes, caminho_meta = caminhos_particao(data)
+    deduplicador = DeduplicadorGlobal(limite_memoria_deduplicacao_mb / numero_processos, diretorio_particoes)
+    escritor_parquet = EscritorParquet(caminho_parquet) if salvar_parquet else None
+    resumo = novo_resumo()
+    falhas = 0
+    hashes = []
+    colunas_saida = None
+    leitor = novo_leitor()
+    try:
+        # Grava em arquivos temporários e renomeia no final: uma partição interrompida nunca parece completa
+        for chunk in medir_iteracao('leitura', leitor.ler(arquivo)):
+            chunk_processado, falhas_datas, hashes_chunk = pre_processar_chunk(chunk, deduplicador)
+            falhas += falhas_datas
+            with etapa('escrita_csv'):
+                if colunas_saida is None:
+                    colunas_saida = list(chunk_processado.columns)
+                    chunk_processado.to_csv(caminho_csv + ".tmp", index=False, mode='w', quoting=csv.QUOTE_ALL, escapechar='\\')
+                else:
+                    chunk_processado = chunk_processado.reindex(columns=colunas_saida)
+                    chunk_processado.to_csv(caminho_csv + ".tmp", index=False, mode='a', header=False, quoting=csv.QUOTE_ALL, escapechar='\\')
+            if escritor_parquet is not None:
+                with etapa('escrita_parquet'):
+                    escritor_parquet.escrever(chunk_processado)
+            hashes.append(hashes_chunk)
+            with etapa('resumo'):
+                resumo = atualizar_resumo(resumo, chunk_processado)
+            contar('chunks')
+            contar('linhas_lidas', len(chunk))
+            contar('linhas_gravadas', len(chunk_processado))
+
+        if colunas_saida is None:
+            # Arquivo vazio: grava partição vazia para não reprocessá-lo
+            open(caminho_csv + ".tmp", 'w').close()
+        np.save(caminho_hashes + ".tmp.npy", np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64))
+        os.replace(caminho_csv + ".tmp", caminho_csv)
+        os.replace(caminho_hashes + ".tmp.npy", caminho_hashes)
+        if escritor_parquet is not None:
+            escritor_parquet.fechar()
+
+        meta = {'origem': assinatura_arquivo(arquivo), 'falhas_datas': falhas,
+                'duplicatas_no_arquivo': deduplicador.duplicatas_removidas,
+                'linhas_ignoradas': leitor.linhas_ignoradas,
+                'duplicatas_entre_arquivos': 0, 'por_hora': False, 'resumo': resumo_para_json(resumo)}
+        with open(caminho_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    finally:
+        deduplicador.fechar()
+    return instrumentacao.resumo()
+
+# Regrava um Parquet mantendo apenas as linhas marcadas na máscara
+def filtrar_parquet(caminho, manter):
+    arquivo = pq.ParquetFile(caminho)
+    inicio = 0
+    with pq.ParquetWriter(caminho + ".tmp", arquivo.schema_arrow, compression='zstd') as escritor:
+        for lote in arquivo.iter_batches(batch_size=tamanho_chunk):
+            escritor.write_batch(lote.filter(manter[inicio:inicio + lote.num_rows]))
+            inicio += lote.num_rows
+    os.replace(caminho + ".tmp", caminho)
+
+# Remove de cada partição (em ordem de data) as linhas que já apareceram em partições
+# anteriores. Só as partições com duplicatas são reescritas; as demais apenas têm seus
+# hashes registrados. Como as partições já filtradas continuam consistentes, a etapa
+# pode ser repetida em uma retomada sem alterar o resultado.
+def deduplicar_entre_particoes(datas):
+    deduplicador = DeduplicadorGlobal(limite_memoria_deduplicacao_mb)
     try:
-        for chunk in pd.read_csv(
-            arquivo,
-            chunksize=tamanho_chunk,
-            encoding='utf-8',
-            quoting=csv.QUOTE_ALL,
-            on_bad_lines='skip',
-            low_memory=False,
-            escapechar='\\',
-            doublequote=True
-        ):
-            chunk_processado = pre_processar_chunk(chunk)
-            print(f"Chunk {chunk_count + 1}: {len(chunk_processado)} linhas processadas")
-            dados_processados.append(chunk_processado)
-            chunk_count += 1
-    except Exception as error:
-        print(f"Erro ao processar {arquivo}: {str(error)}")
-        continue
-
-# Concatena chunks
-if dados_processados:
-    dados_completos = pd.concat(dados_processados, ignore_index=True)
-    caminho_raiz = os.path.dirname(os.path.abspath(__file__))
-    caminho_saida = os.path.join(caminho_raiz, "dados_pre_processados_outubro_2018.csv")
-    dados_completos.to_csv(caminho_saida, index=False, quoting=csv.QUOTE_ALL, escapechar='\\')
-    print(f"Dados pré-processados salvos em: {caminho_saida}")
+        for data in datas:
+            caminho_csv, caminho_parquet, caminho_hashes, caminho_meta = caminhos_particao(data)
+            hashes = np.load(caminho_hashes)
+            manter = deduplicador.registrar(hashes)
+            if manter.all():
+                continue
+
+            with open(caminho_meta, encoding='utf-8') as f:
+                meta = json.load(f)
+            resumo = novo_resumo()
+            resumo['tipos'] = meta['resumo']['tipos']
+            inicio = 0
+            primeiro = True
+            # Lê como texto para regravar os valores exatamente como estavam
+            for chunk in pd.read_csv(caminho_csv, chunksize=tamanho_chunk, dtype=str, keep_default_na=False,
+                                     encoding='utf-8', quoting=csv.QUOTE_ALL, escapechar='\\', doublequote=True):
+                mascara = manter[inicio:inicio + len(chunk)]
+                inicio += len(chunk)
+                chunk = chunk[mascara]
+                chunk.to_csv(caminho_csv + ".tmp", index=False, mode='w' if primeiro else 'a', header=primeiro,
+                             quoting=csv.QUOTE_ALL, escapechar='\\')
+                primeiro = False
+                resumo['linhas'] += len(chunk)
+                resumo['nulos'] = resumo['nulos'].add((chunk == '').sum(), fill_value=0)
+                resumo['nao_nulos'] = resumo['nao_nulos'].add((chunk != '').sum(), fill_value=0)
+
+            if os.path.exists(caminho_parquet):
+                filtrar_parquet(caminho_parquet, manter)
+            np.save(caminho_hashes + ".tmp.npy", hashes[manter])
+            os.replace(caminho_csv + ".tmp", caminho_csv)
+            os.replace(caminho_hashes + ".tmp.npy", caminho_hashes)
+            meta['duplicatas_entre_arquivos'] += int((~manter).sum())
+            meta['por_hora'] = False
+            meta['resumo'] = resumo_para_json(resumo)
+            with open(caminho_meta, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            print(f"{data}: {int((~manter).sum())} linhas repetidas de dias anteriores removidas")
+    finally:
+        deduplicador.fechar()
+
+# Trabalhador que redistribui a partição de um dia nas partições por data/hora
+def particionar_dia_por_hora(data):
+    instrumentacao.reiniciar()
+    _, caminho_parquet, _, caminho_meta = caminhos_particao(data)
+    with etapa('particionamento_por_hora'):
+        particionar_por_hora(caminho_parquet, diretorio_por_hora, data, tamanho_chunk)
+    with open(caminho_meta, encoding='utf-8') as f:
+        meta = json.load(f)
+    meta['por_hora'] = True
+    with open(caminho_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return instrumentacao.resumo()
+
+def particionar_dias_por_hora(datas):
+    pendentes = []
+    for data in datas:
+        with open(caminhos_particao(data)[3], encoding='utf-8') as f:
+            if not json.load(f).get('por_hora'):
+                pendentes.append(data)
+    with ProcessPoolExecutor(max_workers=numero_processos) as executor:
+        futuros = {executor.submit(particionar_dia_por_hora, data): data for data in pendentes}
+        for futuro in as_completed(futuros):
+            try:
+                instrumentacao.juntar(futuro.result())
+            except Exception as error:
+                print(f"Erro ao particionar {futuros[futuro]} por hora: {str(error)}")
+    print(f"{len(pendentes)} dias redistribuídos em: {diretorio_por_hora}")
+
+# Modo 'intervalo': um processo por arquivo diário, com retomada
+def processar_intervalo():
+    os.makedirs(diretorio_particoes, exist_ok=True)
+
+    # Arquivos diários existentes no intervalo, em ordem de data (ordem determinística das partições)
+    arquivos = {}
+    for dia in pd.date_range(data_inicio_ingestao, data_fim_ingestao, freq='D'):
+        data = dia.strftime('%Y-%m-%d')
+        arquivo = os.path.join(diretorio_dados, f"{data}.csv")
+        if os.path.exists(arquivo):
+            arquivos[data] = arquivo
+    if not arquivos:
+        print("Nenhum arquivo encontrado no intervalo. Verifique os arquivos de entrada.")
+        return
+
+    pendentes = [data for data, arquivo in arquivos.items() if not particao_pronta(data, arquivo)]
+    print(f"{len(arquivos)} arquivos no intervalo, {len(arquivos) - len(pendentes)} já processados, {len(pendentes)} pendentes")
+
+    with ProcessPoolExecutor(max_workers=numero_processos) as executor:
+        futuros = {executor.submit(pre_processar_arquivo, data, arquivos[data]): data for data in pendentes}
+        for futuro in as_completed(futuros):
+            data = futuros[futuro]
+            try:
+                instrumentacao.juntar(futuro.result())
+                print(f"Partição {data} concluída")
+            except Exception as error:
+                print(f"Erro ao processar {arquivos[data]}: {str(error)}")
+
+    # Deduplicação entre dias e resumo final, sempre na ordem das datas
+    datas_prontas = [data for data in arquivos if particao_pronta(data, arquivos[data])]
+    with etapa('deduplicacao_entre_particoes'):
+        deduplicar_entre_particoes(datas_prontas)
+
+    # Redistribui por data/hora as partições novas ou alteradas pela deduplicação
+    if salvar_parquet and salvar_por_hora:
+        particionar_dias_por_hora(datas_prontas)
+
+    resumo = novo_resumo()
+    total_falhas_datas = 0
+    total_duplicatas = 0
+    total_linhas_ignoradas = 0
+    for data in datas_prontas:
+        with open(caminhos_particao(data)[3], encoding='utf-8') as f:
+            meta = json.load(f)
+        resumo = juntar_resumos(resumo, resumo_de_json(meta['resumo']))
+        total_falhas_datas += meta['falhas_datas']
+        total_duplicatas += meta['duplicatas_no_arquivo'] + meta['duplicatas_entre_arquivos']
+        # Partições gravadas antes da contagem não têm o campo
+        total_linhas_ignoradas += meta.get('linhas_ignoradas', 0)
+
+    print(f"\n{len(datas_prontas)} partições salvas em: {diretorio_particoes}")
     print("\nInformações do conjunto de dados processados:")
-    print(dados_completos.info())
-    print(f"\nValores nulos por coluna:\n{dados_completos.isna().sum()}")
-else:
-    print("Nenhum dado processado. Verifique os arquivos de entrada.")
\ No newline at end of file
+    imprimir_resumo(resumo)
+    print(f"\nValores nulos por coluna:\n{resumo['nulos'].astype(int).reindex(list(resumo['tipos']))}")
+    print(f"\nDatas não convertidas: {total_falhas_datas}")
+    print(f"Duplicatas removidas: {total_duplicatas}")
+    print(f"Linhas malformadas ignoradas: {total_linhas_ignoradas}")
+
+if __name__ == '__main__':
+    if instrumentar:
+        instrumentacao.ativar(perfil_cprofile, perfil_memoria)
+    if modo_ingestao == 'intervalo':
+        processar_intervalo()
+    else:
+        processar_dia()
+    instrumentacao.finalizar(caminho_metricas, 'AED_pre-processamento.py')
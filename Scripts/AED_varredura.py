@@ -0,0 +1,94 @@
+import os
+from esquema import RelatorioMemoria
+from varredura import AgregadorPiramide, AgregadorDistribuicao, AgregadorUsuarios, AgregadorLatencia, AgregadorHorarioAproximado, AgregadorUsuariosAproximado, varrer_incremental, descrever_fonte, salvar_agregados
+import instrumentacao
+
+# Lê o conjunto pré-processado uma única vez por janela e calcula, no mesmo passo, os
+# agregados usados por AED_analise_temporal.py, AED_dist_freq_est_desc.py,
+# AED_analise_usuarios.py e AED_analise_latencia.py. As contagens por usuário usam a
+# sua própria janela (por padrão, a fonte inteira), então nesse caso são duas leituras. Depois de executado, os scripts reaproveitam os agregados salvos em vez de
+# relerem os dados. Os resultados parciais de cada arquivo ficam em
+# <diretorio_agregados>/parciais: numa nova execução, só arquivos novos ou
+# alterados (por exemplo, um dia acrescentado) são lidos.
+
+# Define o caminho do arquivo pré-processado
+caminho_arquivo = "/home/israel/vscode/DoE - Atividade 1/dados_pre_processados_outubro_2018.csv"
+
+# Dados particionados por data/hora (usados quando existem) e janela analisada
+diretorio_por_hora = "/home/israel/vscode/DoE - Atividade 1/dados_pre_processados_por_hora"
+inicio_janela = '2018-10-07'
+fim_janela = '2018-10-08'
+
+# Janela das contagens por usuário (a mesma de AED_analise_usuarios.py e
+# AED_dist_freq_est_desc.py): None lê a fonte inteira
+janela_usuarios = None
+
+# Diretório onde os agregados são salvos
+diretorio_agregados = "/home/israel/vscode/DoE - Atividade 1/agregados"
+diretorio_parciais = os.path.join(diretorio_agregados, 'parciais')
+
+# Instrumentação: tempos e contadores por etapa, gravados em JSON no fim da execução
+# (caminho_metricas), com captura opcional de cProfile e tracemalloc; ver instrumentacao.py
+instrumentar = False
+perfil_cprofile = False
+perfil_memoria = False
+caminho_metricas = "metricas_varredura.json"
+if instrumentar:
+    instrumentacao.ativar(perfil_cprofile, perfil_memoria)
+
+# Define o tamanho do chunk (o mesmo dos scripts de análise)
+tamanho_chunk = 10000
+
+# Memória máxima (MB) para os pares (usuário, publicação/comentário) já vistos antes de gravá-los em disco
+limite_memoria_usuarios_mb = 256
+
+# Também calcula os agregados aproximados (HyperLogLog / Top-K), usados pelos
+# scripts quando modo_aproximado = True
+incluir_aproximados = False
+erro_relativo_hll = 0.02
+erro_topk = 0.001
+erro_hll_usuarios = 0.05
+
+# Mede a memória de cada coluna antes e depois do esquema compacto (esquema.py)
+# nos chunks lidos; a medição percorre as strings, então deixa a varredura mais lenta
+relatorio_memoria = False
+
+janela = (inicio_janela, fim_janela)
+agregadores_janela = [AgregadorPiramide(), AgregadorDistribuicao(inicio_janela), AgregadorLatencia()]
+agregadores_usuarios = [AgregadorUsuarios(limite_memoria_usuarios_mb)]
+if incluir_aproximados:
+    agregadores_janela.append(AgregadorHorarioAproximado(erro_relativo_hll))
+    agregadores_usuarios.append(AgregadorUsuariosAproximado(erro_topk, erro_hll_usuarios))
+
+# Agregadores agrupados por janela: uma leitura da fonte para cada grupo
+grupos = {}
+for janela_grupo, agregadores in [(janela, agregadores_janela), (janela_usuarios, agregadores_usuarios)]:
+    grupos.setdefault(janela_grupo, []).extend(agregadores)
+
+relatorio = RelatorioMemoria() if relatorio_memoria else None
+resultados = {}
+for janela_grupo, agregadores in grupos.items():
+    try:
+        fonte = descrever_fonte(caminho_arquivo, diretorio_por_hora, janela_grupo)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{caminho_arquivo}' não encontrado. Reexecute o script de pré-processamento.")
+        exit()
+    try:
+        resultados_grupo = varrer_incremental(agregadores, caminho_arquivo, tamanho_chunk, diretorio_parciais, diretorio_por_hora,
+                                              janela_grupo, relatorio)
+    except Exception as e:
+        print(f"Erro ao processar o subconjunto: {str(e)}")
+        exit()
+    with instrumentacao.etapa('salvar_agregados'):
+        salvar_agregados(agregadores, resultados_grupo, diretorio_agregados, fonte)
+    resultados.update(resultados_grupo)
+print(f"Agregados salvos em: {diretorio_agregados}")
+for nome, resultado in resultados.items():
+    print(f"{nome}: " + ", ".join(f"{chave} ({len(valor)})" for chave, valor in resultado.items() if hasattr(valor, '__len__')))
+if relatorio is not None:
+    if relatorio.tipos:
+        relatorio.imprimir()
+    else:
+        print("\nRelatório de memória: nenhum arquivo novo ou alterado foi lido")
+
+instrumentacao.finalizar(caminho_metricas, 'AED_varredura.py')
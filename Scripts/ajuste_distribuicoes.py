@@ -0,0 +1,156 @@
+import os
+import time
+import hashlib
+import warnings
+import multiprocessing
+from multiprocessing.connection import wait
+import numpy as np
+import pandas as pd
+import scipy
+from scipy import stats
+
+# Ajuste de distribuições (scipy.stats) a séries de contagens, em paralelo.
+# Cada distribuição é ajustada em um processo próprio, que é encerrado quando
+# passa do tempo limite; séries grandes são subamostradas. Os ajustes são
+# ordenados pelo erro quadrático em relação ao histograma (padrão, o mesmo critério
+# do Fitter usado na análise original), por AIC, BIC ou pela estatística KS, e ficam
+# salvos em disco: uma mesma série (mesmos valores) não é reajustada para as
+# distribuições já vistas.
+# AIC e BIC premiam ajustes degenerados (por exemplo, powerlaw com o limite do
+# suporte colado no máximo dos dados tem verossimilhança enorme e KS com p-valor
+# quase zero). Por isso, em qualquer critério, ajustes com log-verossimilhança não
+# finita contam como falha e ajustes rejeitados pelo teste KS (p-valor abaixo de
+# nivel_ks) ficam depois dos aceitos.
+
+# Candidatas contínuas usadas por padrão
+DISTRIBUICOES_PADRAO = [
+    'expon', 'gamma', 'lognorm', 'norm', 'weibull_min', 'weibull_max', 'exponweib',
+    'pareto', 'lomax', 'genpareto', 'invgamma', 'invgauss', 'fisk', 'burr', 'burr12',
+    'genextreme', 'gumbel_r', 'gumbel_l', 'logistic', 'cauchy', 'chi2', 't', 'rayleigh',
+    'rice', 'nakagami', 'halfnorm', 'exponnorm', 'loggamma', 'powerlaw', 'uniform',
+    'beta', 'gengamma', 'loglaplace', 'laplace', 'triang'
+]
+
+# Ajusta uma distribuição e calcula os critérios de comparação
+def ajustar_distribuicao(nome, dados, bins=100):
+    distribuicao = getattr(stats, nome)
+    inicio = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        parametros = distribuicao.fit(dados)
+        log_verossimilhanca = float(np.sum(distribuicao.logpdf(dados, *parametros)))
+        ks = stats.kstest(dados, nome, args=parametros)
+        # Erro quadrático entre a densidade ajustada e o histograma (critério do Fitter)
+        densidade, bordas = np.histogram(dados, bins=bins, density=True)
+        centros = (bordas[:-1] + bordas[1:]) / 2
+        erro_quadratico = float(np.sum((distribuicao.pdf(centros, *parametros) - densidade) ** 2))
+    k = len(parametros)
+    n = len(dados)
+    return {
+        'distribuicao': nome,
+        'parametros': tuple(float(p) for p in parametros),
+        'aic': 2 * k - 2 * log_verossimilhanca,
+        'bic': k * np.log(n) - 2 * log_verossimilhanca,
+        'ks_estatistica': float(ks.statistic),
+        'ks_p_valor': float(ks.pvalue),
+        'erro_quadratico': erro_quadratico,
+        'tempo_s': time.perf_counter() - inicio
+    }
+
+# Os processos são criados por fork quando disponível: assim os scripts AED_*, que não
+# têm guarda __main__, não são reexecutados em cada processo
+contexto = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+
+def _executar(nome, dados, conexao):
+    try:
+        conexao.send(ajustar_distribuicao(nome, dados))
+    except Exception as e:
+        conexao.send({'distribuicao': nome, 'erro': str(e)})
+    finally:
+        conexao.close()
+
+# Ajusta as distribuições com até numero_processos processos simultâneos;
+# ajustes que passam de tempo_limite segundos são encerrados
+def ajustar_em_paralelo(dados, distribuicoes, numero_processos=None, tempo_limite=60):
+    numero_processos = numero_processos or os.cpu_count() or 1
+    pendentes = list(distribuicoes)
+    ativos = {}
+    resultados = []
+    while pendentes or ativos:
+        while pendentes and len(ativos) < numero_processos:
+            nome = pendentes.pop(0)
+            recebe, envia = contexto.Pipe(duplex=False)
+            processo = contexto.Process(target=_executar, args=(nome, dados, envia), daemon=True)
+            processo.start()
+            envia.close()
+            ativos[recebe] = (nome, processo, time.monotonic())
+
+        prontos = wait(list(ativos), timeout=0.1)
+        for conexao in list(ativos):
+            nome, processo, inicio = ativos[conexao]
+            if conexao in prontos:
+                try:
+                    resultados.append(conexao.recv())
+                except EOFError:
+                    resultados.append({'distribuicao': nome, 'erro': f"processo encerrado (código {processo.exitcode})"})
+            elif time.monotonic() - inicio > tempo_limite:
+                processo.terminate()
+                resultados.append({'distribuicao': nome, 'erro': f"tempo limite de {tempo_limite}s excedido"})
+            else:
+                continue
+            processo.join()
+            conexao.close()
+            del ativos[conexao]
+    return resultados
+
+# Subamostra sem reposição (sempre a mesma para a mesma série)
+def subamostrar(dados, tamanho_maximo, semente=0):
+    if tamanho_maximo is None or len(dados) <= tamanho_maximo:
+        return dados
+    return np.random.default_rng(semente).choice(dados, size=tamanho_maximo, replace=False)
+
+# Chave do cache: valores da série, subamostragem e versão do scipy
+def chave_serie(dados, tamanho_maximo_amostra):
+    conteudo = hashlib.blake2b(digest_size=16)
+    conteudo.update(np.ascontiguousarray(dados, dtype=np.float64).tobytes())
+    conteudo.update(repr((tamanho_maximo_amostra, scipy.__version__)).encode())
+    return conteudo.hexdigest()
+
+# Ajusta as distribuições a uma série e retorna o ranking (melhor primeiro): ajustes
+# aceitos pelo KS, depois os rejeitados (coluna rejeitado_ks), cada grupo ordenado
+# pelo critério. Ajustes que falharam, passaram do tempo limite ou são degenerados
+# ficam no fim, com o erro. Se todos são rejeitados, vale só o critério (com AIC/BIC,
+# o ajuste degenerado pode voltar ao topo). nivel_ks = None desliga a separação pelo KS.
+def ajustar_serie(serie, distribuicoes=None, criterio='sse', numero_processos=None, tempo_limite=60,
+                  tamanho_maximo_amostra=10000, diretorio_cache=None, nivel_ks=0.05):
+    distribuicoes = distribuicoes or DISTRIBUICOES_PADRAO
+    dados = pd.Series(serie).dropna().to_numpy(dtype=np.float64)
+
+    salvos = {}
+    caminho_cache = None
+    if diretorio_cache:
+        caminho_cache = os.path.join(diretorio_cache, chave_serie(dados, tamanho_maximo_amostra) + '.pkl')
+        if os.path.exists(caminho_cache):
+            salvos = pd.read_pickle(caminho_cache)
+
+    faltantes = [nome for nome in distribuicoes if nome not in salvos]
+    resultados = [salvos[nome] for nome in distribuicoes if nome in salvos]
+    if faltantes:
+        novos = ajustar_em_paralelo(subamostrar(dados, tamanho_maximo_amostra), faltantes, numero_processos, tempo_limite)
+        resultados += novos
+        # Só ajustes bem-sucedidos vão para o cache (um tempo limite maior pode resolver os demais)
+        salvos.update({resultado['distribuicao']: resultado for resultado in novos if 'erro' not in resultado})
+        if caminho_cache:
+            os.makedirs(diretorio_cache, exist_ok=True)
+            pd.to_pickle(salvos, caminho_cache)
+
+    ranking = pd.DataFrame(resultados, columns=['distribuicao', 'aic', 'bic', 'ks_estatistica', 'ks_p_valor',
+                                                'erro_quadratico', 'tempo_s', 'parametros', 'erro'])
+    coluna = {'sse': 'erro_quadratico', 'aic': 'aic', 'bic': 'bic', 'ks': 'ks_estatistica'}[criterio]
+    ranking['erro'] = ranking['erro'].astype(object)
+    degenerados = ranking['erro'].isna() & ~np.isfinite(ranking['aic'].astype(np.float64))
+    ranking.loc[degenerados, 'erro'] = "log-verossimilhança não finita (ajuste degenerado)"
+    falhou = ranking['erro'].notna()
+    ranking['rejeitado_ks'] = ~falhou & (ranking['ks_p_valor'] < nivel_ks) if nivel_ks is not None else False
+    ranking = ranking.assign(_falhou=falhou).sort_values(['_falhou', 'rejeitado_ks', coluna], na_position='last', kind='stable')
+    return ranking.drop(columns='_falhou').reset_index(drop=True)
@@ -0,0 +1,258 @@
+import os
+import glob
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from leitura import LeitorCSV
+
+# Formato colunar tipado do conjunto pré-processado (Parquet).
+# Datas ficam como timestamp nativo, IDs como inteiros e nomes de usuário e
+# short_code como colunas de dicionário (categorias), evitando reinterpretar
+# texto e datas a cada leitura nos scripts de análise.
+
+# Colunas com tipo conhecido
+COLUNAS_DATA = ['created_time', 'created_time_comment']
+COLUNAS_ID = ['media_owner_id', 'comment_id', 'parent_comment_id']
+COLUNAS_DICIONARIO = ['media_owner_username', 'short_code']
+
+# Colunas próprias do comentário (as demais descrevem a publicação)
+COLUNAS_COMENTARIO = ['created_time_comment', 'comment_id', 'parent_comment_id', 'comment_tag', 'text']
+
+# Backend de leitura dos CSVs pré-processados ('pandas' ou 'pyarrow', ver leitura.py)
+BACKEND_CSV = 'pyarrow'
+
+# Monta o esquema Arrow a partir do primeiro chunk processado. Colunas sem tipo
+# conhecido viram float64 (se numéricas no primeiro chunk) ou texto, para que
+# chunks seguintes com tipos inferidos diferentes possam ser convertidos.
+def esquema_arrow(chunk):
+    campos = []
+    for coluna in chunk.columns:
+        if coluna in COLUNAS_DATA:
+            tipo = pa.timestamp('ns')
+        elif coluna in COLUNAS_ID:
+            tipo = pa.int64()
+        elif coluna in COLUNAS_DICIONARIO:
+            tipo = pa.dictionary(pa.int32(), pa.string())
+        elif pd.api.types.is_numeric_dtype(chunk[coluna]) and not pd.api.types.is_bool_dtype(chunk[coluna]):
+            tipo = pa.float64()
+        else:
+            tipo = pa.string()
+        campos.append(pa.field(coluna, tipo))
+    return pa.schema(campos)
+
+# Converte um chunk do pandas para uma tabela Arrow com o esquema dado
+def tabela_arrow(chunk, esquema):
+    colunas = {}
+    for campo in esquema:
+        serie = chunk[campo.name] if campo.name in chunk.columns else pd.Series(pd.NA, index=chunk.index)
+        if pa.types.is_timestamp(campo.type):
+            serie = pd.to_datetime(serie, errors='coerce')
+        elif pa.types.is_integer(campo.type):
+            serie = pd.to_numeric(serie, errors='coerce').astype('Int64')
+        elif pa.types.is_floating(campo.type):
+            serie = pd.to_numeric(serie, errors='coerce').astype('float64')
+        elif pa.types.is_dictionary(campo.type):
+            serie = serie.astype('string').astype('category')
+        else:
+            serie = serie.astype('string')
+        colunas[campo.name] = serie
+    return pa.Table.from_pandas(pd.DataFrame(colunas, index=chunk.index), schema=esquema, preserve_index=False)
+
+# Escritor incremental: cada chunk vira um row group; o arquivo só aparece
+# com o nome final quando fechar() é chamado
+class EscritorParquet:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.esquema = None
+        self.escritor = None
+
+    def escrever(self, chunk):
+        if self.escritor is None:
+            self.esquema = esquema_arrow(chunk)
+            self.escritor = pq.ParquetWriter(self.caminho + ".tmp", self.esquema, compression='zstd',
+                                             use_dictionary=COLUNAS_ID + COLUNAS_DICIONARIO)
+        self.escritor.write_table(tabela_arrow(chunk, self.esquema))
+
+    def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            os.replace(self.caminho + ".tmp", self.caminho)
+
+# Lê o conjunto pré-processado em chunks, apenas com as colunas pedidas
+def iterar_preprocessado(caminho, colunas, tamanho_chunk):
+    if caminho.endswith('.parquet'):
+        for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_chunk, columns=colunas):
+            yield lote.to_pandas()
+    else:
+        yield from LeitorCSV(BACKEND_CSV, tamanho_chunk, colunas).ler(caminho)
+
+# Escolhe o Parquet quando ele existe; caso contrário, usa o CSV
+def escolher_arquivo(caminho_csv):
+    caminho_parquet = os.path.splitext(caminho_csv)[0] + '.parquet'
+    return caminho_parquet if os.path.exists(caminho_parquet) else caminho_csv
+
+# Layout particionado por data e hora do comentário (linhas sem comentário usam a
+# data da publicação):  <diretorio>/data=AAAA-MM-DD/hora=HH/parte-<origem>.parquet
+# Cada origem (arquivo diário de entrada) grava seus próprios arquivos em cada
+# partição, então processos diferentes nunca escrevem no mesmo arquivo.
+# Como os comentários de uma publicação chegam horas ou dias depois dela, cada
+# origem grava também, na pasta da data das publicações, um índice
+# (<diretorio>/data=AAAA-MM-DD/publicacoes-<origem>.json) com as partições de outras
+# horas em que aparecem as publicações de cada hora daquela data.
+def caminho_particao_hora(diretorio, hora, origem):
+    return os.path.join(diretorio, f"data={hora:%Y-%m-%d}", f"hora={hora:%H}", f"parte-{origem}.parquet")
+
+def caminho_indice_publicacoes(diretorio, data, origem):
+    return os.path.join(diretorio, f"data={data:%Y-%m-%d}", f"publicacoes-{origem}.json")
+
+# Hora de uma partição, a partir do seu caminho
+def hora_da_particao(caminho):
+    hora = os.path.basename(os.path.dirname(caminho))
+    data = os.path.basename(os.path.dirname(os.path.dirname(caminho)))
+    return pd.Timestamp(f"{data.split('=')[1]} {hora.split('=')[1]}:00")
+
+# Chave de partição de cada linha: hora do comentário ou, se ausente, da publicação
+def chave_hora(df):
+    return df['created_time_comment'].fillna(df['created_time']).dt.floor('h')
+
+# Redistribui um Parquet pré-processado nas partições por data/hora
+def particionar_por_hora(caminho_parquet, diretorio, origem, tamanho_chunk=100000):
+    # Remove as partes desta origem gravadas em execuções anteriores
+    for antigo in glob.glob(os.path.join(diretorio, "data=*", "hora=*", f"parte-{origem}.parquet")):
+        os.remove(antigo)
+    for antigo in glob.glob(os.path.join(diretorio, "data=*", f"publicacoes-{origem}.json")):
+        os.remove(antigo)
+
+    arquivo = pq.ParquetFile(caminho_parquet)
+    escritores = {}
+    indice = {}
+    try:
+        for lote in arquivo.iter_batches(batch_size=tamanho_chunk):
+            tabela = pa.Table.from_batches([lote])
+            datas = tabela.select(COLUNAS_DATA).to_pandas()
+            horas = chave_hora(datas)
+            horas_post = datas['created_time'].dt.floor('h')
+            fora = horas_post.notna() & (horas_post != horas)
+            for hora_post, hora in set(zip(horas_post[fora], horas[fora])):
+                indice.setdefault(hora_post.normalize(), {}).setdefault(f"{hora_post:%Y-%m-%dT%H}", set()).add(f"{hora:%Y-%m-%dT%H}")
+            for hora, posicoes in horas.groupby(horas).indices.items():
+                if hora not in escritores:
+                    caminho = caminho_particao_hora(diretorio, hora, origem)
+                    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+                    escritores[hora] = pq.ParquetWriter(caminho + ".tmp", arquivo.schema_arrow, compression='zstd',
+                                                        use_dictionary=COLUNAS_ID + COLUNAS_DICIONARIO)
+                escritores[hora].write_table(tabela.take(posicoes))
+    finally:
+        for escritor in escritores.values():
+            escritor.close()
+    for hora in escritores:
+        caminho = caminho_particao_hora(diretorio, hora, origem)
+        os.replace(caminho + ".tmp", caminho)
+    # Um índice por data das publicações, para que a janela leia só os das suas datas
+    for data, indice_data in indice.items():
+        caminho = caminho_indice_publicacoes(diretorio, data, origem)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho + ".tmp", 'w') as arquivo_indice:
+            json.dump({hora_post: sorted(horas) for hora_post, horas in sorted(indice_data.items())}, arquivo_indice)
+        os.replace(caminho + ".tmp", caminho)
+    return len(escritores)
+
+# Arquivos das partições que cruzam a janela [inicio, fim), mais as partições de
+# outras horas com publicações feitas na janela (pelos índices de publicações das
+# datas da janela, sem ler os das outras datas), em ordem de hora
+def arquivos_janela(diretorio, inicio, fim):
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+    if fim <= inicio:
+        return []
+    arquivos = set()
+    for hora in pd.date_range(inicio.floor('h'), (fim - pd.Timedelta(1, 'ns')).floor('h'), freq='h'):
+        arquivos.update(glob.glob(caminho_particao_hora(diretorio, hora, '*')))
+    datas = pd.date_range(inicio.normalize(), (fim - pd.Timedelta(1, 'ns')).normalize(), freq='D')
+    for caminho_indice in [caminho for data in datas for caminho in glob.glob(caminho_indice_publicacoes(diretorio, data, '*'))]:
+        origem = os.path.basename(caminho_indice)[len('publicacoes-'):-len('.json')]
+        with open(caminho_indice) as arquivo_indice:
+            indice = json.load(arquivo_indice)
+        for hora_post, horas in indice.items():
+            if inicio.floor('h') <= pd.Timestamp(hora_post) < fim:
+                arquivos.update(caminho for caminho in (caminho_particao_hora(diretorio, pd.Timestamp(hora), origem) for hora in horas)
+                                if os.path.exists(caminho))
+    return sorted(arquivos)
+
+# Todas as partições, em ordem de hora (a fonte inteira, sem janela)
+def arquivos_particoes(diretorio):
+    return sorted(glob.glob(os.path.join(diretorio, "data=*", "hora=*", "parte-*.parquet")))
+
+# Uma partição precisa ter as linhas filtradas quando sua hora não está inteira na
+# janela: horas das pontas de uma janela fora de hora cheia e partições de fora da
+# janela lidas só pelas publicações feitas nela
+def filtrar_particao(caminho, inicio, fim):
+    hora = hora_da_particao(caminho)
+    return not (pd.Timestamp(inicio) <= hora and hora + pd.Timedelta(hours=1) <= pd.Timestamp(fim))
+
+# Lê, em chunks, as partições da janela [inicio, fim) (ou só os arquivos dados, que
+# devem ser partições dessa janela), com as linhas que podem entrar na janela: as com
+# comentário (ou, sem comentário, publicação) na janela e as de publicações feitas
+# nela. A seleção exata é a de selecionar_janela, aplicada depois da conversão das
+# datas (varredura.processar_chunks), igual para as partições e para o arquivo único.
+# Os lotes das várias partições são agrupados até formar chunks de tamanho_chunk linhas.
+def ler_janela(diretorio, inicio, fim, colunas, tamanho_chunk=100000, arquivos=None):
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+    if arquivos is None:
+        arquivos = arquivos_janela(diretorio, inicio, fim)
+
+    pendentes = []
+    linhas_pendentes = 0
+    for caminho in arquivos:
+        filtrar = filtrar_particao(caminho, inicio, fim)
+        colunas_leitura = list(dict.fromkeys(colunas + (COLUNAS_DATA if filtrar else [])))
+        for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_chunk, columns=colunas_leitura):
+            tabela = pa.Table.from_batches([lote])
+            if filtrar:
+                tabela = _filtrar_janela(tabela, inicio, fim)
+            pendentes.append(tabela.select(colunas))
+            linhas_pendentes += tabela.num_rows
+            if linhas_pendentes >= tamanho_chunk:
+                yield _chunk_da_janela(pendentes)
+                pendentes = []
+                linhas_pendentes = 0
+    if pendentes:
+        yield _chunk_da_janela(pendentes)
+
+def _filtrar_janela(tabela, inicio, fim):
+    inicio = pa.scalar(inicio, type=pa.timestamp('ns'))
+    fim = pa.scalar(fim, type=pa.timestamp('ns'))
+    chave = pc.coalesce(tabela['created_time_comment'], tabela['created_time'])
+    na_janela = pc.and_(pc.greater_equal(chave, inicio), pc.less(chave, fim))
+    post_na_janela = pc.and_(pc.greater_equal(tabela['created_time'], inicio), pc.less(tabela['created_time'], fim))
+    return tabela.filter(pc.fill_null(pc.or_kleene(na_janela, post_na_janela), False))
+
+# Linhas de um chunk (com as colunas de data já convertidas) que entram na janela
+# [inicio, fim): as com comentário (ou, sem comentário, publicação) na janela, pela
+# mesma chave do particionamento, e as de publicações feitas na janela cujos
+# comentários caíram fora dela, com as colunas do comentário vazias. Assim as
+# publicações da janela são todas contadas e os comentários continuam sendo só os
+# feitos na janela, com as partições ou com o arquivo único.
+# Com selecao='publicacoes' (latência), a janela seleciona só as publicações feitas
+# nela, com todos os seus comentários, inclusive os feitos depois do fim da janela.
+def selecionar_janela(chunk, inicio, fim, selecao='comentarios'):
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+    if selecao == 'publicacoes':
+        return chunk[(chunk['created_time'] >= inicio) & (chunk['created_time'] < fim)].copy()
+    chave = chunk['created_time_comment'].fillna(chunk['created_time'])
+    na_janela = (chave >= inicio) & (chave < fim)
+    if na_janela.all():
+        return chunk
+    post_na_janela = (chunk['created_time'] >= inicio) & (chunk['created_time'] < fim)
+    manter = na_janela | post_na_janela
+    chunk = chunk[manter].copy()
+    na_janela = na_janela[manter]
+    for coluna in COLUNAS_COMENTARIO:
+        if coluna in chunk.columns:
+            chunk[coluna] = chunk[coluna].where(na_janela)
+    return chunk
+
+def _chunk_da_janela(tabelas):
+    # Lotes de partes diferentes têm dicionários próprios; concat_tables mantém cada um no seu bloco
+    return pa.concat_tables(tabelas).to_pandas()
@@ -0,0 +1,152 @@
+import csv
+import os
+import numpy as np
+import pandas as pd
+
+# Gerador de arquivos diários sintéticos no formato bruto do smartdata_ig (15 colunas,
+# todos os campos entre aspas), para medir o pipeline sem os dados reais. Cada linha é
+# um comentário de uma publicação (ou uma publicação sem comentários, com os campos do
+# comentário vazios). Reproduz o que o pré-processamento precisa tratar:
+#   - datas como timestamp UNIX ou como texto ISO, misturados na mesma coluna
+#   - linhas repetidas, nulos e linhas malformadas (campos a mais)
+#   - donos com atividade concentrada (Zipf) e comentários por publicação com cauda
+#     pesada (Pareto), como nos perfis mais seguidos
+# A mesma semente e os mesmos parâmetros geram sempre o mesmo arquivo.
+
+COLUNAS_BRUTAS = [
+    'media_owner_id', 'media_owner_username', 'media_id', 'short_code', 'created_time', 'caption',
+    'likes_count', 'comments_count', 'comment_id', 'created_time_comment', 'comment_owner_id',
+    'comment_owner_username', 'parent_comment_id', 'comment_tag', 'text'
+]
+
+PALAVRAS = np.array(['eleição', 'voto', 'brasil', 'hoje', 'parabéns', 'lindo', 'força', 'amém', 'kkkk',
+                     'verdade', 'mentira', 'presidente', 'debate', 'juntos', 'obrigado', 'top', 'show'])
+
+# Parâmetros padrão do conjunto gerado (frações sobre o número de linhas)
+PARAMETROS_PADRAO = {
+    'linhas_por_publicacao': 20,    # média de linhas (comentários) por publicação
+    'linhas_por_usuario': 200,      # média de linhas por dono de publicação
+    'expoente_zipf': 1.1,           # concentração das publicações nos donos
+    'forma_pareto': 1.3,            # cauda dos comentários por publicação (menor = mais pesada)
+    'fracao_iso': 0.3,              # datas gravadas como texto ISO em vez de timestamp UNIX
+    'fracao_sem_comentario': 0.05,  # linhas de publicações sem comentário
+    'fracao_respostas': 0.15,       # comentários que respondem a outro (parent_comment_id)
+    'fracao_nulos': 0.002,          # media_owner_id ou created_time vazios (descartados no pré-processamento)
+    'fracao_duplicatas': 0.02,      # linhas repetidas
+    'fracao_malformadas': 0.001,    # linhas com um campo a mais
+    'tamanho_bloco': 200000         # linhas geradas e gravadas por vez
+}
+
+# Textos de 'minimo' a 'maximo' palavras, sorteados de um conjunto de até 10000 frases
+def _textos(rng, quantidade, minimo=1, maximo=12):
+    frases = min(quantidade, 10000)
+    tamanhos = rng.integers(minimo, maximo + 1, frases)
+    palavras = PALAVRAS[rng.integers(0, len(PALAVRAS), tamanhos.sum())]
+    frases = np.array([' '.join(partes) for partes in np.split(palavras, np.cumsum(tamanhos)[:-1])], dtype=object)
+    textos = frases[rng.integers(0, len(frases), quantidade)]
+    # Alguns textos com aspas, vírgulas e quebras de linha, que precisam de escape no CSV
+    especiais = rng.random(quantidade)
+    textos[especiais < 0.02] = textos[especiais < 0.02] + ', "citação"'
+    textos[(especiais >= 0.02) & (especiais < 0.03)] = textos[(especiais >= 0.02) & (especiais < 0.03)] + '\nsegunda linha'
+    return textos
+
+# Datas como texto: timestamp UNIX ou, em uma fração das linhas, ISO (AAAA-MM-DD HH:MM:SS)
+def _datas_texto(rng, segundos, fracao_iso):
+    textos = segundos.astype(np.int64).astype(str).astype(object)
+    iso = rng.random(len(segundos)) < fracao_iso
+    textos[iso] = pd.to_datetime(segundos[iso], unit='s').strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+    return textos
+
+# Gera o arquivo de um dia com `linhas` linhas, mais as repetidas e as malformadas;
+# retorna o total de linhas gravadas
+def gerar_dia(caminho, data, linhas, semente=0, **parametros):
+    parametros = dict(PARAMETROS_PADRAO, **parametros)
+    inicio_dia = pd.Timestamp(data).value // 10**9
+    rng = np.random.default_rng([semente, int(inicio_dia)])
+
+    # Donos, com peso de Zipf pelo posto de cada um
+    numero_usuarios = max(10, linhas // parametros['linhas_por_usuario'])
+    pesos_usuarios = 1.0 / np.arange(1, numero_usuarios + 1) ** parametros['expoente_zipf']
+    ids_usuarios = rng.choice(10**10, size=numero_usuarios, replace=False) + 10**9
+
+    # Publicações do dia: dono, horário e peso (cauda pesada) no número de comentários
+    numero_posts = max(1, linhas // parametros['linhas_por_publicacao'])
+    dono_post = rng.choice(numero_usuarios, size=numero_posts, p=pesos_usuarios / pesos_usuarios.sum())
+    hora_post = inicio_dia + rng.integers(0, 86400, numero_posts)
+    pesos_posts = rng.pareto(parametros['forma_pareto'], numero_posts) + 1
+    pesos_posts /= pesos_posts.sum()
+    id_post = int(inicio_dia) * 10**6 + np.arange(numero_posts)
+    legenda_post = _textos(rng, numero_posts, 0, 20)
+    curtidas_post = np.floor(rng.lognormal(4, 1.5, numero_posts)).astype(np.int64)
+    comentarios_post = np.bincount(rng.choice(numero_posts, size=linhas, p=pesos_posts), minlength=numero_posts)
+
+    proximo_comentario = int(inicio_dia) * 10**7
+    gravadas = 0
+    total = 0
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        arquivo.write(','.join(f'"{coluna}"' for coluna in COLUNAS_BRUTAS) + '\n')
+        while gravadas < linhas:
+            n = min(parametros['tamanho_bloco'], linhas - gravadas)
+            post = rng.choice(numero_posts, size=n, p=pesos_posts)
+            dono = dono_post[post]
+            comentador = rng.choice(numero_usuarios, size=n, p=pesos_usuarios / pesos_usuarios.sum())
+            # Latência do comentário: log-normal (mediana de ~1 h, cauda de dias)
+            hora_comentario = hora_post[post] + np.floor(rng.lognormal(8, 1.8, n))
+            ids_comentario = proximo_comentario + np.arange(n)
+            proximo_comentario += n
+
+            bloco = pd.DataFrame({
+                'media_owner_id': ids_usuarios[dono].astype(str).astype(object),
+                'media_owner_username': np.char.add('usuario_', dono.astype(str)).astype(object),
+                'media_id': id_post[post].astype(str).astype(object),
+                'short_code': np.char.add('B', np.char.upper(np.char.mod('%x', id_post[post] * 2654435761 % 16**11))).astype(object),
+                'created_time': _datas_texto(rng, hora_post[post], parametros['fracao_iso']),
+                'caption': legenda_post[post],
+                'likes_count': curtidas_post[post].astype(str).astype(object),
+                'comments_count': comentarios_post[post].astype(str).astype(object),
+                'comment_id': ids_comentario.astype(str).astype(object),
+                'created_time_comment': _datas_texto(rng, hora_comentario, parametros['fracao_iso']),
+                'comment_owner_id': ids_usuarios[comentador].astype(str).astype(object),
+                'comment_owner_username': np.char.add('usuario_', comentador.astype(str)).astype(object),
+                'parent_comment_id': '',
+                'comment_tag': np.where(rng.random(n) < 0.1, np.char.add('@usuario_', rng.integers(0, numero_usuarios, n).astype(str)), '[]').astype(object),
+                'text': _textos(rng, n)
+            }, columns=COLUNAS_BRUTAS)
+
+            # Respostas apontam para um comentário anterior do mesmo bloco
+            respostas = np.flatnonzero(rng.random(n) < parametros['fracao_respostas'])
+            respostas = respostas[respostas > 0]
+            bloco.loc[respostas, 'parent_comment_id'] = ids_comentario[rng.integers(0, respostas)].astype(str)
+
+            # Publicações sem comentário: campos do comentário vazios
+            sem_comentario = rng.random(n) < parametros['fracao_sem_comentario']
+            bloco.loc[sem_comentario, ['comment_id', 'created_time_comment', 'comment_owner_id', 'comment_owner_username',
+                                       'parent_comment_id', 'comment_tag', 'text']] = ''
+
+            # Nulos nas colunas obrigatórias
+            bloco.loc[rng.random(n) < parametros['fracao_nulos'], 'media_owner_id'] = ''
+            bloco.loc[rng.random(n) < parametros['fracao_nulos'], 'created_time'] = ''
+
+            # Linhas repetidas, em posições aleatórias do bloco
+            repetidas = bloco.iloc[rng.integers(0, n, int(n * parametros['fracao_duplicatas']))]
+            bloco = pd.concat([bloco, repetidas], ignore_index=True)
+            bloco = bloco.iloc[rng.permutation(len(bloco))]
+            bloco.to_csv(arquivo, index=False, header=False, quoting=csv.QUOTE_ALL, escapechar='\\')
+
+            # Linhas malformadas (um campo a mais), que o leitor deve ignorar
+            malformadas = bloco.iloc[rng.integers(0, len(bloco), int(n * parametros['fracao_malformadas']))].copy()
+            malformadas['campo_extra'] = 'campo extra'
+            malformadas.to_csv(arquivo, index=False, header=False, quoting=csv.QUOTE_ALL, escapechar='\\')
+            gravadas += n
+            total += len(bloco) + len(malformadas)
+    return total
+
+# Gera `dias` arquivos diários consecutivos (<diretorio>/AAAA-MM-DD.csv) a partir de data_inicio
+def gerar_conjunto(diretorio, data_inicio, dias, linhas_por_dia, semente=0, **parametros):
+    os.makedirs(diretorio, exist_ok=True)
+    caminhos = []
+    for dia in pd.date_range(data_inicio, periods=dias, freq='D'):
+        caminho = os.path.join(diretorio, dia.strftime('%Y-%m-%d') + '.csv')
+        gerar_dia(caminho, dia, linhas_por_dia, semente, **parametros)
+        caminhos.append(caminho)
+    return caminhos
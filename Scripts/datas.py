@@ -0,0 +1,67 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# Conversão das colunas de data dos arquivos brutos, que misturam timestamps UNIX
+# e datas como texto (usada no pré-processamento e no monitoramento de picos)
+
+# Função para converter timestamps ou datetimes
+def converter_data(valor):
+    try:
+        # Se for timestamp numérico (UNIX)
+        if isinstance(valor, (int, float)) or (isinstance(valor, str) and valor.isdigit()):
+            return pd.to_datetime(int(valor), unit='s')
+        # Se for string no formato datetime
+        return pd.to_datetime(valor, errors='coerce')
+    except:
+        return pd.NaT
+
+# Versão vetorizada de converter_data: separa a coluna em grupos com máscaras
+# (timestamps UNIX e strings de data) e converte cada grupo em uma única chamada.
+# Retorna a série convertida e a quantidade de valores não nulos que viraram NaT.
+def converter_datas_vetorizado(serie):
+    resultado = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+    nao_nulos = serie.notna()
+
+    # Coluna inteiramente numérica (int64/float64): todos os valores são timestamps UNIX
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        numeros = serie.astype('float64')
+        numeros = numeros[numeros.notna() & (numeros.abs() < 9.2e9)]
+        resultado.loc[numeros.index] = pd.to_datetime(np.trunc(numeros).astype('int64'), unit='s', errors='coerce')
+        return resultado, int((nao_nulos & resultado.isna()).sum())
+
+    # Coluna de objetos: isdigit() devolve NaN para valores que não são strings
+    digitos = serie.str.isdigit() if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie) else pd.Series(np.nan, index=serie.index)
+    eh_string = digitos.notna()
+    mascara_epoch = digitos.eq(True)
+    mascara_iso = eh_string & ~mascara_epoch
+    mascara_resto = nao_nulos & ~eh_string
+
+    # Grupo 1: strings só com dígitos (timestamps UNIX)
+    if mascara_epoch.any():
+        numeros = pd.to_numeric(serie[mascara_epoch], errors='coerce')
+        validos = numeros.notna() & (numeros.abs() < 9.2e9)
+        resultado.loc[validos[validos].index] = pd.to_datetime(numeros[validos].astype('int64'), unit='s', errors='coerce')
+        # Dígitos que o pandas não reconhece (ex.: outros alfabetos) seguem pelo caminho original
+        mascara_resto |= mascara_epoch & numeros.isna().reindex(serie.index, fill_value=False)
+
+    # Grupo 2: strings de data (ISO ou outros formatos), interpretadas elemento a elemento
+    if mascara_iso.any():
+        try:
+            # Fusos horários misturados (só avisados pelo pandas) também seguem pelo caminho original
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', FutureWarning)
+                convertidas = pd.to_datetime(serie[mascara_iso], errors='coerce', format='mixed')
+            if convertidas.dtype != resultado.dtype:
+                raise ValueError("datas com fuso horário")
+            resultado.loc[mascara_iso] = convertidas
+        except (ValueError, TypeError, FutureWarning):
+            mascara_resto |= mascara_iso
+
+    # Grupo 3: valores restantes (números soltos, fusos horários, etc.) usam converter_data
+    if mascara_resto.any():
+        resultado = resultado.astype(object)
+        resultado.loc[mascara_resto] = serie[mascara_resto].apply(converter_data)
+        resultado = pd.Series(list(resultado), index=serie.index).infer_objects()
+
+    return resultado, int((nao_nulos & resultado.isna()).sum())
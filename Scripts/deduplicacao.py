@@ -0,0 +1,149 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Hash usado para valores nulos (NaN, None, NaT e pd.NA precisam gerar o mesmo hash
+# independentemente do tipo que a coluna recebeu em cada chunk)
+HASH_NULO = np.uint64(0x9E3779B97F4A7C15)
+MULTIPLICADOR = np.uint64(0x100000001B3)
+
+# Blocos em disco tolerados antes de uni-los em um só (cada consulta percorre todos)
+MAXIMO_BLOCOS_DISCO = 4
+
+# Função para calcular a impressão digital (hash de 64 bits) de cada linha do chunk
+def hash_linhas(chunk):
+    hashes = np.zeros(len(chunk), dtype=np.uint64)
+    for coluna in sorted(chunk.columns):
+        serie = chunk[coluna]
+        # Colunas inteiras lidas como float (por causa de NaN) viram Int64 para gerar
+        # o mesmo hash que a mesma coluna lida como int64 em outro chunk
+        if pd.api.types.is_float_dtype(serie):
+            valores = serie.dropna()
+            if (valores == np.trunc(valores)).all() and (valores.abs() < 2**63).all():
+                serie = serie.astype('Int64')
+        hash_coluna = pd.util.hash_pandas_object(serie, index=False).to_numpy(dtype=np.uint64, copy=True)
+        hash_coluna[serie.isna().to_numpy()] = HASH_NULO
+        with np.errstate(over='ignore'):
+            hashes = (hashes * MULTIPLICADOR) ^ hash_coluna
+    return hashes
+
+# Conjunto de hashes de linhas já vistas, compartilhado entre chunks e arquivos.
+# Os hashes ficam em blocos ordenados na memória; quando passam do limite de
+# memória, são unidos em um único bloco e gravados em disco (.npy), que depois
+# é consultado via memória mapeada; passando de MAXIMO_BLOCOS_DISCO, os blocos em
+# disco também são unidos, para o custo de cada consulta não crescer com o número
+# de despejos. Como a comparação é feita por hash de 64 bits,
+# a chance de duas linhas diferentes colidirem é desprezível (~n²/2^65).
+class DeduplicadorGlobal:
+    def __init__(self, limite_memoria_mb=512, diretorio_temporario=None):
+        self.limite_bytes = int(limite_memoria_mb * 1024 * 1024)
+        self.diretorio = tempfile.mkdtemp(prefix='dedup_', dir=diretorio_temporario)
+        self.blocos_memoria = []
+        self.blocos_disco = []
+        self.despejos = 0
+        self.linhas_vistas = 0
+        self.duplicatas_removidas = 0
+
+    # Registra um lote de hashes e retorna a máscara das posições inéditas
+    # (primeira ocorrência no lote e ausente de todos os lotes anteriores)
+    def registrar(self, hashes):
+        manter = np.zeros(len(hashes), dtype=bool)
+        if len(hashes) == 0:
+            return manter
+
+        # Primeira ocorrência de cada hash dentro do próprio lote
+        _, primeiros = np.unique(hashes, return_index=True)
+        primeiros.sort()
+
+        # Descarta hashes já registrados em lotes anteriores
+        novos = ~self.contem(hashes[primeiros])
+        manter[primeiros[novos]] = True
+
+        self._adicionar(np.sort(hashes[manter]))
+        self.linhas_vistas += len(hashes)
+        self.duplicatas_removidas += len(hashes) - int(manter.sum())
+        return manter
+
+    # Verifica quais hashes já estão no conjunto (memória e disco)
+    def contem(self, hashes):
+        encontrados = np.zeros(len(hashes), dtype=bool)
+        for bloco in self.blocos_memoria:
+            encontrados |= self._buscar(bloco, hashes)
+        for caminho in self.blocos_disco:
+            encontrados |= self._buscar(np.load(caminho, mmap_mode='r'), hashes)
+        return encontrados
+
+    @staticmethod
+    def _buscar(bloco, hashes):
+        if len(bloco) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        posicoes = np.searchsorted(bloco, hashes)
+        posicoes[posicoes == len(bloco)] = len(bloco) - 1
+        return np.asarray(bloco[posicoes]) == hashes
+
+    # Adiciona um bloco ordenado; blocos de tamanho parecido são unidos para manter
+    # poucas buscas por chunk (número de blocos cresce como log n)
+    def _adicionar(self, bloco):
+        if len(bloco) == 0:
+            return
+        self.blocos_memoria.append(bloco)
+        while len(self.blocos_memoria) > 1 and len(self.blocos_memoria[-2]) <= 2 * len(self.blocos_memoria[-1]):
+            ultimo = self.blocos_memoria.pop()
+            penultimo = self.blocos_memoria.pop()
+            unido = np.concatenate([penultimo, ultimo])
+            unido.sort(kind='mergesort')
+            self.blocos_memoria.append(unido)
+        if self.memoria_usada() > self.limite_bytes:
+            self._despejar()
+
+    # Grava os blocos em memória em disco como um único bloco ordenado
+    def _despejar(self):
+        bloco = np.concatenate(self.blocos_memoria)
+        bloco.sort()
+        caminho = os.path.join(self.diretorio, f"bloco_{self.despejos:05d}.npy")
+        np.save(caminho, bloco)
+        self.blocos_disco.append(caminho)
+        self.blocos_memoria = []
+        self.despejos += 1
+        if len(self.blocos_disco) > MAXIMO_BLOCOS_DISCO:
+            self._unir_disco()
+
+    # Une os blocos em disco em um único bloco ordenado, por faixas de valores: os
+    # limites das faixas vêm do maior bloco, e cada faixa (com cerca de limite_bytes
+    # de hashes somando todos os blocos) é ordenada na memória e gravada em sequência
+    def _unir_disco(self):
+        blocos = [np.load(caminho, mmap_mode='r') for caminho in self.blocos_disco]
+        total = sum(len(bloco) for bloco in blocos)
+        maior = max(blocos, key=len)
+        passo = max(1, len(maior) * (self.limite_bytes // 8) // max(total, 1))
+        limites = list(maior[passo::passo]) + [None]
+        caminho = os.path.join(self.diretorio, f"unido_{self.despejos:05d}.npy")
+        unido = np.lib.format.open_memmap(caminho, mode='w+', dtype=np.uint64, shape=(total,))
+        inicios = [0] * len(blocos)
+        escrito = 0
+        for limite in limites:
+            partes = []
+            for i, bloco in enumerate(blocos):
+                fim = len(bloco) if limite is None else int(np.searchsorted(bloco, limite))
+                partes.append(np.asarray(bloco[inicios[i]:fim]))
+                inicios[i] = fim
+            faixa = np.concatenate(partes)
+            faixa.sort()
+            unido[escrito:escrito + len(faixa)] = faixa
+            escrito += len(faixa)
+        unido.flush()
+        del unido, blocos, maior
+        for antigo in self.blocos_disco:
+            os.remove(antigo)
+        self.blocos_disco = [caminho]
+
+    def memoria_usada(self):
+        return sum(bloco.nbytes for bloco in self.blocos_memoria)
+
+    # Remove os arquivos temporários
+    def fechar(self):
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+        self.blocos_disco = []
+        self.blocos_memoria = []
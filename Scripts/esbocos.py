@@ -0,0 +1,213 @@
+import math
+import numpy as np
+import pandas as pd
+from deduplicacao import hash_linhas
+
+# Esboços (sketches) aproximados para as execuções sobre o período completo.
+# Todos recebem hashes de 64 bits (hash_linhas) e podem ser unidos com juntar(),
+# para combinar resultados de arquivos processados em paralelo.
+
+# Número de bits de índice do HyperLogLog para um erro relativo (desvio padrão) desejado
+def precisao_para_erro(erro_relativo):
+    return min(18, max(4, math.ceil(math.log2((1.04 / erro_relativo) ** 2))))
+
+# Posição do primeiro bit 1 (contando a partir de 1) nos 64 - p bits restantes do hash
+def _posicao_primeiro_bit(hashes, p):
+    bits = 64 - p
+    resto = hashes & np.uint64((1 << bits) - 1)
+    alto = (resto >> np.uint64(32)).astype(np.float64)
+    baixo = (resto & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp devolve o expoente exato (= número de bits) para inteiros de até 32 bits
+    tamanho = np.where(alto > 0, 32 + np.frexp(alto)[1], np.frexp(baixo)[1])
+    return (bits - tamanho + 1).astype(np.uint8)
+
+def _estimar_hll(registros):
+    m = registros.shape[-1]
+    alfa = 0.7213 / (1 + 1.079 / m) if m >= 128 else {16: 0.673, 32: 0.697, 64: 0.709}[m]
+    estimativa = alfa * m * m / np.sum(np.ldexp(1.0, -registros.astype(np.int64)), axis=-1)
+    zeros = np.count_nonzero(registros == 0, axis=-1)
+    # Correção para cardinalidades pequenas (contagem linear)
+    pequena = (estimativa <= 2.5 * m) & (zeros > 0)
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where(pequena, linear, estimativa)
+
+# HyperLogLog: contagem aproximada de elementos distintos
+class HyperLogLog:
+    def __init__(self, erro_relativo=0.01, p=None):
+        self.p = p if p is not None else precisao_para_erro(erro_relativo)
+        self.registros = np.zeros(1 << self.p, dtype=np.uint8)
+
+    @property
+    def erro_relativo(self):
+        return 1.04 / math.sqrt(len(self.registros))
+
+    def adicionar(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return
+        indices = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        np.maximum.at(self.registros, indices, _posicao_primeiro_bit(hashes, self.p))
+
+    def estimar(self):
+        return float(_estimar_hll(self.registros))
+
+    def juntar(self, outro):
+        np.maximum(self.registros, outro.registros, out=self.registros)
+        return self
+
+# Contagem aproximada de elementos distintos por chave (ex.: short_code distintos por hora).
+# Cada chave tem o seu HyperLogLog; todas usam a mesma precisão.
+class DistintosPorChave:
+    def __init__(self, erro_relativo=0.02):
+        self.p = precisao_para_erro(erro_relativo)
+        self.esbocos = {}
+
+    @property
+    def erro_relativo(self):
+        return 1.04 / math.sqrt(1 << self.p)
+
+    def adicionar(self, chaves, hashes):
+        chaves = pd.Series(chaves).reset_index(drop=True)
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        validos = chaves.notna().to_numpy()
+        for chave, posicoes in chaves[validos].groupby(chaves[validos]).indices.items():
+            if chave not in self.esbocos:
+                self.esbocos[chave] = HyperLogLog(p=self.p)
+            self.esbocos[chave].adicionar(hashes[validos][posicoes])
+
+    def estimar(self):
+        if not self.esbocos:
+            return pd.Series(dtype=float)
+        chaves = sorted(self.esbocos)
+        return pd.Series(_estimar_hll(np.stack([self.esbocos[chave].registros for chave in chaves])), index=chaves)
+
+    def juntar(self, outro):
+        for chave, esboco in outro.esbocos.items():
+            if chave in self.esbocos:
+                self.esbocos[chave].juntar(esboco)
+            else:
+                self.esbocos[chave] = HyperLogLog(p=self.p).juntar(esboco)
+        return self
+
+# Top-K aproximado por número de elementos distintos (Space-Saving com um pequeno
+# HyperLogLog por contador). São monitoradas no máximo k chaves; quando uma chave
+# nova chega com a tabela cheia, ela ocupa o lugar da chave de menor contagem e
+# herda essa contagem como erro (superestimação máxima, como no Space-Saving).
+# Com k = 1/erro_topk, nenhuma chave fora da tabela tem contagem maior que
+# erro_topk * total, e o erro herdado de cada chave também fica abaixo disso.
+class TopKDistintos:
+    def __init__(self, erro_topk=0.001, erro_hll=0.05):
+        self.k = max(1, math.ceil(1 / erro_topk))
+        self.p = precisao_para_erro(erro_hll)
+        self.registros = np.zeros((self.k, 1 << self.p), dtype=np.uint8)
+        self.estimativas = np.zeros(self.k)
+        self.erros = np.zeros(self.k)
+        self.chaves = [None] * self.k
+        self.rotulos = [None] * self.k
+        self.posicoes = {}
+        self.total = 0.0
+
+    @property
+    def erro_hll(self):
+        return 1.04 / math.sqrt(1 << self.p)
+
+    def contagens(self):
+        return self.estimativas + self.erros
+
+    # Adiciona pares (chave, hash do elemento); rótulos opcionais (ex.: username) por chave
+    def adicionar(self, chaves, hashes, rotulos=None):
+        dados = pd.DataFrame({'chave': np.asarray(chaves), 'hash': np.asarray(hashes, dtype=np.uint64)})
+        if rotulos is not None:
+            dados['rotulo'] = np.asarray(rotulos, dtype=object)
+        dados = dados[dados['chave'].notna()]
+        if dados.empty:
+            return
+        grupos = dados.groupby('chave', sort=False)
+        tamanhos = grupos.size()
+        # Chaves já monitoradas primeiro; depois as novas, das maiores para as menores
+        monitoradas = tamanhos.index.isin(list(self.posicoes))
+        ordem = list(tamanhos[monitoradas].index) + list(tamanhos[~monitoradas].sort_values(ascending=False).index)
+        indices = grupos.indices
+        primeiros_rotulos = grupos['rotulo'].first() if rotulos is not None else None
+
+        for chave in ordem:
+            hashes_chave = dados['hash'].to_numpy()[indices[chave]]
+            posicao = self.posicoes.get(chave)
+            if posicao is None:
+                if len(self.posicoes) < self.k:
+                    # Tabela ainda não está cheia (posições são ocupadas em ordem)
+                    posicao = len(self.posicoes)
+                    self.erros[posicao] = 0
+                else:
+                    posicao = int(np.argmin(self.contagens()))
+                    self.erros[posicao] = self.contagens()[posicao]
+                    del self.posicoes[self.chaves[posicao]]
+                self.registros[posicao] = 0
+                self.estimativas[posicao] = 0
+                self.chaves[posicao] = chave
+                self.rotulos[posicao] = primeiros_rotulos[chave] if primeiros_rotulos is not None else None
+                self.posicoes[chave] = posicao
+            antes = self.estimativas[posicao]
+            linha = self.registros[posicao]
+            indices_hll = (hashes_chave >> np.uint64(64 - self.p)).astype(np.int64)
+            np.maximum.at(linha, indices_hll, _posicao_primeiro_bit(hashes_chave, self.p))
+            self.estimativas[posicao] = _estimar_hll(linha)
+            self.total += self.estimativas[posicao] - antes
+
+    # Une dois resumos (mesmos parâmetros). Chaves presentes em só um deles recebem
+    # como erro a menor contagem do outro (limite do que poderiam ter lá).
+    def juntar(self, outro):
+        minimo_proprio = self.contagens().min() if len(self.posicoes) == self.k else 0.0
+        minimo_outro = outro.contagens().min() if len(outro.posicoes) == outro.k else 0.0
+        itens = {}
+        for resumo, minimo_do_outro, outro_resumo in ((self, minimo_outro, outro), (outro, minimo_proprio, self)):
+            for chave, posicao in resumo.posicoes.items():
+                if chave in itens:
+                    continue
+                registros = resumo.registros[posicao].copy()
+                erro = resumo.erros[posicao]
+                if chave in outro_resumo.posicoes:
+                    posicao_outro = outro_resumo.posicoes[chave]
+                    np.maximum(registros, outro_resumo.registros[posicao_outro], out=registros)
+                    erro += outro_resumo.erros[posicao_outro]
+                else:
+                    erro += minimo_do_outro
+                itens[chave] = (registros, erro, resumo.rotulos[posicao])
+
+        chaves = list(itens)
+        registros = np.stack([itens[chave][0] for chave in chaves]) if chaves else np.zeros((0, 1 << self.p), dtype=np.uint8)
+        estimativas = _estimar_hll(registros) if chaves else np.zeros(0)
+        erros = np.array([itens[chave][1] for chave in chaves])
+        melhores = np.argsort(-(estimativas + erros), kind='stable')[:self.k]
+
+        self.registros[:] = 0
+        self.estimativas[:] = 0
+        self.erros[:] = 0
+        self.chaves = [None] * self.k
+        self.rotulos = [None] * self.k
+        self.posicoes = {}
+        for posicao, indice in enumerate(melhores):
+            chave = chaves[indice]
+            self.registros[posicao] = registros[indice]
+            self.estimativas[posicao] = estimativas[indice]
+            self.erros[posicao] = erros[indice]
+            self.chaves[posicao] = chave
+            self.rotulos[posicao] = itens[chave][2]
+            self.posicoes[chave] = posicao
+        self.total += outro.total
+        return self
+
+    # As n chaves de maior contagem, com a estimativa e o erro máximo de cada uma
+    def topo(self, n=10):
+        ocupadas = sorted(self.posicoes.values())
+        tabela = pd.DataFrame({
+            'chave': [self.chaves[i] for i in ocupadas],
+            'rotulo': [self.rotulos[i] for i in ocupadas],
+            'contagem': self.contagens()[ocupadas],
+            'erro_maximo': self.erros[ocupadas]
+        })
+        return tabela.sort_values('contagem', ascending=False, kind='stable').head(n).reset_index(drop=True)
+
+# Hash de 64 bits de uma única coluna (mesma normalização usada na deduplicação)
+def hash_coluna(serie):
+    return hash_linhas(serie.to_frame())
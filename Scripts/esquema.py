@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from armazenamento import COLUNAS_ID, COLUNAS_DICIONARIO
+
+# Esquema compacto dos chunks em memória, compartilhado por todos os scripts de
+# análise (aplicado em varredura.processar_chunks, junto da conversão das datas):
+#   - IDs viram inteiros (int64, ou Int64 quando há nulos) em vez de float ou texto;
+#     como float, IDs acima de 2**53 perderiam precisão
+#   - nomes de usuário, short_code e comment_tag viram categorias: cada valor
+#     distinto fica guardado uma vez no dicionário e as linhas guardam só o código
+#   - contagens (resultados dos agregadores) usam o menor tipo inteiro que as comporta
+# hash_linhas gera o mesmo hash para as colunas compactas e para as originais, então
+# os pares já vistos e os parciais salvos continuam válidos.
+
+COLUNAS_CATEGORIA = COLUNAS_DICIONARIO + ['comment_tag']
+
+TIPOS_CONTAGEM = ['int8', 'int16', 'int32', 'int64']
+
+# IDs como inteiros; colunas com valores que não são inteiros ficam como estão
+def compactar_id(serie):
+    if pd.api.types.is_integer_dtype(serie):
+        return serie
+    numeros = pd.to_numeric(serie, errors='coerce')
+    validos = numeros.dropna()
+    if len(validos) != serie.notna().sum() or not (validos == np.trunc(validos)).all() or not (validos.abs() < 2**63).all():
+        return serie
+    return numeros.astype('Int64' if len(validos) < len(numeros) else 'int64')
+
+def compactar(chunk):
+    for coluna in chunk.columns:
+        if coluna in COLUNAS_ID:
+            chunk[coluna] = compactar_id(chunk[coluna])
+        elif coluna in COLUNAS_CATEGORIA:
+            # Categorias vindas do Parquet trazem o dicionário inteiro da partição
+            if isinstance(chunk[coluna].dtype, pd.CategoricalDtype):
+                chunk[coluna] = chunk[coluna].cat.remove_unused_categories()
+            else:
+                chunk[coluna] = chunk[coluna].astype('category')
+    return chunk
+
+# Contagens (Series ou DataFrame) no menor tipo inteiro que comporta o maior valor
+def reduzir_contagens(contagens):
+    if contagens.size == 0:
+        return contagens
+    minimo = np.min(contagens.to_numpy())
+    maximo = np.max(contagens.to_numpy())
+    for tipo in TIPOS_CONTAGEM:
+        if np.iinfo(tipo).min <= minimo and maximo <= np.iinfo(tipo).max:
+            return contagens.astype(tipo)
+    return contagens
+
+# Memória de cada coluna em bytes (inclui o conteúdo das strings)
+def memoria_por_coluna(chunk):
+    return chunk.memory_usage(index=False, deep=True)
+
+# Memória por coluna antes e depois do esquema compacto, somada sobre os chunks
+class RelatorioMemoria:
+    def __init__(self):
+        self.antes = pd.Series(dtype='int64')
+        self.depois = pd.Series(dtype='int64')
+        self.tipos = {}
+
+    def adicionar(self, antes, chunk):
+        self.antes = self.antes.add(antes, fill_value=0)
+        self.depois = self.depois.add(memoria_por_coluna(chunk), fill_value=0)
+        for coluna, tipo in chunk.dtypes.items():
+            self.tipos.setdefault(coluna, str(tipo))
+
+    def tabela(self):
+        tabela = pd.DataFrame({'Tipo': pd.Series(self.tipos),
+                               'Antes (MB)': self.antes / 2**20,
+                               'Depois (MB)': self.depois / 2**20}).reindex(list(self.tipos))
+        tabela.loc['Total'] = ['', tabela['Antes (MB)'].sum(), tabela['Depois (MB)'].sum()]
+        tabela['Redução'] = 1 - tabela['Depois (MB)'] / tabela['Antes (MB)']
+        return tabela
+
+    def imprimir(self):
+        tabela = self.tabela()
+        print("\nMemória por coluna (esquema compacto):")
+        print(tabela.to_string(formatters={'Antes (MB)': '{:.2f}'.format, 'Depois (MB)': '{:.2f}'.format,
+                                           'Redução': '{:.0%}'.format}))
@@ -0,0 +1,200 @@
+import math
+import numpy as np
+import pandas as pd
+
+# Estatísticas descritivas calculadas em uma passada, lote a lote, sem guardar a
+# série inteira: média e variância pelo algoritmo de Welford (na forma por lotes),
+# mínimo e máximo, quantis por um esboço KLL e moda por uma tabela de frequências
+# limitada. Todos os resumos podem ser unidos com juntar(), para combinar
+# resultados de partes da série processadas em paralelo.
+# Séries já carregadas em memória (as contagens devolvidas pelos agregadores) são
+# resumidas com as estatísticas exatas de EstatisticasSerie (resumir_serie).
+
+# Esboço KLL de quantis. Cada nível guarda itens com peso 2^nível; quando um nível
+# passa da sua capacidade, ele é ordenado e metade dos itens (posições pares ou
+# ímpares, escolhidas ao acaso) sobe para o nível seguinte. Enquanto nenhum nível
+# é compactado os quantis são exatos. Com k = 200 o erro de posto fica em torno
+# de 1,3% do número de valores.
+class EsbocoKLL:
+    def __init__(self, k=200, semente=None):
+        self.k = k
+        self.niveis = [np.zeros(0)]
+        self.n = 0
+        self.aleatorio = np.random.default_rng(semente)
+
+    # Níveis mais baixos têm capacidade menor (fator 2/3 por nível)
+    def _capacidade(self, nivel):
+        profundidade = len(self.niveis) - nivel - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** profundidade))
+
+    def adicionar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self.n += len(valores)
+        self._compactar()
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) > self._capacidade(nivel):
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.zeros(0))
+                itens = np.sort(itens)
+                # Com número ímpar de itens, o último fica no próprio nível
+                resto = itens[len(itens) - len(itens) % 2:]
+                pares = itens[:len(itens) - len(itens) % 2]
+                deslocamento = int(self.aleatorio.integers(2))
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], pares[deslocamento::2]])
+                self.niveis[nivel] = resto
+            nivel += 1
+
+    def juntar(self, outro):
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.zeros(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self.n += outro.n
+        self._compactar()
+        return self
+
+    # Quantil com interpolação linear entre postos (mesma definição do pandas
+    # quando o esboço ainda é exato)
+    def quantil(self, q):
+        if self.n == 0:
+            return float('nan')
+        valores = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(itens), 2 ** nivel) for nivel, itens in enumerate(self.niveis)])
+        ordem = np.argsort(valores, kind='stable')
+        valores = valores[ordem]
+        acumulado = np.cumsum(pesos[ordem])
+        posicao = q * (acumulado[-1] - 1)
+        abaixo = valores[np.searchsorted(acumulado, math.floor(posicao), side='right')]
+        acima = valores[np.searchsorted(acumulado, math.ceil(posicao), side='right')]
+        return float(abaixo + (acima - abaixo) * (posicao - math.floor(posicao)))
+
+# Tabela de frequências limitada (Misra-Gries): no máximo `capacidade` valores são
+# contados. Quando um valor novo não cabe, todas as contagens diminuem; qualquer
+# valor com frequência acima de n / (capacidade + 1) continua na tabela. Enquanto
+# a série tem até `capacidade` valores distintos, as contagens são exatas.
+class TabelaFrequencias:
+    def __init__(self, capacidade=1000):
+        self.capacidade = capacidade
+        self.contagens = {}
+
+    def adicionar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        valores, quantidades = np.unique(valores[~np.isnan(valores)], return_counts=True)
+        for valor, quantidade in zip(valores.tolist(), quantidades.tolist()):
+            self.contagens[valor] = self.contagens.get(valor, 0) + quantidade
+        self._limitar()
+
+    def _limitar(self):
+        if len(self.contagens) > self.capacidade:
+            corte = sorted(self.contagens.values(), reverse=True)[self.capacidade]
+            self.contagens = {valor: contagem - corte for valor, contagem in self.contagens.items() if contagem > corte}
+
+    def juntar(self, outro):
+        for valor, contagem in outro.contagens.items():
+            self.contagens[valor] = self.contagens.get(valor, 0) + contagem
+        self._limitar()
+        return self
+
+    # Valor mais frequente; empates ficam com o menor valor (como scipy.stats.mode)
+    def moda(self):
+        if not self.contagens:
+            return float('nan')
+        return min(self.contagens, key=lambda valor: (-self.contagens[valor], valor))
+
+class EstatisticasStreaming:
+    def __init__(self, k_quantis=200, capacidade_moda=1000):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = float('inf')
+        self.maximo = float('-inf')
+        self.quantis = EsbocoKLL(k_quantis)
+        self.frequencias = TabelaFrequencias(capacidade_moda)
+
+    # Une média e soma dos quadrados dos desvios de duas partes (Welford/Chan)
+    def _combinar(self, n, media, m2):
+        total = self.n + n
+        delta = media - self.media
+        self.media += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def adicionar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return
+        media = valores.mean()
+        self._combinar(len(valores), media, float(((valores - media) ** 2).sum()))
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        self.quantis.adicionar(valores)
+        self.frequencias.adicionar(valores)
+
+    def juntar(self, outro):
+        if outro.n:
+            self._combinar(outro.n, outro.media, outro.m2)
+            self.minimo = min(self.minimo, outro.minimo)
+            self.maximo = max(self.maximo, outro.maximo)
+            self.quantis.juntar(outro.quantis)
+            self.frequencias.juntar(outro.frequencias)
+        return self
+
+    def variancia(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0
+
+    def quantil(self, q):
+        return self.quantis.quantil(q) if self.n else 0
+
+    # Mesmas medidas (e nomes) impressas pelos scripts AED_*
+    def resumo(self):
+        if self.n == 0:
+            return {'Média': 0, 'Mediana': 0, 'Moda': 0, 'Variância': 0, 'Desvio Padrão': 0, 'Amplitude': 0}
+        return {
+            'Média': self.media,
+            'Mediana': self.quantil(0.5),
+            'Moda': self.frequencias.moda(),
+            'Variância': self.variancia(),
+            'Desvio Padrão': math.sqrt(self.variancia()),
+            'Amplitude': self.maximo - self.minimo
+        }
+
+# Estatísticas exatas de uma série já carregada em memória, com a mesma interface de
+# EstatisticasStreaming (resumo() e quantil()): mediana, quantis e moda saem do pandas,
+# com as mesmas definições da análise original, em vez dos esboços aproximados
+class EstatisticasSerie:
+    def __init__(self, serie):
+        self.serie = pd.Series(serie, dtype=np.float64).dropna()
+        self.n = len(self.serie)
+
+    def variancia(self):
+        return float(self.serie.var(ddof=1)) if self.n > 1 else 0
+
+    def quantil(self, q):
+        return float(self.serie.quantile(q)) if self.n else 0
+
+    def resumo(self):
+        if self.n == 0:
+            return {'Média': 0, 'Mediana': 0, 'Moda': 0, 'Variância': 0, 'Desvio Padrão': 0, 'Amplitude': 0}
+        return {
+            'Média': float(self.serie.mean()),
+            'Mediana': float(self.serie.median()),
+            'Moda': float(self.serie.mode().iloc[0]),  # empates ficam com o menor valor (como scipy.stats.mode)
+            'Variância': self.variancia(),
+            'Desvio Padrão': math.sqrt(self.variancia()),
+            'Amplitude': float(self.serie.max() - self.serie.min())
+        }
+
+# Resume uma série de contagens já materializada (resultado de um agregador). Como a
+# série inteira está em memória, as estatísticas são exatas; EstatisticasStreaming
+# fica para valores que chegam em lotes e não cabem em memória.
+def resumir_serie(serie):
+    return EstatisticasSerie(serie)
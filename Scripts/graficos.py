@@ -0,0 +1,252 @@
+import os
+import json
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+# Etapa de gráficos: cada figura é uma tarefa (figura, caminho, entradas), em que
+# `figura` é o nome de uma das funções de desenho abaixo e `entradas` são os dados
+# já agregados que ela desenha (séries, tabelas, limiares, textos). renderizar()
+# calcula o hash das entradas de cada tarefa e só desenha as figuras cujo hash
+# mudou desde a última geração (ou cujo arquivo não existe mais), em processos
+# paralelos com o backend Agg (sem janela). Os hashes ficam em um registro JSON;
+# o hash inclui o código deste módulo, então mudar o desenho refaz as figuras.
+
+# Processos criados por fork quando disponível (os scripts AED_* não têm guarda __main__)
+contexto = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+
+# Série por hora com média móvel e limiares de alta e baixa atividade
+def serie_temporal(caminho, serie, media_movel, limiares, janela, rotulo, sigla, cor, titulo, eixo_y):
+    limiar_alta, limiar_baixa = limiares
+    plt.figure(figsize=(12, 9))  # Proporção 4:3
+    plt.plot(serie.index.hour, serie, label=rotulo, color=cor, alpha=0.5)
+    plt.plot(media_movel.index.hour, media_movel, label=f'Média Móvel ({janela}h)', color='red')
+    plt.axhline(y=limiar_alta, color='green', linestyle='--', label=f'Limiar Alta Atividade ({sigla})')
+    plt.axhline(y=limiar_baixa, color='orange', linestyle='--', label=f'Limiar Baixa Atividade ({sigla})')
+    plt.title(titulo)
+    plt.xlabel('Hora do Dia')
+    plt.ylabel(eixo_y)
+    plt.xticks(range(0, 24, 1))  # Define rótulos de 0 a 23
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(caminho)
+    plt.close()
+
+# Média por hora do dia de publicações (eixo principal) e comentários (eixo secundário)
+def sazonalidade(caminho, posts, comentarios, limiares_posts, limiares_comentarios, titulo):
+    fig, ax1 = plt.subplots(figsize=(12, 9))  # Proporção 4:3
+    horas = range(24)  # Índices de 0 a 23
+
+    # Eixo principal para publicações
+    ax1.plot(horas, posts.values, label='Publicações (Média por Hora)', color='blue')
+    ax1.axhline(y=limiares_posts[0], color='green', linestyle='--', label='Limiar Alta (Pub.)')
+    ax1.axhline(y=limiares_posts[1], color='orange', linestyle='--', label='Limiar Baixa (Pub.)')
+    ax1.set_title(titulo)
+    ax1.set_xlabel('Hora do Dia')
+    ax1.set_ylabel('Média de Publicações', color='blue')
+    ax1.set_xticks(range(0, 24, 1))  # Mostra todas as horas de 0 a 23
+    ax1.tick_params(axis='y', labelcolor='blue')
+    ax1.set_ylim(0, 250)  # Escala para publicações (máximo 240)
+
+    # Eixo secundário para comentários
+    ax2 = ax1.twinx()
+    ax2.plot(horas, comentarios.values, label='Comentários (Média por Hora)', color='purple')
+    ax2.axhline(y=limiares_comentarios[0], color='green', linestyle='-.', label='Limiar Alta (Com.)')
+    ax2.axhline(y=limiares_comentarios[1], color='orange', linestyle='-.', label='Limiar Baixa (Com.)')
+    ax2.set_ylabel('Média de Comentários', color='purple')
+    ax2.tick_params(axis='y', labelcolor='purple')
+    ax2.set_ylim(0, 50000)  # Escala para comentários (máximo 48.415)
+
+    # Ajuste da legenda combinada
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
+    plt.tight_layout()
+    plt.savefig(caminho)
+    plt.close()
+
+# Barras dos usuários mais ativos, com o valor no topo de cada barra
+def barras_usuarios(caminho, usuarios, valores, cor, titulo, eixo_y, formato_rotulo='{:d}', deslocamento_rotulo=0.5,
+                    marcas_y=None):
+    plt.figure(figsize=(12, 9))
+    bars = plt.bar(usuarios, valores, color=cor)
+    if marcas_y is not None:
+        plt.yticks(marcas_y)
+    for bar in bars:  # Rótulos no topo das barras
+        yval = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2, yval + deslocamento_rotulo, formato_rotulo.format(int(yval)), ha='center', va='bottom')
+    plt.xticks(rotation=45, ha='right')
+    plt.title(titulo)
+    plt.xlabel('Nome do Usuário')
+    plt.ylabel(eixo_y)
+    plt.tight_layout()
+    plt.savefig(caminho)
+    plt.close()
+
+# Histograma, box plot e CDF das publicações por hora e histograma dos comentários por hora
+def painel_distribuicao(caminho, posts, comentarios):
+    plt.figure(figsize=(12, 9))  # Proporção 4:3
+
+    # Histograma - Publicações
+    plt.subplot(2, 2, 1)
+    plt.hist(posts, bins=10, density=True, alpha=0.7, color='blue')
+    plt.title('Histograma - Publicações por Hora')
+    plt.xlabel('Número de Publicações')
+    plt.ylabel('Densidade')
+
+    # Box Plot - Publicações
+    plt.subplot(2, 2, 2)
+    sns.boxplot(data=posts, color='green')
+    plt.title('Box Plot - Publicações por Hora')
+    plt.ylabel('Número de Publicações')
+
+    # CDF - Publicações
+    plt.subplot(2, 2, 3)
+    sorted_posts = np.sort(posts)
+    cdf = np.arange(1, len(sorted_posts) + 1) / len(sorted_posts)
+    plt.plot(sorted_posts, cdf, color='red')
+    plt.title('CDF - Publicações por Hora')
+    plt.xlabel('Número de Publicações')
+    plt.ylabel('Probabilidade Cumulativa')
+
+    # Histograma - Comentários (se disponíveis)
+    if not comentarios.empty:
+        plt.subplot(2, 2, 4)
+        plt.hist(comentarios, bins=10, density=True, alpha=0.7, color='purple')
+        plt.title('Histograma - Comentários por Hora')
+        plt.xlabel('Número de Comentários')
+        plt.ylabel('Densidade')
+
+    plt.tight_layout()
+    plt.savefig(caminho)
+    plt.close()
+
+# Histograma logarítmico da latência (a última classe acumula latências acima do máximo)
+def histograma_latencia(caminho, bordas, histograma, bins_por_decada):
+    larguras = np.diff(np.append(bordas, bordas[-1] * 10**(1 / bins_por_decada)))
+    plt.figure(figsize=(12, 9))
+    plt.bar(np.maximum(bordas, 0.1), histograma, width=larguras, align='edge', color='blue', alpha=0.7)
+    plt.xscale('log')
+    plt.title('Histograma da Latência entre Publicação e Comentário')
+    plt.xlabel('Latência (segundos, escala logarítmica)')
+    plt.ylabel('Número de Comentários')
+    plt.tight_layout()
+    plt.savefig(caminho)
+    plt.close()
+
+# Curva de decaimento geral e curvas adicionais ({rótulo: curva}) nos limites das classes
+def decaimento_engajamento(caminho, limites, geral, curvas, titulo='Decaimento do Engajamento - Fração Acumulada de Comentários'):
+    plt.figure(figsize=(12, 9))
+    plt.plot(limites, geral, label='Geral', color='black', linewidth=2)
+    for rotulo, curva in curvas.items():
+        plt.plot(limites, curva, label=rotulo, alpha=0.7)
+    plt.xscale('log')
+    plt.title(titulo)
+    plt.xlabel('Tempo desde a publicação (segundos, escala logarítmica)')
+    plt.ylabel('Fração dos Comentários')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(caminho)
+    plt.close()
+
+FIGURAS = {funcao.__name__: funcao for funcao in
+           [serie_temporal, sazonalidade, barras_usuarios, painel_distribuicao, histograma_latencia, decaimento_engajamento]}
+
+# Versão do desenho: conteúdo deste módulo e versões do matplotlib e do seaborn
+with open(__file__, 'rb') as arquivo:
+    VERSAO = hashlib.blake2b(arquivo.read() + repr((matplotlib.__version__, sns.__version__)).encode(),
+                             digest_size=16).hexdigest()
+
+# Acrescenta um valor ao hash: séries e tabelas pelo hash do pandas (valores e
+# índice) mais nomes e tipos; arrays pelos bytes; dicionários e listas item a item
+# (na ordem, que define a ordem das legendas); os demais pelo repr
+def _atualizar_hash(conteudo, valor):
+    if isinstance(valor, (pd.Series, pd.DataFrame)):
+        nomes = list(valor.columns) if isinstance(valor, pd.DataFrame) else valor.name
+        conteudo.update(repr((type(valor).__name__, nomes, str(valor.dtypes), valor.index.dtype)).encode())
+        conteudo.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+    elif isinstance(valor, np.ndarray):
+        conteudo.update(repr((valor.dtype.str, valor.shape)).encode())
+        conteudo.update(np.ascontiguousarray(valor).tobytes())
+    elif isinstance(valor, dict):
+        conteudo.update(f"dict{len(valor)}".encode())
+        for chave, item in valor.items():
+            conteudo.update(repr(chave).encode())
+            _atualizar_hash(conteudo, item)
+    elif isinstance(valor, (list, tuple, range)):
+        conteudo.update(f"{type(valor).__name__}{len(valor)}".encode())
+        for item in valor:
+            _atualizar_hash(conteudo, item)
+    else:
+        conteudo.update(repr(valor).encode())
+
+def hash_entradas(figura, entradas):
+    conteudo = hashlib.blake2b(digest_size=16)
+    conteudo.update(repr((figura, VERSAO)).encode())
+    _atualizar_hash(conteudo, entradas)
+    return conteudo.hexdigest()
+
+def desenhar(figura, caminho, entradas):
+    FIGURAS[figura](caminho, **entradas)
+    return caminho
+
+def carregar_registro(caminho_registro):
+    if not os.path.exists(caminho_registro):
+        return {}
+    with open(caminho_registro, encoding='utf-8') as f:
+        return json.load(f)
+
+def salvar_registro(caminho_registro, registro):
+    os.makedirs(os.path.dirname(os.path.abspath(caminho_registro)), exist_ok=True)
+    with open(caminho_registro + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(registro, f, indent=2, ensure_ascii=False)
+    os.replace(caminho_registro + '.tmp', caminho_registro)
+
+# Desenha as figuras cujas entradas mudaram, com até numero_processos processos;
+# retorna os caminhos das figuras geradas. Uma figura que falha sai do registro
+# (e é tentada de novo na próxima execução); as demais continuam.
+def renderizar(tarefas, caminho_registro, numero_processos=None):
+    registro = carregar_registro(caminho_registro)
+    pendentes = []
+    for figura, caminho, entradas in tarefas:
+        chave = os.path.abspath(caminho)
+        impressao = hash_entradas(figura, entradas)
+        if registro.get(chave) == impressao and os.path.exists(caminho):
+            continue
+        registro.pop(chave, None)
+        pendentes.append((figura, caminho, entradas, chave, impressao))
+
+    numero_processos = min(numero_processos or os.cpu_count() or 1, len(pendentes))
+    geradas = []
+    erros = []
+    if numero_processos <= 1:
+        for figura, caminho, entradas, chave, impressao in pendentes:
+            try:
+                geradas.append(desenhar(figura, caminho, entradas))
+                registro[chave] = impressao
+            except Exception as e:
+                erros.append((caminho, e))
+            plt.close('all')
+    else:
+        with ProcessPoolExecutor(numero_processos, mp_context=contexto) as executor:
+            futuros = {executor.submit(desenhar, figura, caminho, entradas): (caminho, chave, impressao)
+                       for figura, caminho, entradas, chave, impressao in pendentes}
+            for futuro in as_completed(futuros):
+                caminho, chave, impressao = futuros[futuro]
+                try:
+                    geradas.append(futuro.result())
+                    registro[chave] = impressao
+                except Exception as e:
+                    erros.append((caminho, e))
+    salvar_registro(caminho_registro, registro)
+
+    print(f"Gráficos: {len(geradas)} gerados, {len(tarefas) - len(pendentes)} sem alteração")
+    for caminho, erro in erros:
+        print(f"Erro ao gerar o gráfico '{caminho}': {str(erro)}")
+    return geradas
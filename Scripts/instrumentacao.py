@@ -0,0 +1,137 @@
+import io
+import json
+import time
+import cProfile
+import pstats
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+
+# Instrumentação opcional dos scripts: tempo e número de chamadas por etapa (leitura,
+# datas, deduplicação, agregação, junção de parciais, escrita, gráficos...) e
+# contadores (chunks, linhas), com captura opcional de cProfile e tracemalloc. No fim,
+# finalizar() grava um resumo em JSON. Enquanto ativar() não é chamado, etapa() devolve
+# sempre o mesmo contexto vazio e as demais funções retornam logo, então os laços
+# por chunk não pagam pela instrumentação.
+
+_NULO = nullcontext()
+_ativa = None
+
+class Instrumentacao:
+    def __init__(self, perfil=False, memoria=False):
+        self.inicio = time.perf_counter()
+        self.tempos = defaultdict(float)
+        self.chamadas = Counter()
+        self.contadores = Counter()
+        self.perfil = cProfile.Profile() if perfil else None
+        self.memoria = memoria
+        if self.perfil is not None:
+            self.perfil.enable()
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempos[nome] += time.perf_counter() - inicio
+            self.chamadas[nome] += 1
+
+    # Une o resumo de outro processo (ex.: trabalhadores do pré-processamento)
+    def juntar(self, resumo):
+        for nome, etapa in resumo['etapas'].items():
+            self.tempos[nome] += etapa['tempo_s']
+            self.chamadas[nome] += etapa['chamadas']
+        self.contadores.update(resumo['contadores'])
+
+    def resumo(self):
+        return {
+            'tempo_total_s': time.perf_counter() - self.inicio,
+            'etapas': {nome: {'tempo_s': self.tempos[nome], 'chamadas': self.chamadas[nome]}
+                       for nome in sorted(self.tempos, key=self.tempos.get, reverse=True)},
+            'contadores': dict(self.contadores)
+        }
+
+    def encerrar(self, caminho_perfil=None, funcoes=25, alocacoes=15):
+        resumo = self.resumo()
+        if self.perfil is not None:
+            self.perfil.disable()
+            if caminho_perfil:
+                self.perfil.dump_stats(caminho_perfil)
+                resumo['arquivo_perfil'] = caminho_perfil
+            estatisticas = pstats.Stats(self.perfil, stream=io.StringIO()).sort_stats('cumulative')
+            resumo['perfil'] = [
+                {'funcao': f"{arquivo}:{linha}({nome})", 'chamadas': total, 'tempo_proprio_s': proprio, 'tempo_acumulado_s': acumulado}
+                for (arquivo, linha, nome), (_, total, proprio, acumulado, _) in
+                sorted(estatisticas.stats.items(), key=lambda item: item[1][3], reverse=True)[:funcoes]
+            ]
+        if self.memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            maiores = tracemalloc.take_snapshot().statistics('lineno')[:alocacoes]
+            tracemalloc.stop()
+            resumo['memoria'] = {'atual_mb': atual / 2**20, 'pico_mb': pico / 2**20,
+                                 'maiores_alocacoes': [{'local': str(item.traceback), 'mb': item.size / 2**20, 'blocos': item.count}
+                                                       for item in maiores]}
+        return resumo
+
+# Liga a instrumentação para o processo atual
+def ativar(perfil=False, memoria=False):
+    global _ativa
+    _ativa = Instrumentacao(perfil, memoria)
+    return _ativa
+
+# Zera as medições herdadas do processo principal (processos filhos criados por fork);
+# o perfil e o tracemalloc ficam só no processo principal
+def reiniciar():
+    global _ativa
+    if _ativa is not None:
+        if _ativa.perfil is not None:
+            _ativa.perfil.disable()
+        if _ativa.memoria:
+            tracemalloc.stop()
+        _ativa = Instrumentacao()
+
+def etapa(nome):
+    return _ativa.etapa(nome) if _ativa is not None else _NULO
+
+def contar(nome, valor=1):
+    if _ativa is not None:
+        _ativa.contadores[nome] += valor
+
+# Mede o tempo de obter cada item do iterável (ex.: leitura dos chunks)
+def medir_iteracao(nome, iteravel):
+    if _ativa is None:
+        return iteravel
+    return _medir_iteracao(nome, iteravel)
+
+def _medir_iteracao(nome, iteravel):
+    iterador = iter(iteravel)
+    while True:
+        with etapa(nome):
+            item = next(iterador, _NULO)
+        if item is _NULO:
+            return
+        yield item
+
+def resumo():
+    return _ativa.resumo() if _ativa is not None else None
+
+def juntar(resumo_outro):
+    if _ativa is not None and resumo_outro is not None:
+        _ativa.juntar(resumo_outro)
+
+# Grava o resumo em JSON (e o perfil do cProfile ao lado, em .prof) e desliga a instrumentação
+def finalizar(caminho, script=None):
+    global _ativa
+    if _ativa is None:
+        return None
+    resumo_final = {'script': script, 'fim': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    caminho_perfil = caminho.rsplit('.', 1)[0] + '.prof' if _ativa.perfil is not None else None
+    resumo_final.update(_ativa.encerrar(caminho_perfil))
+    _ativa = None
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(resumo_final, f, indent=2, ensure_ascii=False)
+    print(f"Métricas de execução salvas em: {caminho}")
+    return resumo_final
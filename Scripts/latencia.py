@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from esquema import reduzir_contagens
+
+# Latência entre a publicação e cada comentário (created_time_comment - created_time)
+# em classes logarítmicas de tamanho fixo: [0, 1 s), depois bins_por_decada classes
+# por década até `maximo` segundos e uma última classe para latências maiores.
+# Todas as contagens ficam em arrays/tabelas de tamanho fixo por chave (sem objetos
+# por linha), então histogramas e curvas podem ser somados entre chunks e arquivos.
+
+# Horizontes das curvas de decaimento por publicação (segundos): 1 h, 6 h, 24 h, 3 dias, 7 dias
+HORIZONTES_S = np.array([3600, 6 * 3600, 24 * 3600, 72 * 3600, 7 * 24 * 3600], dtype=np.float64)
+ROTULOS_HORIZONTES = ['ate_1h', 'ate_6h', 'ate_24h', 'ate_3d', 'ate_7d', 'apos_7d']
+
+# Limites inferiores das classes de latência (segundos)
+def bordas_logaritmicas(maximo=1e8, bins_por_decada=10):
+    decadas = int(np.ceil(np.log10(maximo)))
+    return np.concatenate([[0.0], np.logspace(0, decadas, decadas * bins_por_decada + 1)])
+
+# Classe de cada latência (a última classe recebe tudo acima do maior limite)
+def classe_latencia(latencias, bordas):
+    return np.searchsorted(bordas, latencias, side='right') - 1
+
+# Classe de horizonte de cada latência (0 = até 1 h, ..., 5 = após 7 dias)
+def classe_horizonte(latencias):
+    return np.searchsorted(HORIZONTES_S, latencias, side='right')
+
+# Contagens por chave em tabelas parciais (uma por chunk), consolidadas com
+# groupby().sum() quando o número de linhas pendentes passa do tamanho da tabela
+# consolidada; a memória fica proporcional ao número de chaves, não de linhas.
+# A tabela consolidada guarda as contagens no menor tipo inteiro que as comporta
+# (a soma do groupby é feita em int64).
+class SomaPorChave:
+    def __init__(self, colunas, linhas_minimas=1000000):
+        self.colunas = list(colunas)
+        self.linhas_minimas = linhas_minimas
+        self.partes = []
+        self.linhas_pendentes = 0
+        self.linhas_consolidadas = 0
+
+    # Tabela indexada pela chave, com as mesmas colunas (faltantes viram 0)
+    def adicionar(self, tabela):
+        if tabela.empty:
+            return
+        self.partes.append(tabela.reindex(columns=self.colunas, fill_value=0))
+        self.linhas_pendentes += len(tabela)
+        if self.linhas_pendentes > max(self.linhas_minimas, self.linhas_consolidadas):
+            self._consolidar()
+
+    def _consolidar(self):
+        tabela = reduzir_contagens(pd.concat(self.partes).groupby(level=0).sum())
+        self.partes = [tabela]
+        self.linhas_consolidadas = len(tabela)
+        self.linhas_pendentes = 0
+
+    def juntar(self, outro):
+        for parte in outro.partes:
+            self.adicionar(parte)
+        return self
+
+    def tabela(self):
+        if not self.partes:
+            return pd.DataFrame(columns=self.colunas, dtype='int64')
+        self._consolidar()
+        return self.partes[0].astype('int64').sort_index()
+
+# Contagens de (chave, classe) de um chunk como tabela chave x classe
+def contar_classes(chaves, classes, numero_classes):
+    contagem = pd.DataFrame({'chave': np.asarray(chaves), 'classe': classes}).groupby(['chave', 'classe']).size()
+    return contagem.unstack(fill_value=0).reindex(columns=range(numero_classes), fill_value=0)
+
+# Fração acumulada de comentários até o limite superior de cada classe
+def curva_decaimento(histograma):
+    histograma = np.asarray(histograma, dtype=np.float64)
+    total = histograma.sum(axis=-1, keepdims=True)
+    return np.divide(np.cumsum(histograma, axis=-1), total, out=np.zeros_like(histograma), where=total > 0)
+
+# Quantil aproximado da latência a partir do histograma (interpolação
+# geométrica dentro da classe; a primeira classe é linear a partir de 0)
+def quantil_histograma(histograma, bordas, q):
+    histograma = np.asarray(histograma, dtype=np.float64)
+    total = histograma.sum()
+    if total == 0:
+        return np.nan
+    acumulado = np.cumsum(histograma)
+    classe = int(np.searchsorted(acumulado, q * total))
+    anterior = acumulado[classe - 1] if classe > 0 else 0.0
+    fracao = (q * total - anterior) / histograma[classe] if histograma[classe] else 0.0
+    inferior = bordas[classe]
+    superior = bordas[classe + 1] if classe + 1 < len(bordas) else bordas[classe] * 10
+    if inferior == 0:
+        return superior * fracao
+    return inferior * (superior / inferior) ** fracao
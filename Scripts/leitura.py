@@ -0,0 +1,138 @@
+import csv
+import warnings
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
+
+# Leitura em chunks dos CSVs (brutos e pré-processados) com backend selecionável:
+#   'pandas'  - pd.read_csv (motor C, uma thread), como antes
+#   'pyarrow' - leitor de CSV do Arrow, com várias threads e arquivo mapeado em memória
+# Nos dois casos apenas as colunas pedidas são convertidas (usecols / include_columns),
+# os chunks têm tamanho_chunk linhas e as linhas com campos a mais são ignoradas
+# (on_bad_lines='skip'), com a contagem em linhas_ignoradas.
+
+# Opções de leitura dos CSVs (as mesmas usadas em todos os scripts)
+OPCOES_CSV = {
+    'encoding': 'utf-8',
+    'quoting': csv.QUOTE_ALL,
+    'on_bad_lines': 'skip',
+    'low_memory': False,
+    'escapechar': '\\',
+    'doublequote': True
+}
+
+# Mesmo formato para o módulo csv (cabeçalho e linhas curtas no backend pyarrow)
+DIALETO_CSV = {'quotechar': '"', 'escapechar': '\\', 'doublequote': True}
+
+BACKENDS = ['pandas', 'pyarrow']
+
+# Tipos tentados, em ordem, para cada coluna lida como texto (inferência como a do pandas)
+TIPOS_INFERIDOS = [pa.int64(), pa.float64(), pa.bool_()]
+
+class LeitorCSV:
+    def __init__(self, backend='pyarrow', tamanho_chunk=100000, colunas=None, tamanho_bloco_mb=16):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend de leitura desconhecido: {backend} (opções: {', '.join(BACKENDS)})")
+        self.backend = backend
+        self.tamanho_chunk = tamanho_chunk
+        self.colunas = list(colunas) if colunas is not None else None
+        self.tamanho_bloco = int(tamanho_bloco_mb * 1024 * 1024)
+        self.linhas_lidas = 0
+        self.linhas_ignoradas = 0
+
+    def ler(self, caminho):
+        chunks = self._ler_pandas(caminho) if self.backend == 'pandas' else self._ler_pyarrow(caminho)
+        for chunk in chunks:
+            self.linhas_lidas += len(chunk)
+            yield chunk
+
+    # O motor C só informa as linhas descartadas por avisos ("Skipping line N: ..."),
+    # então os avisos de cada chunk são capturados e contados
+    def _ler_pandas(self, caminho):
+        opcoes = dict(OPCOES_CSV, on_bad_lines='warn')
+        with pd.read_csv(caminho, chunksize=self.tamanho_chunk, usecols=self.colunas, **opcoes) as chunks:
+            while True:
+                with warnings.catch_warnings(record=True) as avisos:
+                    warnings.simplefilter('always', pd.errors.ParserWarning)
+                    chunk = next(chunks, None)
+                for aviso in avisos:
+                    if issubclass(aviso.category, pd.errors.ParserWarning) and 'Skipping line' in str(aviso.message):
+                        self.linhas_ignoradas += str(aviso.message).count('Skipping line')
+                    else:
+                        warnings.warn(aviso.message, aviso.category)
+                if chunk is None:
+                    return
+                yield chunk
+
+    # Todas as colunas são lidas como texto e depois convertidas em bloco, coluna a
+    # coluna, para o primeiro tipo em que todos os valores cabem (o leitor do Arrow
+    # fixaria o tipo pelo primeiro bloco e falharia em blocos seguintes diferentes).
+    # Linhas com campos a menos são completadas com nulos, como no pandas; as com
+    # campos a mais são ignoradas.
+    def _ler_pyarrow(self, caminho):
+        with open(caminho, encoding='utf-8', newline='') as arquivo:
+            nomes = next(csv.reader(arquivo, **DIALETO_CSV), None)
+        if not nomes:
+            return
+        incluidas = [nome for nome in nomes if self.colunas is None or nome in self.colunas]
+        curtas = []
+
+        def linha_invalida(linha):
+            if linha.actual_columns < linha.expected_columns:
+                curtas.append(linha.text)
+            else:
+                self.linhas_ignoradas += 1
+            return 'skip'
+
+        opcoes_leitura = pacsv.ReadOptions(use_threads=True, block_size=self.tamanho_bloco, encoding='utf-8')
+        opcoes_analise = pacsv.ParseOptions(quote_char='"', double_quote=True, escape_char='\\', newlines_in_values=True,
+                                            invalid_row_handler=linha_invalida)
+        opcoes_conversao = pacsv.ConvertOptions(column_types={nome: pa.string() for nome in nomes}, include_columns=incluidas,
+                                                strings_can_be_null=True, quoted_strings_can_be_null=True)
+
+        pendentes = []
+        linhas_pendentes = 0
+        with pa.memory_map(caminho) as origem:
+            for lote in pacsv.open_csv(origem, read_options=opcoes_leitura, parse_options=opcoes_analise,
+                                       convert_options=opcoes_conversao):
+                pendentes.append(lote)
+                linhas_pendentes += lote.num_rows
+                if linhas_pendentes < self.tamanho_chunk:
+                    continue
+                tabela = pa.Table.from_batches(pendentes)
+                inicio = 0
+                while tabela.num_rows - inicio >= self.tamanho_chunk:
+                    yield self._para_pandas(tabela.slice(inicio, self.tamanho_chunk), nomes, incluidas, curtas)
+                    inicio += self.tamanho_chunk
+                pendentes = tabela.slice(inicio).to_batches()
+                linhas_pendentes = tabela.num_rows - inicio
+        if linhas_pendentes or curtas:
+            esquema = pa.schema([(nome, pa.string()) for nome in incluidas])
+            yield self._para_pandas(pa.Table.from_batches(pendentes, schema=esquema), nomes, incluidas, curtas)
+
+    # Junta as linhas curtas pendentes ao chunk, infere os tipos e converte para o pandas
+    @staticmethod
+    def _para_pandas(tabela, nomes, incluidas, curtas):
+        if curtas:
+            linhas = [linha + [None] * (len(nomes) - len(linha)) for linha in csv.reader(curtas, **DIALETO_CSV)]
+            completadas = pd.DataFrame(linhas, columns=nomes)[incluidas].replace('', None)
+            tabela = pa.concat_tables([tabela, pa.Table.from_pandas(completadas, schema=tabela.schema, preserve_index=False)])
+            curtas.clear()
+        colunas = {}
+        for nome in incluidas:
+            colunas[nome] = LeitorCSV._inferir_tipo(tabela.column(nome))
+        return pa.table(colunas).to_pandas(split_blocks=True, self_destruct=True)
+
+    # Uma conversão que falha custa quase o mesmo que uma conversão completa, então
+    # cada tipo é testado antes em uma amostra dos primeiros valores não nulos
+    @staticmethod
+    def _inferir_tipo(coluna):
+        amostra = pc.drop_null(coluna.slice(0, 10000))
+        for tipo in TIPOS_INFERIDOS:
+            try:
+                pc.cast(amostra, tipo)
+                return pc.cast(coluna, tipo)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                continue
+        return coluna
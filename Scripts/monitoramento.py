@@ -0,0 +1,403 @@
+import io
+import os
+import csv
+import glob
+import math
+import numpy as np
+import pandas as pd
+from leitura import DIALETO_CSV
+from datas import converter_datas_vetorizado
+from deduplicacao import DeduplicadorGlobal
+from esbocos import hash_coluna
+from piramide import NIVEIS
+from latencia import bordas_logaritmicas, classe_latencia, quantil_histograma
+
+# Monitoramento contínuo de picos de atividade nos arquivos diários brutos:
+#   - AcompanhadorDiretorio lê, a cada verificação, apenas os registros completos
+#     acrescentados aos arquivos desde a última leitura (e os arquivos novos)
+#   - MonitorPicos conta publicações e comentários distintos por minuto e por hora,
+#     no geral e para cada um dos donos com mais comentários recebidos, e compara
+#     cada período com uma linha de base móvel (média e variância com pesos
+#     exponenciais, EWMA). Um período é sinalizado quando passa da linha de base em
+#     `limiar` desvios; o período em andamento é verificado a cada bloco lido, então
+#     um pico aparece antes de o minuto ou a hora terminar.
+# Os arquivos diários não chegam em ordem de horário (um arquivo traz comentários de
+# semanas depois da data do arquivo, em ordem embaralhada), então o atraso tolerado
+# antes de fechar um período é medido nos próprios dados (ver MonitorPicos).
+
+PASSOS = {'minuto': pd.Timedelta(minutes=1), 'hora': pd.Timedelta(hours=1)}
+
+COLUNAS_MONITORAMENTO = ['media_owner_id', 'media_owner_username', 'short_code', 'created_time', 'comment_id',
+                         'created_time_comment']
+
+# Leitura incremental de um CSV que ainda recebe linhas: guarda a posição (em bytes)
+# do fim do último registro completo. Campos entre aspas podem conter quebras de
+# linha, então o bloco lido é cortado na última quebra de linha e o último registro
+# só é aceito se termina fora de aspas; o restante fica para a próxima leitura.
+class LeitorIncremental:
+    def __init__(self, caminho, colunas=None, tamanho_bloco_mb=16):
+        self.caminho = caminho
+        self.colunas = list(colunas) if colunas is not None else None
+        self.tamanho_bloco = int(tamanho_bloco_mb * 1024 * 1024)
+        self.posicao = 0
+        self.nomes = None
+        self.linhas_lidas = 0
+        self.linhas_ignoradas = 0
+
+    # Registros completos acrescentados desde a última chamada, em blocos
+    def ler(self):
+        tamanho = os.path.getsize(self.caminho)
+        if tamanho < self.posicao:
+            # Arquivo regravado: lido de novo desde o início (os IDs já vistos não são recontados)
+            print(f"Arquivo regravado, lendo desde o início: {self.caminho}")
+            self.posicao = 0
+            self.nomes = None
+        while self.posicao < tamanho:
+            with open(self.caminho, 'rb') as arquivo:
+                arquivo.seek(self.posicao)
+                dados = arquivo.read(self.tamanho_bloco)
+            # Corta na última quebra de linha (nunca no meio de um caractere UTF-8). Bytes
+            # inválidos viram surrogates, que voltam aos mesmos bytes ao recodificar: a
+            # posição avança exatamente o que foi consumido do arquivo
+            texto = dados[:dados.rfind(b'\n') + 1].decode('utf-8', errors='surrogateescape')
+            registros, consumido = self._registros_completos(texto)
+            if consumido == 0:
+                # Nenhum registro completo: o restante ainda está sendo gravado
+                if len(dados) == self.tamanho_bloco:
+                    raise ValueError(f"Registro maior que o bloco de leitura em {self.caminho} (posição {self.posicao})")
+                return
+            bruto = texto[:consumido].encode('utf-8', errors='surrogateescape')
+            self.posicao += len(bruto)
+            try:
+                bruto.decode('utf-8')
+            except UnicodeDecodeError:
+                # Nos campos, os bytes inválidos passam ao caractere de substituição (U+FFFD)
+                registros = [[campo.encode('utf-8', errors='surrogateescape').decode('utf-8', errors='replace')
+                              for campo in registro] for registro in registros]
+            chunk = self._para_dataframe(registros)
+            if chunk is not None and not chunk.empty:
+                yield chunk
+
+    # Registros do texto e quantos caracteres eles ocupam (o último registro é
+    # conferido separadamente, em modo estrito, para detectar aspas não fechadas)
+    def _registros_completos(self, texto):
+        origem = io.StringIO(texto)
+        registros = []
+        fins = []
+        for registro in csv.reader(origem, **DIALETO_CSV):
+            registros.append(registro)
+            fins.append(origem.tell())
+        if not registros:
+            return [], 0
+        inicio_ultimo = fins[-2] if len(fins) > 1 else 0
+        try:
+            list(csv.reader(io.StringIO(texto[inicio_ultimo:fins[-1]]), strict=True, **DIALETO_CSV))
+        except csv.Error:
+            registros.pop()
+            fins.pop()
+        return registros, (fins[-1] if fins else 0)
+
+    # Primeiro registro do arquivo é o cabeçalho; linhas com campos a menos são
+    # completadas com nulos e as com campos a mais são ignoradas, como em leitura.LeitorCSV
+    def _para_dataframe(self, registros):
+        if self.nomes is None:
+            if not registros:
+                return None
+            self.nomes = registros.pop(0)
+        numero_campos = len(self.nomes)
+        linhas = []
+        for registro in registros:
+            if len(registro) > numero_campos:
+                self.linhas_ignoradas += 1
+                continue
+            linhas.append(registro + [None] * (numero_campos - len(registro)))
+        chunk = pd.DataFrame(linhas, columns=self.nomes)
+        if self.colunas is not None:
+            chunk = chunk[[coluna for coluna in self.colunas if coluna in chunk.columns]]
+        self.linhas_lidas += len(chunk)
+        return chunk.replace('', None)
+
+# Acompanha os arquivos de um diretório que casam com `padrao`. Arquivos cujo nome
+# vem antes de `primeiro_arquivo` (ordem dos nomes AAAA-MM-DD.csv) são ignorados.
+class AcompanhadorDiretorio:
+    def __init__(self, padrao, colunas=None, primeiro_arquivo=None, tamanho_bloco_mb=16):
+        self.padrao = padrao
+        self.colunas = colunas
+        self.primeiro_arquivo = primeiro_arquivo
+        self.tamanho_bloco_mb = tamanho_bloco_mb
+        self.leitores = {}
+
+    # Blocos (arquivo, chunk) com os registros novos de todos os arquivos, em ordem de nome
+    def novas_linhas(self):
+        for caminho in sorted(glob.glob(self.padrao)):
+            if self.primeiro_arquivo is not None and os.path.basename(caminho) < self.primeiro_arquivo:
+                continue
+            if caminho not in self.leitores:
+                print(f"Acompanhando arquivo: {caminho}")
+                self.leitores[caminho] = LeitorIncremental(caminho, self.colunas, self.tamanho_bloco_mb)
+            for chunk in self.leitores[caminho].ler():
+                yield caminho, chunk
+
+    @property
+    def linhas_ignoradas(self):
+        return sum(leitor.linhas_ignoradas for leitor in self.leitores.values())
+
+# Linha de base de uma série de contagens: média e variância com pesos exponenciais
+# (fator alfa por período). Para contagens, o desvio usado nunca é menor que o de
+# uma Poisson com a mesma média (raiz da média), o que evita sinalizar variações
+# pequenas em séries quase constantes. Nos primeiros `aquecimento` períodos só a
+# linha de base é atualizada. Depois, cada valor entra na linha de base limitado ao
+# limiar: um pico não infla a média e a variância a ponto de esconder os minutos
+# seguintes do mesmo surto, e uma mudança de patamar duradoura ainda é absorvida.
+class DetectorEWMA:
+    def __init__(self, alfa=0.05, limiar=4.0, minimo=10, aquecimento=30):
+        self.alfa = alfa
+        self.limiar = limiar
+        self.minimo = minimo
+        self.aquecimento = aquecimento
+        self.media = 0.0
+        self.variancia = 0.0
+        self.periodos = 0
+
+    def desvio(self):
+        return max(math.sqrt(self.variancia), math.sqrt(max(self.media, 1.0)))
+
+    # Desvios acima da linha de base (None durante o aquecimento)
+    def escore(self, valor):
+        if self.periodos < self.aquecimento:
+            return None
+        return (valor - self.media) / self.desvio()
+
+    def pico(self, valor):
+        escore = self.escore(valor)
+        return escore is not None and escore >= self.limiar and valor >= self.minimo
+
+    def atualizar(self, valor):
+        if self.periodos >= self.aquecimento:
+            valor = min(valor, self.media + self.limiar * self.desvio())
+        if self.periodos == 0:
+            self.media = float(valor)
+        else:
+            diferenca = valor - self.media
+            incremento = self.alfa * diferenca
+            self.media += incremento
+            self.variancia = (1 - self.alfa) * (self.variancia + diferenca * incremento)
+        self.periodos += 1
+
+# Contagens por período (minuto ou hora) de uma série, com o detector da série.
+# Os períodos ficam abertos até o limite de fechamento (ver MonitorPicos.verificar)
+# passar do seu fim; ao fechar, períodos sem eventos entram como zero na linha de
+# base. Eventos de períodos já fechados são contados como atrasados.
+class SerieMonitorada:
+    def __init__(self, nivel, quantil_inicio=0.001, **parametros_detector):
+        self.passo = PASSOS[nivel]
+        self.quantil_inicio = quantil_inicio
+        self.detector = DetectorEWMA(**parametros_detector)
+        self.abertos = {}
+        self.alterados = set()
+        self.proximo = None
+        self.sinalizados = set()
+        self.atrasados = 0
+
+    # periodos: início do período de cada evento
+    def adicionar(self, periodos):
+        for periodo, quantidade in periodos.value_counts().items():
+            if self.proximo is not None and periodo < self.proximo:
+                self.atrasados += int(quantidade)
+                continue
+            self.abertos[periodo] = self.abertos.get(periodo, 0) + int(quantidade)
+            self.alterados.add(periodo)
+
+    # Fecha os períodos que terminam até `limite`, atualizando a linha de base;
+    # retorna (período, valor, média, escore) dos picos ainda não sinalizados
+    def fechar(self, limite):
+        picos = []
+        if self.proximo is None:
+            if not self.abertos:
+                return picos
+            # A série começa no quantil_inicio dos eventos vistos até o primeiro
+            # fechamento: os poucos eventos muito mais antigos (ex.: publicações antigas
+            # que recebem comentários agora) não fazem a linha de base começar semanas antes
+            periodos = sorted(self.abertos)
+            acumulado = np.cumsum([self.abertos[periodo] for periodo in periodos])
+            inicio = periodos[int(np.searchsorted(acumulado, self.quantil_inicio * acumulado[-1], side='right'))]
+            if inicio + self.passo > limite:
+                return picos
+            self.proximo = inicio
+            antigos = [periodo for periodo in periodos if periodo < inicio]
+            self.atrasados += sum(self.abertos.pop(periodo) for periodo in antigos)
+        while self.proximo + self.passo <= limite:
+            valor = self.abertos.pop(self.proximo, 0)
+            if self.proximo not in self.sinalizados and self.detector.pico(valor):
+                picos.append((self.proximo, valor, self.detector.media, self.detector.escore(valor)))
+            self.sinalizados.discard(self.proximo)
+            self.detector.atualizar(valor)
+            self.proximo += self.passo
+        return picos
+
+    # Períodos ainda abertos que já passaram do limiar (sinalizados uma única vez). A
+    # contagem de um período aberto só aumenta, então o sinal antecipado nunca é
+    # desfeito quando o período fecha; só os períodos que receberam eventos desde a
+    # última verificação são conferidos (todos são conferidos de novo ao fechar).
+    def verificar_abertos(self):
+        picos = []
+        for periodo in self.alterados:
+            valor = self.abertos.get(periodo)
+            if valor is not None and periodo not in self.sinalizados and self.detector.pico(valor):
+                self.sinalizados.add(periodo)
+                picos.append((periodo, valor, self.detector.media, self.detector.escore(valor)))
+        self.alterados = set()
+        return picos
+
+    def ultimo_aberto(self):
+        return max(self.abertos) if self.abertos else None
+
+# Publicações (short_code distintos, pelo horário da publicação) e comentários
+# (comment_id distintos, pelo horário do comentário) por período, no geral e por
+# dono. Com donos=None, os donos monitorados são os numero_donos com mais comentários
+# recebidos até o momento (um dono que entra no ranking começa a sua linha de base ali).
+# A memória do ranking é limitada: as contagens por dono guardam no máximo
+# CONTADORES_POR_DONO * numero_donos donos (como no Space-Saving, um dono novo herda a
+# maior contagem descartada), e um dono que sai das MARGEM_RANKING * numero_donos
+# primeiras posições deixa de ser monitorado (a sua série é descartada).
+# Marca d'água: o quantil_atraso dos horários dos comentários de cada bloco (os
+# poucos horários muito à frente dos demais não a fazem saltar), que nunca recua. O
+# atraso de cada evento em relação à marca d'água na chegada da sua linha (o maior
+# horário que já tinha chegado) vai para um histograma logarítmico por tipo de
+# evento, e um período só fecha quando termina antes da marca d'água menos o
+# quantil_atraso desses atrasos (no mínimo atraso_minimo): com dados em ordem, os
+# períodos fecham logo; com um arquivo embaralhado, ficam abertos até os dados
+# terminarem, em vez de os eventos fora de ordem serem descartados.
+CONTADORES_POR_DONO = 100
+MARGEM_RANKING = 2
+
+class MonitorPicos:
+    def __init__(self, niveis=('minuto', 'hora'), numero_donos=10, donos=None, atraso_minimo=pd.Timedelta(minutes=2),
+                 quantil_atraso=0.999, limite_memoria_mb=256, **parametros_detector):
+        self.niveis = list(niveis)
+        self.numero_donos = numero_donos
+        self.donos_fixos = donos is not None
+        self.donos_monitorados = set(donos or [])
+        self.atraso_minimo = atraso_minimo
+        self.quantil_atraso = quantil_atraso
+        self.parametros_detector = parametros_detector
+        self.bordas_atraso = bordas_logaritmicas(1e8, 10)
+        self.atrasos = {tipo: np.zeros(len(self.bordas_atraso), dtype=np.int64) for tipo in ['publicacoes', 'comentarios']}
+        self.publicacoes_vistas = DeduplicadorGlobal(limite_memoria_mb / 2)
+        self.comentarios_vistos = DeduplicadorGlobal(limite_memoria_mb / 2)
+        self.comentarios_por_dono = pd.Series(dtype='int64')
+        self.contagem_descartada = 0
+        self.usernames = {}
+        self.series = {}
+        self.marca = None
+        self.linhas = 0
+
+    def _serie(self, chave, tipo, nivel):
+        if (chave, tipo, nivel) not in self.series:
+            self.series[(chave, tipo, nivel)] = SerieMonitorada(nivel, 1 - self.quantil_atraso, **self.parametros_detector)
+        return self.series[(chave, tipo, nivel)]
+
+    # Processa um bloco de linhas brutas e retorna os picos encontrados
+    def processar(self, chunk):
+        self.linhas += len(chunk)
+        chunk = chunk.copy()
+        chunk['created_time'], _ = converter_datas_vetorizado(chunk['created_time'])
+        chunk['created_time_comment'], _ = converter_datas_vetorizado(chunk['created_time_comment'])
+        chunk = chunk.dropna(subset=['created_time', 'media_owner_id']).reset_index(drop=True)
+
+        # Cada publicação e cada comentário conta uma única vez (as linhas repetem a publicação)
+        publicacoes = chunk[chunk['short_code'].notna()]
+        publicacoes = publicacoes[self.publicacoes_vistas.registrar(hash_coluna(publicacoes['short_code']))]
+        comentarios = chunk[chunk['comment_id'].notna() & chunk['created_time_comment'].notna()]
+        comentarios = comentarios[self.comentarios_vistos.registrar(hash_coluna(comentarios['comment_id']))]
+
+        if not self.donos_fixos and not comentarios.empty:
+            self._atualizar_ranking(comentarios['media_owner_id'].value_counts())
+        monitorados = chunk[chunk['media_owner_id'].isin(self.donos_monitorados)]
+        self.usernames.update(monitorados.drop_duplicates('media_owner_id').set_index('media_owner_id')['media_owner_username'])
+
+        # A marca d'água segue o horário dos comentários, que chegam perto do momento em
+        # que são feitos; o de uma publicação vista pela primeira vez pode ser bem anterior
+        coluna_marca = 'created_time_comment' if not comentarios.empty else 'created_time'
+        tempos = (comentarios if not comentarios.empty else publicacoes)[coluna_marca]
+        marca_anterior = self.marca
+        if not tempos.empty:
+            candidata = tempos.quantile(self.quantil_atraso)
+            if self.marca is None or candidata > self.marca:
+                self.marca = candidata
+
+        # Marca d'água na chegada de cada linha: maior horário das linhas anteriores,
+        # limitado às marcas d'água anterior e atual
+        chegada = chunk[coluna_marca].cummax().shift(1).ffill()
+        if self.marca is not None:
+            chegada = chegada.clip(upper=self.marca)
+        if marca_anterior is not None:
+            chegada = chegada.fillna(marca_anterior).clip(lower=marca_anterior)
+
+        for tipo, eventos, coluna in [('publicacoes', publicacoes, 'created_time'), ('comentarios', comentarios, 'created_time_comment')]:
+            if eventos.empty:
+                continue
+            atrasos = (chegada[eventos.index] - eventos[coluna]).dt.total_seconds().fillna(0).clip(lower=0).to_numpy()
+            self.atrasos[tipo] += np.bincount(classe_latencia(atrasos, self.bordas_atraso), minlength=len(self.bordas_atraso))
+            donos = eventos['media_owner_id']
+            do_ranking = donos.isin(self.donos_monitorados)
+            for nivel in self.niveis:
+                periodos = eventos[coluna].dt.floor(NIVEIS[nivel])
+                self._serie('geral', tipo, nivel).adicionar(periodos)
+                for dono, periodos_dono in periodos[do_ranking].groupby(donos[do_ranking]):
+                    self._serie(dono, tipo, nivel).adicionar(periodos_dono)
+        return self.verificar()
+
+    # Soma as contagens de comentários de um bloco ao ranking de donos e descarta os
+    # donos (contagens, séries e usernames) que ficaram para trás
+    def _atualizar_ranking(self, contagens):
+        contagens[~contagens.index.isin(self.comentarios_por_dono.index)] += self.contagem_descartada
+        self.comentarios_por_dono = self.comentarios_por_dono.add(contagens, fill_value=0)
+        capacidade = CONTADORES_POR_DONO * self.numero_donos
+        if len(self.comentarios_por_dono) > capacidade:
+            ordenadas = self.comentarios_por_dono.sort_values(ascending=False, kind='stable')
+            self.contagem_descartada = max(self.contagem_descartada, int(ordenadas.iloc[capacidade]))
+            self.comentarios_por_dono = ordenadas.iloc[:capacidade]
+        ranking = set(self.comentarios_por_dono.nlargest(MARGEM_RANKING * self.numero_donos).index)
+        self.donos_monitorados = (self.donos_monitorados & ranking) | set(self.comentarios_por_dono.nlargest(self.numero_donos).index)
+        for chave in [chave for chave in self.series if chave[0] != 'geral' and chave[0] not in self.donos_monitorados]:
+            del self.series[chave]
+        for dono in set(self.usernames) - self.donos_monitorados:
+            del self.usernames[dono]
+
+    # Atraso tolerado para um tipo de evento: quantil_atraso dos atrasos já vistos
+    def atraso_tolerado(self, tipo):
+        atraso = quantil_histograma(self.atrasos[tipo], self.bordas_atraso, self.quantil_atraso)
+        return max(self.atraso_minimo, pd.Timedelta(seconds=0 if np.isnan(atraso) else float(atraso)))
+
+    # Fecha os períodos que terminam antes da marca d'água menos o atraso tolerado e
+    # verifica os abertos; com final=True (fim dos dados), fecha todos
+    def verificar(self, final=False):
+        if self.marca is None:
+            return []
+        limites = {tipo: self.marca - self.atraso_tolerado(tipo) for tipo in self.atrasos}
+        picos = []
+        for (chave, tipo, nivel), serie in self.series.items():
+            limite = limites[tipo]
+            if final and serie.ultimo_aberto() is not None:
+                limite = max(limite, serie.ultimo_aberto() + serie.passo)
+            for periodo, valor, media, escore in serie.fechar(limite):
+                picos.append(self._pico(chave, tipo, nivel, periodo, valor, media, escore, 'fechado'))
+            if not final:
+                for periodo, valor, media, escore in serie.verificar_abertos():
+                    picos.append(self._pico(chave, tipo, nivel, periodo, valor, media, escore, 'em andamento'))
+        return sorted(picos, key=lambda pico: (pico['periodo'], pico['nivel'], pico['serie']))
+
+    def _pico(self, chave, tipo, nivel, periodo, valor, media, escore, situacao):
+        serie = 'geral' if chave == 'geral' else f"{self.usernames.get(chave, '')} ({chave})"
+        return {'detectado_em': pd.Timestamp.now().isoformat(timespec='seconds'), 'periodo': periodo, 'nivel': nivel,
+                'serie': serie, 'tipo': tipo, 'valor': valor, 'linha_de_base': round(media, 2), 'escore': round(escore, 2),
+                'situacao': situacao}
+
+    # Eventos descartados por chegarem depois de o período ter sido fechado
+    def atrasados(self):
+        return sum(serie.atrasados for (chave, _, nivel), serie in self.series.items() if chave == 'geral' and nivel == self.niveis[0])
+
+    def fechar(self):
+        self.publicacoes_vistas.fechar()
+        self.comentarios_vistos.fechar()
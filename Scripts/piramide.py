@@ -0,0 +1,73 @@
+from collections import deque
+import math
+import pandas as pd
+
+# Pirâmide de agregação temporal: publicações e comentários por minuto, hora, dia e
+# semana. Só o nível de minuto é contado durante a varredura (AgregadorPiramide);
+# os demais são somas dele. Cada publicação tem um único horário, então as
+# publicações distintas de uma hora são a soma das publicações distintas dos seus
+# minutos. Qualquer intervalo e resolução é respondido a partir da pirâmide,
+# sem reler as linhas.
+
+# Frequência (pandas) de cada nível; semanas começam na segunda-feira
+NIVEIS = {'minuto': 'min', 'hora': 'h', 'dia': 'D', 'semana': 'W-MON'}
+
+# Início do período de cada instante no nível dado
+def inicio_do_periodo(indice, nivel):
+    indice = pd.DatetimeIndex(indice)
+    if nivel == 'semana':
+        return indice.normalize() - pd.to_timedelta(indice.dayofweek, unit='D')
+    return indice.floor(NIVEIS[nivel])
+
+# Monta todos os níveis a partir das contagens por minuto
+def montar_piramide(posts_por_minuto, comentarios_por_minuto):
+    minuto = pd.DataFrame({'publicacoes': posts_por_minuto, 'comentarios': comentarios_por_minuto}).fillna(0).astype('int64')
+    minuto.index = pd.DatetimeIndex(minuto.index)
+    minuto = minuto.sort_index()
+    piramide = {'minuto': minuto}
+    for nivel in ['hora', 'dia', 'semana']:
+        piramide[nivel] = minuto.groupby(inicio_do_periodo(minuto.index, nivel)).sum()
+    return piramide
+
+# Contagens de um nível no intervalo [inicio, fim), com zeros nos períodos sem atividade
+def consultar(piramide, nivel, inicio, fim):
+    indice = pd.date_range(inicio_do_periodo([inicio], nivel)[0], pd.Timestamp(fim), freq=NIVEIS[nivel], inclusive='left')
+    return piramide[nivel].reindex(indice, fill_value=0)
+
+# Janela móvel com atualização O(1) por período: soma e soma dos quadrados dos
+# últimos `tamanho` valores (enquanto a janela não enche, usa os que já chegaram,
+# como rolling(min_periods=1))
+class JanelaMovel:
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+        self.valores = deque()
+        self.soma = 0.0
+        self.soma_quadrados = 0.0
+
+    def adicionar(self, valor):
+        self.valores.append(valor)
+        self.soma += valor
+        self.soma_quadrados += valor * valor
+        if len(self.valores) > self.tamanho:
+            saiu = self.valores.popleft()
+            self.soma -= saiu
+            self.soma_quadrados -= saiu * saiu
+
+    def media(self):
+        return self.soma / len(self.valores) if self.valores else math.nan
+
+    def desvio(self):
+        n = len(self.valores)
+        if n < 2:
+            return math.nan
+        return math.sqrt(max(0.0, (self.soma_quadrados - self.soma * self.soma / n) / (n - 1)))
+
+# Média e desvio padrão móveis de uma série, período a período
+def estatisticas_moveis(serie, tamanho):
+    janela = JanelaMovel(tamanho)
+    medias, desvios = [], []
+    for valor in serie.to_numpy(dtype=float):
+        janela.adicionar(valor)
+        medias.append(janela.media())
+        desvios.append(janela.desvio())
+    return pd.DataFrame({'media': medias, 'desvio': desvios}, index=serie.index)
@@ -0,0 +1,29 @@
+import os
+import numpy as np
+import pandas as pd
+from ajuste_distribuicoes import ajustar_serie, chave_serie
+
+
+def ajuste(nome, aic, ks_p_valor, erro_quadratico):
+    return {'distribuicao': nome, 'parametros': (), 'aic': aic, 'bic': aic, 'ks_estatistica': 1 - ks_p_valor,
+            'ks_p_valor': ks_p_valor, 'erro_quadratico': erro_quadratico, 'tempo_s': 0.0}
+
+
+# Ajustes já salvos no cache: o ranking é montado sem reajustar
+def test_ranking_separa_degenerados_e_rejeitados_pelo_ks(tmp_path):
+    serie = pd.Series(np.arange(1, 101, dtype=float))
+    salvos = {'powerlaw': ajuste('powerlaw', -1e5, 1e-20, 0.5),
+              'degenerado': ajuste('degenerado', -np.inf, 0.9, 0.1),
+              'lognorm': ajuste('lognorm', 300.0, 0.4, 0.2),
+              'expon': ajuste('expon', 200.0, 0.3, 0.3)}
+    pd.to_pickle(salvos, os.path.join(tmp_path, chave_serie(serie.to_numpy(), 10000) + '.pkl'))
+
+    por_aic = ajustar_serie(serie, list(salvos), 'aic', diretorio_cache=str(tmp_path))
+    assert por_aic['distribuicao'].tolist() == ['expon', 'lognorm', 'powerlaw', 'degenerado']
+    assert por_aic['rejeitado_ks'].tolist() == [False, False, True, False]
+    assert por_aic['erro'].iloc[-1].startswith('log-verossimilhança não finita')
+
+    por_sse = ajustar_serie(serie, list(salvos), diretorio_cache=str(tmp_path))
+    assert por_sse['distribuicao'].tolist() == ['lognorm', 'expon', 'powerlaw', 'degenerado']
+    sem_ks = ajustar_serie(serie, list(salvos), 'aic', diretorio_cache=str(tmp_path), nivel_ks=None)
+    assert sem_ks['distribuicao'].tolist()[:3] == ['powerlaw', 'expon', 'lognorm']
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from datas import converter_data, converter_datas_vetorizado
+
+# Compara converter_datas_vetorizado com a conversão original, valor a valor
+# (converter_data via apply), e a contagem de falhas devolvida
+
+
+def conferir(serie):
+    resultado, falhas = converter_datas_vetorizado(serie)
+    esperado = serie.apply(converter_data)
+    assert len(resultado) == len(esperado)
+    for indice, (obtido, referencia) in enumerate(zip(resultado, esperado)):
+        if pd.isna(referencia):
+            assert pd.isna(obtido), f"posição {indice}: {serie.iloc[indice]!r} -> {obtido!r}"
+        else:
+            assert obtido == referencia, f"posição {indice}: {serie.iloc[indice]!r} -> {obtido!r} (esperado {referencia!r})"
+    assert falhas == int((serie.notna() & esperado.isna()).sum())
+    return resultado, falhas
+
+
+def test_entrada_mista():
+    serie = pd.Series([1538870400, '1538870400', '2018-10-07 12:30:00', '2018-10-07', 'lixo', np.nan, '',
+                       '١٢٣', None, 1538870400.7, '07/10/2018 23:59'], dtype=object)
+    resultado, falhas = conferir(serie)
+    assert falhas == 2
+    assert resultado.iloc[0] == pd.Timestamp('2018-10-07')
+    assert resultado.iloc[7] == pd.Timestamp(123, unit='s')
+
+
+def test_datas_com_fuso_horario():
+    serie = pd.Series(['2018-10-07T12:30:00+00:00', '2018-10-07 09:30:00-03:00', '2018-10-07 12:30:00',
+                       '1538870400', 'lixo', ''], dtype=object)
+    resultado, falhas = conferir(serie)
+    assert falhas == 2
+    assert resultado.iloc[0] == pd.Timestamp('2018-10-07 12:30:00', tz='UTC')
+
+
+def test_coluna_numerica():
+    serie = pd.Series([1538870400, 1538874000.9, np.nan, 1e12])
+    resultado, falhas = conferir(serie)
+    assert resultado.dtype == 'datetime64[ns]'
+    assert falhas == 1
+
+
+def test_coluna_so_iso():
+    serie = pd.Series(['2018-10-07 00:00:00', '2018-10-07 23:59:59', None, 'lixo'])
+    resultado, falhas = conferir(serie)
+    assert resultado.dtype == 'datetime64[ns]'
+    assert falhas == 1
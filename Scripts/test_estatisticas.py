@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+from estatisticas import resumir_serie
+
+
+# Mesmas medidas da análise original (pandas e scipy.stats.mode sobre a série inteira)
+def test_resumir_serie_igual_ao_pandas():
+    serie = pd.Series(np.floor(np.random.default_rng(3).pareto(1.2, 20000)).astype(int) + 1)
+    resumo = resumir_serie(serie).resumo()
+    assert resumo['Média'] == serie.mean()
+    assert resumo['Mediana'] == serie.median()
+    assert resumo['Moda'] == stats.mode(serie, keepdims=True)[0][0]
+    assert np.isclose(resumo['Variância'], serie.var(ddof=1))
+    assert np.isclose(resumo['Desvio Padrão'], serie.std(ddof=1))
+    assert resumo['Amplitude'] == serie.max() - serie.min()
+    assert resumir_serie(serie).quantil(0.9) == serie.quantile(0.9)
+
+
+def test_resumir_serie_vazia_ou_unitaria():
+    assert set(resumir_serie(pd.Series([], dtype=int)).resumo().values()) == {0}
+    resumo = resumir_serie(pd.Series([5])).resumo()
+    assert resumo['Variância'] == 0 and resumo['Desvio Padrão'] == 0 and resumo['Mediana'] == 5
@@ -0,0 +1,94 @@
+import csv
+import pandas as pd
+from dados_sinteticos import gerar_dia
+from datas import converter_datas_vetorizado
+import monitoramento
+from monitoramento import LeitorIncremental, MonitorPicos, COLUNAS_MONITORAMENTO
+
+# Monitor de picos com um surto de comentários injetado em um arquivo diário
+# sintético, lido em blocos pequenos com as linhas embaralhadas (como nos arquivos
+# reais, em que os comentários vêm fora de ordem) e em ordem de horário
+
+INICIO_SURTO = pd.Timestamp('2018-10-07 21:30')
+
+
+def arquivo_com_surto(caminho, ordenar):
+    gerar_dia(caminho, '2018-10-07', 10000, semente=1)
+    dados = pd.read_csv(caminho, dtype=str, keep_default_na=False, on_bad_lines='skip', escapechar='\\')
+    dados = dados[(dados['media_owner_id'] != '') & (dados['created_time'] != '')]
+    dono = dados['media_owner_id'].value_counts().index[0]
+    surto = pd.DataFrame([dados[dados['media_owner_id'] == dono].iloc[0]] * 200)
+    surto['comment_id'] = [str(9 * 10**17 + i) for i in range(len(surto))]
+    segundos = INICIO_SURTO.value // 10**9
+    surto['created_time_comment'] = [str(segundos + i % 60) for i in range(len(surto))]
+    dados = pd.concat([dados, surto], ignore_index=True)
+    if ordenar:
+        momento, _ = converter_datas_vetorizado(dados['created_time_comment'].replace('', None))
+        dados = dados.iloc[momento.fillna(pd.Timestamp('2018-10-07')).to_numpy().argsort(kind='stable')]
+    else:
+        dados = dados.sample(frac=1, random_state=0)
+    dados.to_csv(caminho, index=False, quoting=csv.QUOTE_ALL, escapechar='\\')
+    return dono
+
+
+def monitorar(caminho):
+    monitor = MonitorPicos(numero_donos=5)
+    durante, ao_fim = [], []
+    for chunk in LeitorIncremental(caminho, COLUNAS_MONITORAMENTO, 0.1).ler():
+        durante += monitor.processar(chunk)
+    ao_fim += monitor.verificar(final=True)
+    monitor.fechar()
+    return monitor, durante, ao_fim
+
+
+def sinalizado(picos, serie):
+    return any(pico['periodo'] == INICIO_SURTO and pico['nivel'] == 'minuto' and pico['tipo'] == 'comentarios'
+               and serie in pico['serie'] for pico in picos)
+
+
+def test_surto_em_arquivo_fora_de_ordem(tmp_path):
+    caminho = str(tmp_path / '2018-10-07.csv')
+    dono = arquivo_com_surto(caminho, ordenar=False)
+    monitor, durante, ao_fim = monitorar(caminho)
+    assert sinalizado(durante + ao_fim, 'geral')
+    assert sinalizado(durante + ao_fim, dono)
+    # Os eventos fora de ordem são esperados, não descartados como atrasados
+    assert monitor.atrasados() < 0.01 * monitor.linhas
+
+
+def test_surto_em_arquivo_em_ordem_sinalizado_antes_do_fim(tmp_path):
+    caminho = str(tmp_path / '2018-10-07.csv')
+    arquivo_com_surto(caminho, ordenar=True)
+    monitor, durante, _ = monitorar(caminho)
+    assert sinalizado(durante, 'geral')
+    assert monitor.atraso_tolerado('comentarios') == monitor.atraso_minimo
+    assert monitor.atrasados() < 0.01 * monitor.linhas
+
+
+def test_posicao_com_bytes_invalidos(tmp_path):
+    caminho = tmp_path / 'parcial.csv'
+    # Um byte inválido (1 byte no arquivo, 3 bytes como U+FFFD) seguido de caracteres de 2 bytes
+    caminho.write_bytes(b'"media_owner_id","comment_id"\n"1","a\xff"\n' + '"2","çã"\n'.encode('utf-8'))
+    leitor = LeitorIncremental(str(caminho), tamanho_bloco_mb=0.0001)
+    primeiros = pd.concat(list(leitor.ler()))
+    with open(caminho, 'ab') as arquivo:
+        arquivo.write('"3","é"\n'.encode('utf-8'))
+    novos = pd.concat(list(leitor.ler()))
+    assert list(primeiros['comment_id']) == ['a�', 'çã']
+    assert list(novos['media_owner_id']) == ['3'] and list(novos['comment_id']) == ['é']
+    assert leitor.posicao == caminho.stat().st_size
+
+
+def test_donos_limitados(tmp_path, monkeypatch):
+    monkeypatch.setattr(monitoramento, 'CONTADORES_POR_DONO', 10)
+    caminho = str(tmp_path / '2018-10-07.csv')
+    dono = arquivo_com_surto(caminho, ordenar=False)
+    monitor = MonitorPicos(numero_donos=1)
+    for chunk in LeitorIncremental(caminho, COLUNAS_MONITORAMENTO, 0.1).ler():
+        monitor.processar(chunk)
+        assert len(monitor.comentarios_por_dono) <= 10
+        assert len(monitor.donos_monitorados) <= 2
+        assert {chave for chave, _, _ in monitor.series} <= monitor.donos_monitorados | {'geral'}
+        assert set(monitor.usernames) <= monitor.donos_monitorados
+    assert dono in monitor.donos_monitorados
+    monitor.fechar()
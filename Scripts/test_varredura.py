@@ -0,0 +1,115 @@
+import pandas as pd
+import pytest
+from dados_sinteticos import gerar_conjunto
+from datas import converter_datas_vetorizado
+from leitura import LeitorCSV
+from armazenamento import EscritorParquet, particionar_por_hora, arquivos_janela, caminho_particao_hora, chave_hora
+from piramide import consultar
+import varredura
+from varredura import AgregadorDistribuicao, AgregadorPiramide, AgregadorUsuarios, AgregadorHorarioAproximado, AgregadorLatencia, varrer_incremental
+
+# Varredura de três dias sintéticos pré-processados como no modo 'dia' de
+# AED_pre-processamento.py: um Parquet único e as mesmas linhas nas partições por
+# data/hora, lidos pelos dois caminhos
+
+JANELA = ('2018-10-07', '2018-10-08')
+
+
+@pytest.fixture(scope='module')
+def dados(tmp_path_factory):
+    base = tmp_path_factory.mktemp('dados')
+    escritor = EscritorParquet(str(base / 'dados.parquet'))
+    for caminho in gerar_conjunto(str(base / 'brutos'), '2018-10-06', 3, 5000, semente=2):
+        for chunk in LeitorCSV('pyarrow', 100000).ler(caminho):
+            for coluna in ['created_time', 'created_time_comment']:
+                chunk[coluna], _ = converter_datas_vetorizado(chunk[coluna])
+            chunk = chunk.drop_duplicates().replace('', pd.NA).dropna(subset=['created_time', 'media_owner_id'])
+            escritor.escrever(chunk)
+    escritor.fechar()
+    particionar_por_hora(str(base / 'dados.parquet'), str(base / 'por_hora'), 'dados')
+    return base
+
+
+def varrer(base, agregadores, particoes, janela):
+    return varrer_incremental(agregadores, str(base / 'dados.parquet'), 10000, str(base / 'parciais'),
+                              str(base / 'por_hora') if particoes else None, janela)
+
+
+def test_janela_igual_nas_particoes_e_no_arquivo_unico(dados):
+    particoes, arquivo = [varrer(dados, [AgregadorDistribuicao(JANELA[0]), AgregadorPiramide()], particoes, JANELA)
+                          for particoes in (True, False)]
+    for chave in ['posts_por_hora', 'comentarios_por_hora']:
+        pd.testing.assert_series_equal(particoes['distribuicao'][chave], arquivo['distribuicao'][chave])
+    por_hora = consultar(particoes['piramide'], 'hora', *JANELA)
+    pd.testing.assert_frame_equal(por_hora, consultar(arquivo['piramide'], 'hora', *JANELA))
+
+    # Todas as publicações feitas na janela e só os comentários feitos nela
+    linhas = pd.read_parquet(dados / 'dados.parquet')
+    inicio, fim = pd.Timestamp(JANELA[0]), pd.Timestamp(JANELA[1])
+    posts = linhas[(linhas['created_time'] >= inicio) & (linhas['created_time'] < fim)].drop_duplicates('short_code')
+    comentarios = linhas[(linhas['created_time_comment'] >= inicio) & (linhas['created_time_comment'] < fim)]
+    assert por_hora['publicacoes'].tolist() == posts.groupby(posts['created_time'].dt.floor('h')).size().tolist()
+    assert por_hora['comentarios'].tolist() == comentarios.groupby(comentarios['created_time_comment'].dt.floor('h')).size().tolist()
+
+
+def test_arquivos_janela_pelos_indices_das_datas(dados):
+    linhas = pd.read_parquet(dados / 'dados.parquet')
+    inicio, fim = pd.Timestamp(JANELA[0]), pd.Timestamp(JANELA[1])
+    horas = chave_hora(linhas)
+    na_janela = ((horas >= inicio) & (horas < fim)) | ((linhas['created_time'] >= inicio) & (linhas['created_time'] < fim))
+    esperados = sorted({caminho_particao_hora(str(dados / 'por_hora'), hora, 'dados') for hora in horas[na_janela].unique()})
+    assert arquivos_janela(str(dados / 'por_hora'), *JANELA) == esperados
+    # Os índices ficam na pasta da data das publicações
+    assert sorted(p.parent.name for p in (dados / 'por_hora').glob('data=*/publicacoes-dados.json')) == \
+        ['data=2018-10-06', 'data=2018-10-07', 'data=2018-10-08']
+
+
+
+def test_horario_aproximado_conta_comentarios_como_a_piramide(dados):
+    resultado = varrer(dados, [AgregadorHorarioAproximado(), AgregadorPiramide()], True, JANELA)
+    comentarios = resultado['horario_aproximado']['serie_comentarios']
+    por_hora = consultar(resultado['piramide'], 'hora', *JANELA)['comentarios']
+    assert comentarios.to_dict() == por_hora[por_hora > 0].to_dict()
+
+
+
+# Latência: publicações feitas na janela com todos os seus comentários, também os
+# feitos depois do fim da janela (em partições de fora dela)
+def test_latencia_inclui_comentarios_depois_da_janela(dados):
+    particoes, arquivo = [varrer(dados, [AgregadorLatencia()], particoes, JANELA)['latencia'] for particoes in (True, False)]
+    assert (particoes['histograma'] == arquivo['histograma']).all()
+    pd.testing.assert_frame_equal(particoes['por_post'].sort_index(), arquivo['por_post'].sort_index())
+
+    linhas = pd.read_parquet(dados / 'dados.parquet')
+    posts = linhas[(linhas['created_time'] >= pd.Timestamp(JANELA[0])) & (linhas['created_time'] < pd.Timestamp(JANELA[1]))]
+    latencias = (posts['created_time_comment'] - posts['created_time']).dropna()
+    assert particoes['histograma'].sum() == (latencias >= pd.Timedelta(0)).sum()
+    assert (posts['created_time_comment'] >= pd.Timestamp(JANELA[1])).any()
+
+
+# Contagens por usuário como na análise original (groupby sobre o arquivo inteiro)
+def contagens_por_usuario(linhas):
+    publicacoes = linhas.drop_duplicates(subset=['media_owner_id', 'short_code'])
+    comentarios = linhas[linhas['comment_id'].notna()].drop_duplicates(subset=['media_owner_id', 'comment_id'])
+    return publicacoes.groupby('media_owner_id')['short_code'].nunique(), comentarios.groupby('media_owner_id')['comment_id'].nunique()
+
+
+# Sem janela (o padrão dos scripts), pelas partições e pelo arquivo único; o limite de
+# memória pequeno faz os pares já vistos passarem pelo disco
+@pytest.mark.parametrize('particoes', [True, False])
+def test_usuarios_igual_ao_groupby_na_fonte_inteira(dados, tmp_path, particoes):
+    resultado = varrer_incremental([AgregadorUsuarios(0.05)], str(dados / 'dados.parquet'), 10000, str(tmp_path),
+                                   str(dados / 'por_hora') if particoes else None)['usuarios']
+    publicacoes, comentarios = contagens_por_usuario(pd.read_parquet(dados / 'dados.parquet'))
+    for obtido, esperado in [(resultado['publicacoes_por_usuario'], publicacoes), (resultado['comentarios_por_usuario'], comentarios)]:
+        assert obtido.sort_index().astype('int64').to_dict() == esperado.sort_index().astype('int64').to_dict()
+
+
+# Os agregadores de cada arquivo só liberam os temporários (descartar()); o resultado
+# completo é montado uma vez, no fim
+def test_parciais_nao_montam_resultado(dados, tmp_path, monkeypatch):
+    chamadas = []
+    montar_piramide = varredura.montar_piramide
+    monkeypatch.setattr(varredura, 'montar_piramide', lambda *args: chamadas.append(1) or montar_piramide(*args))
+    varrer_incremental([AgregadorPiramide()], str(dados / 'dados.parquet'), 10000, str(tmp_path), str(dados / 'por_hora'), JANELA)
+    assert len(chamadas) == 1
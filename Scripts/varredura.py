@@ -0,0 +1,588 @@
+import os
+import hashlib
+from collections import Counter
+import numpy as np
+import pandas as pd
+from armazenamento import escolher_arquivo, iterar_preprocessado, ler_janela, arquivos_janela, arquivos_particoes, filtrar_particao, selecionar_janela, COLUNAS_DATA
+from deduplicacao import DeduplicadorGlobal, hash_linhas
+from esbocos import DistintosPorChave, TopKDistintos, hash_coluna
+from piramide import montar_piramide
+from esquema import compactar, reduzir_contagens, memoria_por_coluna
+from instrumentacao import etapa, contar, medir_iteracao
+from latencia import ROTULOS_HORIZONTES, SomaPorChave, bordas_logaritmicas, classe_horizonte, classe_latencia, contar_classes
+
+# Varredura única do conjunto pré-processado: o arquivo (ou a janela de partições)
+# é lido uma vez e cada chunk é entregue a todos os agregadores registrados.
+# Cada análise (temporal, distribuição, usuários) tem o seu agregador; os
+# resultados podem ser salvos em disco e reaproveitados pelos scripts AED_*,
+# e os resultados parciais de cada arquivo permitem reprocessar só o que mudou.
+
+# Soma ao contador as ocorrências de cada chave (chaves nulas são ignoradas)
+def acumular_contagens(contagens, chaves):
+    chaves = pd.Series(chaves).dropna().to_numpy()
+    if len(chaves):
+        valores, quantidades = np.unique(chaves, return_counts=True)
+        contagens.update(dict(zip(valores, quantidades.tolist())))
+
+def serie_de_contagens(contagens):
+    if not contagens:
+        return pd.Series(dtype=int)
+    return pd.Series(contagens, dtype='int64').sort_index()
+
+# Registra hashes de pares no deduplicador e soma os pares inéditos às contagens
+# das suas chaves. Com `pares` (lista) ativada, os pares inéditos também são
+# guardados, para formar o resultado parcial de um arquivo (ver varrer_incremental).
+def registrar_pares(vistos, contagens, hashes, chaves, pares=None):
+    novos = vistos.registrar(hashes)
+    chaves = np.asarray(chaves)[novos]
+    acumular_contagens(contagens, chaves)
+    if pares is not None:
+        pares.append((hashes[novos], chaves))
+
+def juntar_pares(pares):
+    if not pares:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0)
+    return np.concatenate([hashes for hashes, _ in pares]), np.concatenate([chaves for _, chaves in pares])
+
+# Publicações distintas por período (hora, minuto...), válidas entre chunks: cada
+# par (short_code, período da publicação) é contado uma única vez, mesmo que os comentários da publicação estejam
+# espalhados por vários chunks. Os pares vistos ficam como hashes de 64 bits
+# (memória proporcional ao número de publicações, não de linhas).
+class PostsDistintosPorPeriodo:
+    def __init__(self, limite_memoria_mb=128, guardar_pares=False):
+        self.vistos = DeduplicadorGlobal(limite_memoria_mb)
+        self.contagens = Counter()
+        self.pares = [] if guardar_pares else None
+
+    def adicionar(self, short_code, periodo_post):
+        validos = short_code.notna() & periodo_post.notna()
+        pares = pd.DataFrame({'short_code': short_code[validos], 'periodo_post': periodo_post[validos]})
+        if pares.empty:
+            return
+        registrar_pares(self.vistos, self.contagens, hash_linhas(pares), pares['periodo_post'].to_numpy(), self.pares)
+
+    def parcial(self):
+        return juntar_pares(self.pares)
+
+    def juntar_parcial(self, parcial):
+        registrar_pares(self.vistos, self.contagens, *parcial)
+
+    # Remove os arquivos temporários do deduplicador
+    def descartar(self):
+        self.vistos.fechar()
+
+    def serie(self):
+        self.descartar()
+        return serie_de_contagens(self.contagens)
+
+# Agregador da pirâmide temporal de AED_analise_temporal.py: publicações distintas
+# (pares short_code, minuto da publicação) e comentários por minuto; os níveis de
+# hora, dia e semana são montados a partir deles em resultado() (ver piramide.py)
+class AgregadorPiramide:
+    nome = 'piramide'
+    colunas = ['created_time', 'created_time_comment', 'short_code']
+    selecao = 'comentarios'
+
+    def __init__(self, guardar_pares=False):
+        self.parametros = {}
+        self.posts = PostsDistintosPorPeriodo(guardar_pares=guardar_pares)
+        self.comentarios = Counter()
+
+    def processar(self, chunk):
+        minuto_post = chunk['created_time'].dt.floor('min')
+        minuto_comentario = chunk['created_time_comment'].dt.floor('min')
+
+        # Conta publicações (short_code único por minuto, considerando todos os chunks)
+        self.posts.adicionar(chunk['short_code'], minuto_post)
+        acumular_contagens(self.comentarios, minuto_comentario)
+
+    # Agregador vazio, com os mesmos parâmetros, que guarda o resultado parcial de um arquivo
+    def novo_parcial(self):
+        return AgregadorPiramide(guardar_pares=True)
+
+    def parcial(self):
+        return {'posts': self.posts.parcial(), 'comentarios': dict(self.comentarios)}
+
+    def juntar_parcial(self, parcial):
+        self.posts.juntar_parcial(parcial['posts'])
+        self.comentarios.update(parcial['comentarios'])
+
+    # Libera os arquivos temporários sem calcular o resultado (parciais já salvos)
+    def descartar(self):
+        self.posts.descartar()
+
+    def resultado(self):
+        return montar_piramide(self.posts.serie(), serie_de_contagens(self.comentarios))
+
+# Agregador das contagens por hora de AED_dist_freq_est_desc.py
+# (apenas comentários do dia alvo, ou linhas sem comentário)
+class AgregadorDistribuicao:
+    nome = 'distribuicao'
+    colunas = ['created_time', 'created_time_comment', 'short_code']
+    selecao = 'comentarios'
+
+    def __init__(self, data_alvo='2018-10-07', guardar_pares=False):
+        self.data_alvo = pd.Timestamp(data_alvo)
+        self.parametros = {'data_alvo': str(self.data_alvo)}
+        self.posts = PostsDistintosPorPeriodo(guardar_pares=guardar_pares)
+        self.comentarios = Counter()
+
+    def processar(self, chunk):
+        inicio = self.data_alvo.normalize()
+        fim = inicio + pd.Timedelta(days=1)
+        data_comentario = chunk['created_time_comment']
+        chunk = chunk[((data_comentario >= inicio) & (data_comentario < fim)) | data_comentario.isna()]
+
+        hora_post = chunk['created_time'].dt.floor('h')
+        hora_comentario = chunk['created_time_comment'].dt.floor('h')
+
+        self.posts.adicionar(chunk['short_code'], hora_post)
+        acumular_contagens(self.comentarios, hora_comentario)
+
+    def novo_parcial(self):
+        return AgregadorDistribuicao(self.data_alvo, guardar_pares=True)
+
+    def parcial(self):
+        return {'posts': self.posts.parcial(), 'comentarios': dict(self.comentarios)}
+
+    def juntar_parcial(self, parcial):
+        self.posts.juntar_parcial(parcial['posts'])
+        self.comentarios.update(parcial['comentarios'])
+
+    def descartar(self):
+        self.posts.descartar()
+
+    def resultado(self):
+        return {'posts_por_hora': self.posts.serie(),
+                'comentarios_por_hora': serie_de_contagens(self.comentarios)}
+
+# Agregador das contagens por usuário de AED_analise_usuarios.py.
+# Os pares (media_owner_id, short_code) e (media_owner_id, comment_id) já vistos
+# ficam como hashes de 64 bits em um DeduplicadorGlobal (que grava em disco ao
+# passar do limite de memória); cada par inédito incrementa a contagem do seu
+# usuário. Em memória ficam apenas as contagens e o username de cada usuário.
+class AgregadorUsuarios:
+    nome = 'usuarios'
+    colunas = ['media_owner_id', 'short_code', 'comment_id', 'media_owner_username']
+    selecao = 'comentarios'
+
+    def __init__(self, limite_memoria_mb=256, guardar_pares=False):
+        self.limite_memoria_mb = limite_memoria_mb
+        self.parametros = {}
+        self.pares_publicacoes = DeduplicadorGlobal(limite_memoria_mb / 2)
+        self.pares_comentarios = DeduplicadorGlobal(limite_memoria_mb / 2)
+        self.publicacoes = Counter()
+        self.comentarios = Counter()
+        self.username_map = pd.Series(dtype=object)
+        self.novas_publicacoes = [] if guardar_pares else None
+        self.novos_comentarios = [] if guardar_pares else None
+
+    def processar(self, chunk):
+        chunk = chunk[chunk['media_owner_id'].notna()]
+
+        # Publicações: pares (media_owner_id, short_code) únicos com short_code preenchido.
+        # Todo usuário entra no resultado (com 0 se só tiver short_code nulo), como no
+        # groupby(...)['short_code'].count() sobre os pares únicos
+        pares = chunk.loc[chunk['short_code'].notna(), ['media_owner_id', 'short_code']]
+        if not pares.empty:
+            registrar_pares(self.pares_publicacoes, self.publicacoes, hash_linhas(pares),
+                            pares['media_owner_id'].to_numpy(), self.novas_publicacoes)
+
+        # Comentários recebidos: pares (media_owner_id, comment_id) únicos com comment_id preenchido
+        pares = chunk.loc[chunk['comment_id'].notna(), ['media_owner_id', 'comment_id']]
+        if not pares.empty:
+            registrar_pares(self.pares_comentarios, self.comentarios, hash_linhas(pares),
+                            pares['media_owner_id'].to_numpy(), self.novos_comentarios)
+
+        # Primeiro username de cada media_owner_id ainda não visto
+        self._adicionar_usernames(chunk.drop_duplicates(subset=['media_owner_id']).set_index('media_owner_id')['media_owner_username'])
+
+    def _adicionar_usernames(self, usernames):
+        novos_usuarios = usernames[~usernames.index.isin(self.username_map.index)]
+        if not novos_usuarios.empty:
+            self.username_map = pd.concat([self.username_map, novos_usuarios.astype(object)])
+
+    def novo_parcial(self):
+        return AgregadorUsuarios(self.limite_memoria_mb, guardar_pares=True)
+
+    def parcial(self):
+        return {'publicacoes': juntar_pares(self.novas_publicacoes),
+                'comentarios': juntar_pares(self.novos_comentarios),
+                'username_map': self.username_map}
+
+    def juntar_parcial(self, parcial):
+        registrar_pares(self.pares_publicacoes, self.publicacoes, *parcial['publicacoes'])
+        registrar_pares(self.pares_comentarios, self.comentarios, *parcial['comentarios'])
+        self._adicionar_usernames(parcial['username_map'])
+
+    def descartar(self):
+        self.pares_publicacoes.fechar()
+        self.pares_comentarios.fechar()
+
+    def resultado(self):
+        self.descartar()
+
+        # Mesma ordem do groupby (por media_owner_id) antes de ordenar pelas contagens
+        publicacoes = serie_de_contagens(self.publicacoes).reindex(self.username_map.index, fill_value=0)
+        publicacoes = publicacoes.astype('int64').sort_index()
+        comentarios = serie_de_contagens(self.comentarios)
+        publicacoes.index.name = comentarios.index.name = 'media_owner_id'
+        publicacoes.name = 'short_code'
+        username_map = self.username_map.copy()
+        username_map.index.name = 'media_owner_id'
+        username_map.name = 'media_owner_username'
+        return {'publicacoes_por_usuario': reduzir_contagens(publicacoes.sort_values(ascending=False)),
+                'comentarios_por_usuario': reduzir_contagens(comentarios.sort_values(ascending=False)),
+                'username_map': username_map}
+
+# Agregador de AED_analise_latencia.py: latência entre publicação e comentário em
+# classes logarítmicas (ver latencia.py). Guarda o histograma geral (array de tamanho
+# fixo), o histograma de cada usuário dono da publicação e, por publicação, os
+# comentários recebidos em cada horizonte (1 h, 6 h, 24 h, 3 dias, 7 dias e depois).
+# Com uma janela, recebe as publicações feitas nela com todos os seus comentários
+# (selecao = 'publicacoes'), para que as latências não sejam cortadas no fim da janela.
+class AgregadorLatencia:
+    nome = 'latencia'
+    colunas = ['created_time', 'created_time_comment', 'short_code', 'media_owner_id']
+    selecao = 'publicacoes'
+
+    def __init__(self, maximo_s=1e8, bins_por_decada=10):
+        self.parametros = {'maximo_s': maximo_s, 'bins_por_decada': bins_por_decada}
+        self.bordas = bordas_logaritmicas(maximo_s, bins_por_decada)
+        self.histograma = np.zeros(len(self.bordas), dtype=np.int64)
+        self.por_dono = SomaPorChave(range(len(self.bordas)))
+        self.por_post = SomaPorChave(range(len(ROTULOS_HORIZONTES)))
+        self.latencias_negativas = 0
+
+    def processar(self, chunk):
+        chunk = chunk[chunk['created_time'].notna() & chunk['created_time_comment'].notna()]
+        latencias = (chunk['created_time_comment'] - chunk['created_time']).dt.total_seconds().to_numpy()
+
+        # Comentários anteriores à publicação são contados e descartados
+        validas = latencias >= 0
+        self.latencias_negativas += int((~validas).sum())
+        chunk = chunk[validas]
+        latencias = latencias[validas]
+        if len(latencias) == 0:
+            return
+
+        classes = classe_latencia(latencias, self.bordas)
+        self.histograma += np.bincount(classes, minlength=len(self.bordas))
+        com_dono = chunk['media_owner_id'].notna().to_numpy()
+        self.por_dono.adicionar(contar_classes(chunk['media_owner_id'].to_numpy()[com_dono], classes[com_dono], len(self.bordas)))
+        com_post = chunk['short_code'].notna().to_numpy()
+        self.por_post.adicionar(contar_classes(chunk['short_code'].astype(object).to_numpy()[com_post],
+                                               classe_horizonte(latencias[com_post]), len(ROTULOS_HORIZONTES)))
+
+    def novo_parcial(self):
+        return AgregadorLatencia(**self.parametros)
+
+    def parcial(self):
+        return self
+
+    def juntar_parcial(self, parcial):
+        self.histograma += parcial.histograma
+        self.por_dono.juntar(parcial.por_dono)
+        self.por_post.juntar(parcial.por_post)
+        self.latencias_negativas += parcial.latencias_negativas
+
+    # Nada em disco: só tabelas em memória
+    def descartar(self):
+        pass
+
+    def resultado(self):
+        por_post = self.por_post.tabela()
+        por_post.columns = ROTULOS_HORIZONTES
+        por_post.index.name = 'short_code'
+        por_dono = self.por_dono.tabela()
+        por_dono.index.name = 'media_owner_id'
+        return {'bordas': self.bordas,
+                'histograma': self.histograma.copy(),
+                'por_dono': por_dono,
+                'por_post': por_post,
+                'latencias_negativas': self.latencias_negativas}
+
+# Versão aproximada das séries por hora da pirâmide: publicações distintas por hora estimadas
+# com um HyperLogLog por hora (sem depender da divisão em chunks); comentários
+# continuam contados exatamente, em um Counter por hora como em AgregadorDistribuicao.
+# Só calcula o nível 'hora'. Pode ser unido a outro com juntar().
+class AgregadorHorarioAproximado:
+    nome = 'horario_aproximado'
+    colunas = ['created_time', 'created_time_comment', 'short_code']
+    selecao = 'comentarios'
+
+    def __init__(self, erro_relativo=0.02):
+        self.parametros = {'erro_relativo': erro_relativo}
+        self.posts = DistintosPorChave(erro_relativo)
+        self.comentarios = Counter()
+
+    def processar(self, chunk):
+        hora_post = chunk['created_time'].dt.floor('h')
+        hora_comentario = chunk['created_time_comment'].dt.floor('h')
+        com_post = chunk['short_code'].notna()
+        self.posts.adicionar(hora_post[com_post], hash_coluna(chunk.loc[com_post, 'short_code']))
+        acumular_contagens(self.comentarios, hora_comentario)
+
+    def juntar(self, outro):
+        self.posts.juntar(outro.posts)
+        self.comentarios.update(outro.comentarios)
+        return self
+
+    # Os esboços já são uniões de resultados parciais: o parcial é o próprio agregador
+    def novo_parcial(self):
+        return AgregadorHorarioAproximado(**self.parametros)
+
+    def parcial(self):
+        return self
+
+    def juntar_parcial(self, parcial):
+        self.juntar(parcial)
+
+    def descartar(self):
+        pass
+
+    def resultado(self):
+        return {'serie_posts': self.posts.estimar().round().astype(int),
+                'serie_comentarios': serie_de_contagens(self.comentarios),
+                'erro_relativo_posts': self.posts.erro_relativo}
+
+# Versão aproximada de AgregadorUsuarios, só para os rankings (Top 10): publicações
+# e comentários distintos por usuário em um TopKDistintos cada. A memória é fixa
+# (1/erro_topk contadores) e os resumos podem ser unidos com juntar().
+class AgregadorUsuariosAproximado:
+    nome = 'usuarios_aproximado'
+    colunas = ['media_owner_id', 'short_code', 'comment_id', 'media_owner_username']
+    selecao = 'comentarios'
+
+    def __init__(self, erro_topk=0.001, erro_hll=0.05):
+        self.parametros = {'erro_topk': erro_topk, 'erro_hll': erro_hll}
+        self.publicacoes = TopKDistintos(erro_topk, erro_hll)
+        self.comentarios = TopKDistintos(erro_topk, erro_hll)
+
+    def processar(self, chunk):
+        chunk = chunk[chunk['media_owner_id'].notna()]
+        publicacoes = chunk[chunk['short_code'].notna()]
+        self.publicacoes.adicionar(publicacoes['media_owner_id'].to_numpy(), hash_coluna(publicacoes['short_code']),
+                                   publicacoes['media_owner_username'].astype(object).to_numpy())
+        comentarios = chunk[chunk['comment_id'].notna()]
+        self.comentarios.adicionar(comentarios['media_owner_id'].to_numpy(), hash_coluna(comentarios['comment_id']),
+                                   comentarios['media_owner_username'].astype(object).to_numpy())
+
+    def juntar(self, outro):
+        self.publicacoes.juntar(outro.publicacoes)
+        self.comentarios.juntar(outro.comentarios)
+        return self
+
+    def novo_parcial(self):
+        return AgregadorUsuariosAproximado(**self.parametros)
+
+    def parcial(self):
+        return self
+
+    def juntar_parcial(self, parcial):
+        self.juntar(parcial)
+
+    def descartar(self):
+        pass
+
+    @staticmethod
+    def _ranking(resumo, coluna):
+        topo = resumo.topo(resumo.k)
+        return pd.DataFrame({'media_owner_id': topo['chave'],
+                             'media_owner_username': topo['rotulo'],
+                             coluna: topo['contagem'].round().astype(int),
+                             'erro_maximo': topo['erro_maximo'].round().astype(int)})
+
+    def resultado(self):
+        return {'top_publicacoes': self._ranking(self.publicacoes, 'short_code'),
+                'top_comentarios': self._ranking(self.comentarios, 'comentarios'),
+                'limite_erro_publicacoes': self.publicacoes.total / self.publicacoes.k,
+                'limite_erro_comentarios': self.comentarios.total / self.comentarios.k,
+                'erro_relativo_hll': self.publicacoes.erro_hll}
+
+def usa_particoes(diretorio_por_hora):
+    return bool(diretorio_por_hora and os.path.isdir(diretorio_por_hora))
+
+# Arquivos lidos pela fonte: as partições (as da janela ou, sem janela, todas) quando
+# existem; caso contrário, o arquivo único
+def arquivos_da_fonte(caminho_arquivo, diretorio_por_hora=None, janela=None):
+    if usa_particoes(diretorio_por_hora):
+        if janela:
+            return arquivos_janela(diretorio_por_hora, janela[0], janela[1])
+        return arquivos_particoes(diretorio_por_hora)
+    return [escolher_arquivo(caminho_arquivo)]
+
+# Lê um único arquivo da fonte. Com uma janela, as linhas ainda passam por
+# selecionar_janela em processar_chunks, então as colunas de data são sempre lidas
+def ler_arquivo_da_fonte(arquivo, colunas, tamanho_chunk, diretorio_por_hora=None, janela=None):
+    if janela:
+        colunas = list(dict.fromkeys(colunas + COLUNAS_DATA))
+    if janela and usa_particoes(diretorio_por_hora):
+        return ler_janela(diretorio_por_hora, janela[0], janela[1], colunas, tamanho_chunk, arquivos=[arquivo])
+    return iterar_preprocessado(arquivo, colunas, tamanho_chunk)
+
+# Descrição da fonte (usada para saber se agregados salvos correspondem aos dados atuais):
+# janela e tamanho/mtime de cada arquivo lido
+def descrever_fonte(caminho_arquivo, diretorio_por_hora=None, janela=None):
+    arquivos = []
+    for arquivo in arquivos_da_fonte(caminho_arquivo, diretorio_por_hora, janela):
+        estado = os.stat(arquivo)
+        arquivos.append([arquivo, estado.st_size, estado.st_mtime_ns])
+    janela = [str(janela[0]), str(janela[1])] if janela else None
+    return {'janela': janela, 'arquivos': arquivos}
+
+def colunas_dos_agregadores(agregadores):
+    return list(dict.fromkeys(coluna for agregador in agregadores for coluna in agregador.colunas))
+
+# Entrega cada chunk a todos os agregadores. Com uma janela, só as linhas da janela
+# (armazenamento.selecionar_janela, pela seleção de cada agregador) chegam aos
+# agregadores, leiam-se as partições ou o arquivo único. Com relatorio_memoria (esquema.RelatorioMemoria), a memória de cada
+# coluna é medida antes e depois do esquema compacto (chunks e linhas lidos vão para
+# os contadores da instrumentação, ver instrumentacao.py)
+def processar_chunks(agregadores, chunks, relatorio_memoria=None, janela=None):
+    for chunk in medir_iteracao('leitura', chunks):
+        contar('chunks')
+        contar('linhas', len(chunk))
+        antes = memoria_por_coluna(chunk) if relatorio_memoria is not None else None
+
+        # Converte colunas de data e aplica o esquema compacto uma vez para todos os agregadores
+        with etapa('datas'):
+            for coluna in COLUNAS_DATA:
+                if coluna in chunk.columns:
+                    chunk[coluna] = pd.to_datetime(chunk[coluna], errors='coerce')
+        # Um chunk por seleção da janela (sem janela, o mesmo chunk para todos)
+        chunks_selecao = {None: chunk}
+        if janela:
+            with etapa('janela'):
+                chunks_selecao = {selecao: selecionar_janela(chunk, janela[0], janela[1], selecao)
+                                  for selecao in dict.fromkeys(agregador.selecao for agregador in agregadores)}
+        with etapa('esquema'):
+            chunks_selecao = {selecao: compactar(chunk_selecao) for selecao, chunk_selecao in chunks_selecao.items()}
+        if relatorio_memoria is not None:
+            relatorio_memoria.adicionar(antes, next(iter(chunks_selecao.values())))
+
+        for agregador in agregadores:
+            with etapa(f'agregacao.{agregador.nome}'):
+                agregador.processar(chunks_selecao[agregador.selecao if janela else None])
+
+# Hash do conteúdo de um arquivo (lido em blocos de 1 MB)
+def hash_arquivo(caminho):
+    conteudo = hashlib.blake2b(digest_size=16)
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+            conteudo.update(bloco)
+    return conteudo.hexdigest()
+
+# Resultado parcial de um agregador para um arquivo:
+# <diretorio_cache>/<nome>/<hash de (parâmetros, arquivo, janela)>.pkl
+def caminho_parcial(diretorio_cache, agregador, arquivo, janela):
+    chave = repr((agregador.nome, sorted(agregador.parametros.items()), os.path.abspath(arquivo), janela))
+    return os.path.join(diretorio_cache, agregador.nome, hashlib.blake2b(chave.encode(), digest_size=16).hexdigest() + '.pkl')
+
+def salvar_parcial(caminho, arquivo, impressao, parcial):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    pd.to_pickle({'arquivo': arquivo, 'impressao': impressao, 'parcial': parcial}, caminho + '.tmp')
+    os.replace(caminho + '.tmp', caminho)
+
+# Arquivos com linhas filtradas pela janela (o arquivo único e as partições que não
+# estão inteiras na janela) têm um parcial por janela. Com selecao = 'publicacoes',
+# toda partição é filtrada (pela hora da publicação), então o parcial é sempre por janela.
+def chave_janela(agregador, arquivo, diretorio_por_hora, janela):
+    if not janela:
+        return None
+    chave = (str(pd.Timestamp(janela[0])), str(pd.Timestamp(janela[1])))
+    if agregador.selecao == 'publicacoes':
+        return chave + ('publicacoes',)
+    if not usa_particoes(diretorio_por_hora) or filtrar_particao(arquivo, janela[0], janela[1]):
+        return chave
+    return None
+
+# Varredura incremental: cada arquivo da fonte tem, por agregador, um resultado
+# parcial salvo junto com a impressão digital do arquivo (tamanho, mtime e hash do
+# conteúdo). Arquivos sem alteração só têm o parcial carregado e unido aos demais;
+# apenas arquivos novos ou alterados são lidos (uma vez para todos os agregadores
+# que precisam deles). O hash do conteúdo só é calculado quando tamanho ou mtime
+# mudam, então um arquivo apenas tocado continua reaproveitado.
+def varrer_incremental(agregadores, caminho_arquivo, tamanho_chunk, diretorio_cache, diretorio_por_hora=None, janela=None,
+                       relatorio_memoria=None):
+    arquivos = arquivos_da_fonte(caminho_arquivo, diretorio_por_hora, janela)
+    lidos = 0
+    for arquivo in arquivos:
+        estado = os.stat(arquivo)
+        atual = {'tamanho': estado.st_size, 'mtime_ns': estado.st_mtime_ns}
+        pendentes = []
+        for agregador in agregadores:
+            caminho = caminho_parcial(diretorio_cache, agregador, arquivo,
+                                      chave_janela(agregador, arquivo, diretorio_por_hora, janela))
+            salvo = pd.read_pickle(caminho) if os.path.exists(caminho) else None
+            anterior = salvo['impressao'] if salvo else None
+            if anterior and anterior['tamanho'] == atual['tamanho'] and anterior['mtime_ns'] != atual['mtime_ns']:
+                atual.setdefault('hash', hash_arquivo(arquivo))
+                if anterior['hash'] == atual['hash']:
+                    # Mesmo conteúdo com outro mtime: atualiza a impressão salva
+                    salvar_parcial(caminho, arquivo, atual, salvo['parcial'])
+                    anterior = atual
+            if anterior and anterior['tamanho'] == atual['tamanho'] and anterior['mtime_ns'] == atual['mtime_ns']:
+                with etapa('juntar_parciais'):
+                    agregador.juntar_parcial(salvo['parcial'])
+                contar('parciais_reaproveitados')
+            else:
+                pendentes.append((agregador, caminho))
+        if not pendentes:
+            continue
+
+        lidos += 1
+        contar('arquivos_lidos')
+        atual.setdefault('hash', hash_arquivo(arquivo))
+        novos = [agregador.novo_parcial() for agregador, _ in pendentes]
+        processar_chunks(novos, ler_arquivo_da_fonte(arquivo, colunas_dos_agregadores(novos), tamanho_chunk,
+                                                     diretorio_por_hora, janela), relatorio_memoria, janela)
+        for (agregador, caminho), novo in zip(pendentes, novos):
+            parcial = novo.parcial()
+            with etapa('salvar_parciais'):
+                salvar_parcial(caminho, arquivo, atual, parcial)
+            with etapa('juntar_parciais'):
+                agregador.juntar_parcial(parcial)
+            # Libera os arquivos temporários do agregador do arquivo
+            novo.descartar()
+    print(f"Varredura incremental: {lidos} arquivos lidos (novos ou alterados), {len(arquivos) - lidos} reaproveitados")
+    with etapa('resultados'):
+        return {agregador.nome: agregador.resultado() for agregador in agregadores}
+
+# Salva os resultados de cada agregador em <diretorio>/<nome>.pkl
+def salvar_agregados(agregadores, resultados, diretorio, fonte):
+    os.makedirs(diretorio, exist_ok=True)
+    for agregador in agregadores:
+        pd.to_pickle({'fonte': fonte, 'parametros': agregador.parametros, 'resultado': resultados[agregador.nome]},
+                     os.path.join(diretorio, f"{agregador.nome}.pkl"))
+
+# Carrega os resultados salvos de um agregador, se correspondem à fonte atual
+def carregar_agregados(agregador, diretorio, fonte):
+    caminho = os.path.join(diretorio, f"{agregador.nome}.pkl")
+    if not os.path.exists(caminho):
+        return None
+    salvo = pd.read_pickle(caminho)
+    if salvo['fonte'] != fonte or salvo.get('parametros') != agregador.parametros:
+        return None
+    return salvo['resultado']
+
+# Agregados salvos de um agregador pelo nome (com fonte e parâmetros), sem conferir
+# se ainda correspondem à fonte; usado pela etapa de gráficos (AED_graficos.py)
+def ler_agregados_salvos(nome, diretorio):
+    caminho = os.path.join(diretorio, f"{nome}.pkl")
+    return pd.read_pickle(caminho) if os.path.exists(caminho) else None
+
+# Usado pelos scripts AED_*: reaproveita os agregados salvos quando estão
+# atualizados; caso contrário, faz a varredura incremental só com o agregador
+# pedido (lendo apenas arquivos novos ou alterados) e salva o resultado
+def obter_agregados(agregador, caminho_arquivo, tamanho_chunk, diretorio_agregados, diretorio_por_hora=None, janela=None):
+    fonte = descrever_fonte(caminho_arquivo, diretorio_por_hora, janela)
+    resultado = carregar_agregados(agregador, diretorio_agregados, fonte)
+    if resultado is not None:
+        print(f"Usando agregados salvos de '{agregador.nome}' em: {diretorio_agregados}")
+        return resultado
+    resultados = varrer_incremental([agregador], caminho_arquivo, tamanho_chunk, os.path.join(diretorio_agregados, 'parciais'),
+                                    diretorio_por_hora, janela)
+    with etapa('salvar_agregados'):
+        salvar_agregados([agregador], resultados, diretorio_agregados, fonte)
+    return resultados[agregador.nome]